@@ -11,8 +11,11 @@ from core.firebase_manager import FirebaseManager
 from core.auth_service import AuthService
 from core.ui_controller import UIController
 from config.settings import (
+    DOWNLOAD_CACHE_BYTES,
     FIREBASE_STORAGE_BUCKET,
     FIREBASE_WEB_API_KEY,
+    SESSION_READ_BUDGET,
+    USAGE_ROLLUP_DIR,
 )
 
 # --- Configurações da Página ---
@@ -32,6 +35,9 @@ if "fb_manager" not in st.session_state:
             key_path=firebase_credentials_dict,
             storage_bucket=FIREBASE_STORAGE_BUCKET,
             web_api_key=FIREBASE_WEB_API_KEY,
+            usage_dir=USAGE_ROLLUP_DIR,
+            read_budget=SESSION_READ_BUDGET,
+            download_cache_bytes=DOWNLOAD_CACHE_BYTES,
         )
         st.session_state.auth_service = AuthService(st.session_state.fb_manager)
     except Exception as e:
@@ -16,3 +16,55 @@ FIREBASE_STORAGE_BUCKET = st.secrets["financial"]["FIREBASE_STORAGE_BUCKET"]
 # Esta chave é usada para interagir com as APIs de cliente do Firebase (como Autenticação REST API).
 # Pode ser encontrada nas configurações do aplicativo web no Console do Firebase.
 FIREBASE_WEB_API_KEY = st.secrets["financial"]["FIREBASE_WEB_API_KEY"]
+
+# Painel de desempenho (opcional) exibido na barra lateral.
+# Quando habilitado em [debug] no "secrets.toml", mostra a contagem de chamadas,
+# as latências e os bytes transferidos de cada operação na execução atual.
+PERFORMANCE_PANEL_ENABLED = st.secrets.get("debug", {}).get(
+    "PERFORMANCE_PANEL_ENABLED", False
+)
+
+# Diretório local onde são gravadas as consolidações diárias de documentos
+# lidos, escritos e excluídos no Firestore, por usuário, sessão e página.
+USAGE_ROLLUP_DIR = st.secrets.get("usage", {}).get("USAGE_ROLLUP_DIR", ".sigp/usage")
+
+# Limite de documentos lidos por sessão. Ao ser atingido, a sessão passa ao
+# modo econômico, reaproveitando a última leitura de cada coleção.
+SESSION_READ_BUDGET = st.secrets.get("usage", {}).get("SESSION_READ_BUDGET", 5000)
+
+# Perfilamento (opcional) das execuções do script. Quando habilitado em
+# [debug], cada execução gera um perfil do cProfile e um arquivo de pilhas
+# colapsadas para flamegraphs. Com ele desabilitado, apenas os usuários
+# listados em PROFILER_ADMIN_UIDS podem solicitá-lo pela URL ("?profile=1").
+# Só as PROFILE_MAX_RUNS execuções perfiladas mais recentes são mantidas.
+PROFILER_ENABLED = st.secrets.get("debug", {}).get("PROFILER_ENABLED", False)
+PROFILER_ADMIN_UIDS = st.secrets.get("debug", {}).get("PROFILER_ADMIN_UIDS", [])
+PROFILE_OUTPUT_DIR = st.secrets.get("debug", {}).get(
+    "PROFILE_OUTPUT_DIR", ".sigp/profiles"
+)
+PROFILE_MAX_RUNS = st.secrets.get("debug", {}).get("PROFILE_MAX_RUNS", 50)
+
+# Quantidade máxima de arquivos enviados simultaneamente ao Storage quando
+# vários documentos são selecionados de uma só vez.
+UPLOAD_WORKERS = st.secrets.get("upload", {}).get("UPLOAD_WORKERS", 4)
+
+# Tamanho máximo, em bytes, do cache em memória dos arquivos baixados pelo
+# aplicativo. Documentos abertos repetidamente são servidos desse cache.
+DOWNLOAD_CACHE_BYTES = st.secrets.get("download", {}).get(
+    "DOWNLOAD_CACHE_BYTES", 64 * 1024 * 1024
+)
+
+# Diretório local da fila de uploads em segundo plano (tabela de tarefas e
+# arquivos aguardando envio) e o intervalo, em segundos, com que a página de
+# documentos consulta a situação dos envios.
+UPLOAD_QUEUE_DIR = st.secrets.get("upload", {}).get("UPLOAD_QUEUE_DIR", ".sigp/uploads")
+UPLOAD_STATUS_POLL_SECONDS = st.secrets.get("upload", {}).get(
+    "UPLOAD_STATUS_POLL_SECONDS", 2
+)
+
+# Cotas de armazenamento por usuário, verificadas antes de cada upload.
+# Um valor ausente (ou None) desativa o limite correspondente.
+STORAGE_QUOTA_BYTES = st.secrets.get("quota", {}).get(
+    "STORAGE_QUOTA_BYTES", 1024 * 1024 * 1024
+)
+STORAGE_QUOTA_FILES = st.secrets.get("quota", {}).get("STORAGE_QUOTA_FILES", 1000)
@@ -125,3 +125,28 @@ class AuthService:
         except Exception as e:
             print(f"Erro inesperado (AuthService) na recuperação de senha: {e}")
             return False
+
+    def verify_password(self, user_uid: str, email: str, password: str) -> bool:
+        """Confirma a senha do usuário logado antes de uma ação irreversível.
+
+        A senha é validada com um novo login na API REST do Firebase, e o
+        login precisa pertencer ao próprio usuário.
+
+        Args:
+            user_uid (str): O UID do usuário logado.
+            email (str): O e-mail do usuário logado.
+            password (str): A senha informada.
+
+        Returns:
+            bool: `True` se a senha confere, `False` caso contrário.
+        """
+        if not email or not password:
+            return False
+        try:
+            user_data = self.fb_manager.sign_in_with_email_and_password(email, password)
+            return user_data.get("localId") == user_uid
+        except requests.exceptions.HTTPError:
+            return False
+        except Exception as e:
+            print(f"Erro (AuthService) ao confirmar a senha: {e}")
+            return False
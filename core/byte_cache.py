@@ -0,0 +1,126 @@
+"""
+Módulo de cache em memória para o conteúdo de arquivos.
+
+Este módulo define a classe ByteLRUCache, um cache LRU limitado pelo total
+de bytes armazenados, usado para servir arquivos baixados do Cloud Storage
+sem buscá-los novamente a cada abertura. Uma única instância é compartilhada
+por todas as sessões do processo.
+"""
+
+import threading
+from collections import OrderedDict
+
+_shared_cache: "ByteLRUCache | None" = None
+_shared_cache_lock = threading.Lock()
+
+
+class ByteLRUCache:
+    """Cache LRU de conteúdos binários com limite total de bytes.
+
+    Ao inserir um item que ultrapassa o limite, os itens usados há mais tempo
+    são descartados. Itens maiores que `max_item_bytes` não são armazenados,
+    para que um único arquivo grande não esvazie o cache.
+
+    Attributes:
+        max_bytes (int): O total máximo de bytes armazenados.
+        max_item_bytes (int): O tamanho máximo de um único item.
+        hits (int): Quantidade de consultas atendidas pelo cache.
+        misses (int): Quantidade de consultas não encontradas no cache.
+    """
+
+    def __init__(self, max_bytes: int, max_item_bytes: int | None = None):
+        """Inicializa um cache vazio.
+
+        Args:
+            max_bytes (int): O total máximo de bytes armazenados.
+            max_item_bytes (int | None): O tamanho máximo de um item. Se None,
+                                         usa um quarto de `max_bytes`.
+        """
+        self.max_bytes = max_bytes
+        self.max_item_bytes = (
+            max_item_bytes if max_item_bytes is not None else max_bytes // 4
+        )
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._items: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+
+    @property
+    def size(self) -> int:
+        """O total de bytes atualmente armazenados."""
+        return self._size
+
+    def get(self, key: str) -> bytes | None:
+        """Retorna o conteúdo de uma chave, marcando-a como usada recentemente.
+
+        Args:
+            key (str): A chave do item (ex: o caminho no Storage).
+
+        Returns:
+            bytes | None: O conteúdo armazenado, ou None se não estiver no cache.
+        """
+        with self._lock:
+            data = self._items.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key: str, data: bytes) -> bool:
+        """Armazena um conteúdo, descartando os itens mais antigos se preciso.
+
+        Args:
+            key (str): A chave do item.
+            data (bytes): O conteúdo a ser armazenado.
+
+        Returns:
+            bool: True se o item foi armazenado, False se excede o tamanho
+                  máximo de um item.
+        """
+        if len(data) > self.max_item_bytes:
+            return False
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._items[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
+        return True
+
+    def pop(self, key: str):
+        """Remove uma chave do cache, se existir.
+
+        Args:
+            key (str): A chave do item a remover.
+        """
+        with self._lock:
+            data = self._items.pop(key, None)
+            if data is not None:
+                self._size -= len(data)
+
+    def clear(self):
+        """Remove todos os itens do cache."""
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+
+def get_byte_cache(max_bytes: int) -> ByteLRUCache:
+    """Retorna o cache compartilhado do processo, criando-o se necessário.
+
+    O limite informado na primeira chamada define o tamanho do cache.
+
+    Args:
+        max_bytes (int): O total máximo de bytes armazenados.
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ByteLRUCache(max_bytes)
+        return _shared_cache
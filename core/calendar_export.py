@@ -0,0 +1,245 @@
+"""
+Módulo de exportação da agenda de exames no formato iCalendar (.ics).
+
+Este módulo gera o arquivo .ics dos exames de um usuário como um fluxo de
+linhas: os exames são lidos página a página e cada evento é escrito assim que
+lido, de modo que o consumo de memória independe da quantidade de exames.
+
+As exportações incrementais recebem o token de sincronização devolvido pela
+exportação anterior e incluem apenas os exames alterados desde então, além
+de eventos cancelados para os exames excluídos. Também pode ser executado
+pela linha de comando:
+
+    python -m core.calendar_export --key chave.json --bucket meu-bucket --user UID > exames.ics
+    python -m core.calendar_export --key chave.json --bucket meu-bucket --user UID --since TOKEN
+"""
+
+import argparse
+import sys
+from datetime import datetime, timedelta, timezone
+from .exam_service import TOMBSTONE_RETENTION, ExamService
+from .firebase_manager import FirebaseManager
+from .models import Exam
+
+# Duração atribuída aos eventos, já que os exames guardam apenas o início.
+EXAM_DURATION = timedelta(hours=1)
+
+# Margem subtraída do token: alterações gravadas durante a exportação são
+# repetidas na próxima, em vez de perdidas. Eventos repetidos são apenas
+# atualizados pelos calendários (mesmo UID).
+SYNC_TOKEN_MARGIN = timedelta(minutes=1)
+
+# Domínio dos UIDs dos eventos, que os identifica entre exportações.
+EVENT_UID_DOMAIN = "sigp"
+
+# Tamanho máximo de uma linha do iCalendar, em bytes (RFC 5545).
+_MAX_LINE_OCTETS = 75
+
+
+def make_sync_token(moment: datetime) -> str:
+    """Cria o token de sincronização de uma exportação iniciada em `moment`."""
+    return (moment - SYNC_TOKEN_MARGIN).astimezone(timezone.utc).isoformat()
+
+
+def parse_sync_token(token: str | None) -> datetime | None:
+    """Interpreta um token de sincronização.
+
+    Returns:
+        datetime | None: O momento do token, ou None se o token for inválido
+            ou anterior à retenção das exclusões (exigindo exportação completa).
+    """
+    if not token:
+        return None
+    try:
+        since = datetime.fromisoformat(token)
+    except ValueError:
+        return None
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if since < datetime.now(timezone.utc) - TOMBSTONE_RETENTION:
+        return None
+    return since
+
+
+def escape_text(value: str) -> str:
+    """Escapa um texto para um valor do iCalendar."""
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold_line(line: str) -> str:
+    """Dobra uma linha em partes de até 75 bytes, terminadas em CRLF."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= _MAX_LINE_OCTETS:
+        return line + "\r\n"
+
+    parts = []
+    start = 0
+    limit = _MAX_LINE_OCTETS
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Não divide um caractere UTF-8 ao meio.
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode("utf-8"))
+        start = end
+        # As linhas de continuação começam com um espaço.
+        limit = _MAX_LINE_OCTETS - 1
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _floating(moment: datetime) -> str:
+    """Formata um horário de parede (sem fuso), como os exames são gravados."""
+    return moment.strftime("%Y%m%dT%H%M%S")
+
+
+def _utc(moment: datetime) -> str:
+    """Formata um instante em UTC."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _event_lines(exam: Exam, stamp: str) -> list[str]:
+    """Retorna as linhas do evento de um exame."""
+    description = "\n".join(
+        line
+        for line in (
+            f"Médico: {exam.doctor}" if exam.doctor else "",
+            exam.notes,
+            "Exame concluído." if exam.completed else "",
+        )
+        if line
+    )
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{exam.id}@{EVENT_UID_DOMAIN}",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART:{_floating(exam.when)}",
+        f"DTEND:{_floating(exam.when + EXAM_DURATION)}",
+        f"SUMMARY:{escape_text(f'Exame: {exam.title}')}",
+        "STATUS:CONFIRMED",
+    ]
+    if exam.local:
+        lines.append(f"LOCATION:{escape_text(exam.local)}")
+    if description:
+        lines.append(f"DESCRIPTION:{escape_text(description)}")
+    if exam.updated_at is not None:
+        lines.append(f"LAST-MODIFIED:{_utc(exam.updated_at)}")
+    lines.append("END:VEVENT")
+    return lines
+
+
+def _cancelled_event_lines(doc_id: str, stamp: str) -> list[str]:
+    """Retorna as linhas do evento cancelado de um exame excluído."""
+    return [
+        "BEGIN:VEVENT",
+        f"UID:{doc_id}@{EVENT_UID_DOMAIN}",
+        f"DTSTAMP:{stamp}",
+        "STATUS:CANCELLED",
+        "END:VEVENT",
+    ]
+
+
+class CalendarExport:
+    """Uma exportação da agenda de exames de um usuário.
+
+    A exportação é iniciada na criação do objeto, que já calcula o token de
+    sincronização a devolver ao cliente; o conteúdo é gerado ao percorrer
+    `iter_lines`.
+
+    Attributes:
+        exam_service (ExamService): O serviço de exames do usuário.
+        since (datetime | None): O início das alterações exportadas, ou None
+                                 em uma exportação completa.
+        sync_token (str): O token a usar na próxima exportação incremental.
+    """
+
+    def __init__(self, exam_service: ExamService, since_token: str | None = None):
+        """Inicia uma exportação completa ou incremental.
+
+        Args:
+            exam_service (ExamService): O serviço de exames do usuário.
+            since_token (str | None): O token de uma exportação anterior. Se
+                None ou inválido, todos os exames são exportados.
+        """
+        self.exam_service = exam_service
+        self.since = parse_sync_token(since_token)
+        self._started_at = datetime.now(timezone.utc)
+        self.sync_token = make_sync_token(self._started_at)
+
+    @property
+    def incremental(self) -> bool:
+        """Indica se apenas as alterações desde o token são exportadas."""
+        return self.since is not None
+
+    def iter_lines(self):
+        """Gera o arquivo .ics, linha a linha (já dobradas e com CRLF).
+
+        Yields:
+            str: As linhas do calendário.
+        """
+        stamp = _utc(self._started_at)
+        yield from map(
+            fold_line,
+            [
+                "BEGIN:VCALENDAR",
+                "VERSION:2.0",
+                "PRODID:-//SIGP//Agenda de Exames//PT-BR",
+                "CALSCALE:GREGORIAN",
+                "METHOD:PUBLISH",
+                "X-WR-CALNAME:Agenda de Exames",
+            ],
+        )
+        for exam in self.exam_service.iter_exams(self.since):
+            # Exames sem data válida não têm como ser colocados no calendário.
+            if exam.when is not None:
+                yield from map(fold_line, _event_lines(exam, stamp))
+        if self.incremental:
+            for tombstone in self.exam_service.iter_deleted(self.since):
+                yield from map(fold_line, _cancelled_event_lines(tombstone.id, stamp))
+        yield fold_line("END:VCALENDAR")
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Ponto de entrada da linha de comando da exportação.
+
+    O calendário é escrito na saída padrão, e o token de sincronização da
+    próxima exportação, na saída de erros.
+
+    Args:
+        argv (list[str] | None): Os argumentos da linha de comando.
+
+    Returns:
+        int: O código de saída.
+    """
+    parser = argparse.ArgumentParser(
+        description="Exporta a agenda de exames de um usuário em formato .ics."
+    )
+    parser.add_argument(
+        "--key", required=True, help="Caminho do JSON da conta de serviço."
+    )
+    parser.add_argument("--bucket", required=True, help="O bucket do Cloud Storage.")
+    parser.add_argument("--user", required=True, help="O UID do usuário.")
+    parser.add_argument(
+        "--since",
+        help="Token de uma exportação anterior, para exportar só as alterações.",
+    )
+    args = parser.parse_args(argv)
+
+    firebase_manager = FirebaseManager(args.key, args.bucket, web_api_key="")
+    export = CalendarExport(ExamService(firebase_manager, args.user), args.since)
+    sys.stdout.reconfigure(newline="")
+    for line in export.iter_lines():
+        sys.stdout.write(line)
+    print(f"Token de sincronização: {export.sync_token}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,686 @@
+"""
+Módulo de serviço para gerenciar os documentos enviados pelos usuários.
+
+Este módulo define a classe DocumentService, que orquestra o envio e a
+exclusão de documentos entre o Cloud Storage e o Firestore. Os arquivos são
+endereçados pelo conteúdo (hash SHA-256): um mesmo arquivo enviado várias
+vezes pelo usuário é armazenado uma única vez, e um índice de conteúdo com
+contagem de referências decide quando o arquivo pode ser removido.
+Imagens recebem também uma miniatura WebP, gravada ao lado do original.
+O nome e a descrição dos documentos entram no índice de busca do usuário.
+"""
+
+import hashlib
+import io
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from firebase_admin import firestore
+from PIL import Image
+from .firebase_manager import (
+    DEFAULT_UPLOAD_CHUNK_SIZE,
+    TOMBSTONE_FIELD,
+    FirebaseManager,
+)
+from .models import DocumentMeta
+from .purge_service import PurgeService
+from .request_context import submit_in_context
+from .search_index import SearchIndex
+
+# Tipos MIME que recebem miniatura e o tamanho máximo (em pixels) dela.
+THUMBNAIL_MIME_TYPES = ("image/jpeg", "image/png")
+THUMBNAIL_SIZE = (320, 320)
+
+# Quantidade padrão de uploads simultâneos em um envio de vários arquivos.
+DEFAULT_UPLOAD_WORKERS = 4
+
+# Documento, em `users/{uid}/meta`, com o uso de armazenamento do usuário.
+STORAGE_USAGE_DOCUMENT = "storage_usage"
+
+# Sufixo dos caminhos das miniaturas, que não entram na contagem de arquivos.
+THUMBNAIL_SUFFIX = ".thumb.webp"
+
+# Tipo dos documentos no índice de busca (o nome da coleção).
+DOCUMENTS_KIND = "documents"
+
+
+def document_text(name: str, description: str) -> str:
+    """Retorna o texto indexado de um documento (nome e descrição)."""
+    return f"{name}\n{description}"
+
+
+class DocumentService:
+    """Gerencia o ciclo de vida dos documentos de um usuário.
+
+    Os metadados ficam em `users/{uid}/documents` e o índice de conteúdo em
+    `users/{uid}/content_index/{sha256}`, com o caminho do arquivo no Storage
+    e a quantidade de documentos que o referenciam (`refcount`). O uso de
+    armazenamento é mantido em `users/{uid}/meta/storage_usage`, atualizado
+    na mesma transação que cria ou libera uma entrada do índice.
+
+    Ao liberar a última referência, a entrada vira uma marca de remoção até
+    que o arquivo seja excluído do Storage: envios simultâneos do mesmo
+    conteúdo não reaproveitam o arquivo sendo excluído, e o gravam com outro
+    nome.
+
+    Attributes:
+        quota_bytes (int | None): O total máximo de bytes por usuário.
+        quota_files (int | None): A quantidade máxima de arquivos por usuário.
+    """
+
+    def __init__(
+        self,
+        firebase_manager: FirebaseManager,
+        quota_bytes: int | None = None,
+        quota_files: int | None = None,
+    ):
+        """Inicializa o serviço de documentos com o gerenciador do Firebase.
+
+        Args:
+            firebase_manager (FirebaseManager): Instância do gerenciador
+                do Firebase para interagir com o Firestore e o Storage.
+            quota_bytes (int | None): O total máximo de bytes por usuário.
+                                      Se None, não há limite.
+            quota_files (int | None): A quantidade máxima de arquivos por
+                                      usuário. Se None, não há limite.
+        """
+        self.fb_manager = firebase_manager
+        self.purge_service = PurgeService(firebase_manager)
+        self.quota_bytes = quota_bytes
+        self.quota_files = quota_files
+
+    @staticmethod
+    def documents_path(user_uid: str) -> str:
+        """Retorna o caminho da coleção de metadados de documentos do usuário."""
+        return f"users/{user_uid}/documents"
+
+    @staticmethod
+    def content_index_path(user_uid: str) -> str:
+        """Retorna o caminho da coleção do índice de conteúdo do usuário."""
+        return f"users/{user_uid}/content_index"
+
+    @staticmethod
+    def meta_path(user_uid: str) -> str:
+        """Retorna o caminho da coleção de dados agregados do usuário."""
+        return f"users/{user_uid}/meta"
+
+    @staticmethod
+    def usage_delta(size: int | None, content_type: str | None, sign: int = 1) -> dict:
+        """Monta os incrementos do uso de armazenamento de um arquivo.
+
+        Args:
+            size (int | None): O tamanho do arquivo em bytes.
+            content_type (str | None): O tipo MIME do arquivo.
+            sign (int): 1 para um arquivo adicionado, -1 para um removido.
+
+        Returns:
+            dict: Incrementos de `bytes`, `file_count` e `by_mime`.
+        """
+        size = size or 0
+        # Pontos separam campos nos caminhos do Firestore; não podem ser chaves.
+        mime_key = (content_type or "desconhecido").replace(".", "_")
+        return {
+            "bytes": sign * size,
+            "file_count": sign,
+            "by_mime": {mime_key: {"bytes": sign * size, "count": sign}},
+        }
+
+    @staticmethod
+    def hash_file(file_obj, chunk_size: int = DEFAULT_UPLOAD_CHUNK_SIZE) -> str:
+        """Calcula o SHA-256 de um arquivo lendo-o em blocos.
+
+        Args:
+            file_obj: Um objeto de arquivo binário com `read` e `seek`.
+            chunk_size (int): O tamanho de cada bloco lido.
+
+        Returns:
+            str: O hash SHA-256 do conteúdo, em hexadecimal.
+        """
+        digest = hashlib.sha256()
+        file_obj.seek(0)
+        for chunk in iter(lambda: file_obj.read(chunk_size), b""):
+            digest.update(chunk)
+        file_obj.seek(0)
+        return digest.hexdigest()
+
+    @staticmethod
+    def build_thumbnail(file_obj) -> bytes | None:
+        """Gera uma miniatura WebP de uma imagem.
+
+        Args:
+            file_obj: O arquivo binário da imagem (JPEG ou PNG).
+
+        Returns:
+            bytes | None: O conteúdo WebP da miniatura, ou None se a imagem
+                          não puder ser lida.
+        """
+        try:
+            file_obj.seek(0)
+            with Image.open(file_obj) as image:
+                # Em JPEGs, decodifica já em escala reduzida, sem abrir a imagem inteira.
+                image.draft("RGB", THUMBNAIL_SIZE)
+                image.thumbnail(THUMBNAIL_SIZE)
+                if image.mode not in ("RGB", "RGBA"):
+                    image = image.convert("RGBA" if "A" in image.mode else "RGB")
+                output = io.BytesIO()
+                image.save(output, format="WEBP", quality=75, method=4)
+            return output.getvalue()
+        except Exception as e:
+            print(f"Erro ao gerar miniatura: {e}")
+            return None
+        finally:
+            file_obj.seek(0)
+
+    def _store_thumbnail(
+        self, file_obj, content_type: str | None, storage_path: str
+    ) -> dict:
+        """Gera e envia a miniatura de uma imagem, se aplicável.
+
+        Args:
+            file_obj: O arquivo binário enviado.
+            content_type (str | None): O tipo MIME do arquivo.
+            storage_path (str): O caminho do arquivo original no Storage.
+
+        Returns:
+            dict: O campo `thumbnail_path`, ou um dicionário vazio se não
+                  houver miniatura.
+        """
+        if content_type not in THUMBNAIL_MIME_TYPES:
+            return {}
+        thumbnail = self.build_thumbnail(file_obj)
+        if thumbnail is None:
+            return {}
+
+        thumbnail_path = f"{os.path.splitext(storage_path)[0]}{THUMBNAIL_SUFFIX}"
+        if not self.fb_manager.upload_file(
+            thumbnail, thumbnail_path, content_type="image/webp"
+        ):
+            return {}
+        return {"thumbnail_path": thumbnail_path}
+
+    def _store_content(
+        self,
+        user_uid: str,
+        file_obj,
+        file_name: str,
+        content_type: str | None,
+        size: int | None,
+        on_progress: callable = None,
+    ) -> dict | None:
+        """Armazena o conteúdo de um arquivo e registra uma referência a ele.
+
+        O conteúdo é lido em blocos para calcular o hash. Se o usuário já
+        possuir um arquivo com o mesmo conteúdo, o upload ao Storage é
+        dispensado e apenas uma nova referência é registrada.
+
+        Args:
+            user_uid (str): O UID do usuário dono do documento.
+            file_obj: O arquivo binário a ser enviado.
+            file_name (str): O nome original do arquivo.
+            content_type (str | None): O tipo MIME do arquivo.
+            size (int | None): O tamanho do arquivo em bytes.
+            on_progress (callable, optional): Função chamada com
+                `(bytes_enviados, tamanho_total)` durante o upload.
+
+        Returns:
+            dict | None: Os metadados do documento (sem descrição e data de
+                         envio), ou None em caso de erro.
+        """
+        content_hash = self.hash_file(file_obj)
+        index_path = self.content_index_path(user_uid)
+        metadata = {
+            "name": file_name,
+            "user_uid": user_uid,
+            "mime_type": content_type,
+            "content_hash": content_hash,
+            "size": size,
+        }
+
+        existing = self.fb_manager.get_document(index_path, content_hash) or {}
+        if existing.get("storage_path") and not existing.get(TOMBSTONE_FIELD):
+            # A referência só é adquirida se a entrada continua ativa: ela
+            # pode ter sido liberada depois da consulta.
+            references = self.fb_manager.acquire_reference(
+                index_path, content_hash, only_existing=True
+            )
+            if references is None:
+                return None
+            if references:
+                if on_progress is not None:
+                    on_progress(size or 0, size or 0)
+                thumbnail = (
+                    {"thumbnail_path": existing["thumbnail_path"]}
+                    if existing.get("thumbnail_path")
+                    else {}
+                )
+                return {
+                    **metadata,
+                    "storage_path": existing["storage_path"],
+                    **thumbnail,
+                }
+            existing = {TOMBSTONE_FIELD: True}
+
+        # O caminho é derivado do conteúdo: envios simultâneos do mesmo
+        # arquivo gravam o mesmo objeto, sem duplicá-lo. Se o arquivo anterior
+        # com este conteúdo ainda está sendo excluído, o novo recebe outro
+        # nome, para não ser excluído junto.
+        extension = os.path.splitext(file_name)[1].lower()
+        suffix = f"-{uuid.uuid4().hex[:8]}" if existing.get(TOMBSTONE_FIELD) else ""
+        storage_path = f"users/{user_uid}/documents/{content_hash}{suffix}{extension}"
+        if not self.fb_manager.upload_stream(
+            file_obj,
+            storage_path,
+            content_type=content_type,
+            size=size,
+            on_progress=on_progress,
+        ):
+            return None
+        thumbnail = self._store_thumbnail(file_obj, content_type, storage_path)
+
+        # O uso de armazenamento só cresce quando o conteúdo é novo, na mesma
+        # transação que cria a entrada do índice.
+        if not self.fb_manager.acquire_reference(
+            index_path,
+            content_hash,
+            {
+                "storage_path": storage_path,
+                "size": size,
+                "mime_type": content_type,
+                **thumbnail,
+            },
+            on_create=(
+                self.meta_path(user_uid),
+                STORAGE_USAGE_DOCUMENT,
+                self.usage_delta(size, content_type),
+            ),
+        ):
+            return None
+
+        return {**metadata, "storage_path": storage_path, **thumbnail}
+
+    def _release_content(self, user_uid: str, metadata: dict) -> int | None:
+        """Libera a referência de um documento ao seu conteúdo.
+
+        Ao liberar a última referência, a entrada do índice vira uma marca de
+        remoção e o uso de armazenamento é reduzido, na mesma transação.
+
+        Args:
+            user_uid (str): O UID do usuário dono do documento.
+            metadata (dict): Os metadados do documento, com `content_hash`,
+                             `size` e `mime_type`.
+
+        Returns:
+            int | None: Quantas referências restam, ou None em caso de erro.
+        """
+        return self.fb_manager.release_reference(
+            self.content_index_path(user_uid),
+            metadata["content_hash"],
+            on_release=(
+                self.meta_path(user_uid),
+                STORAGE_USAGE_DOCUMENT,
+                self.usage_delta(metadata["size"], metadata["mime_type"], sign=-1),
+            ),
+            tombstone=True,
+        )
+
+    def store_document(
+        self,
+        user_uid: str,
+        file_obj,
+        file_name: str,
+        content_type: str | None,
+        size: int | None,
+        description: str = "",
+        on_progress: callable = None,
+    ) -> str | None:
+        """Armazena um arquivo enviado e registra seus metadados.
+
+        Args:
+            user_uid (str): O UID do usuário dono do documento.
+            file_obj: O arquivo binário a ser enviado.
+            file_name (str): O nome original do arquivo.
+            content_type (str | None): O tipo MIME do arquivo.
+            size (int | None): O tamanho do arquivo em bytes.
+            description (str): A descrição opcional do documento.
+            on_progress (callable, optional): Função chamada com
+                `(bytes_enviados, tamanho_total)` durante o upload.
+
+        Returns:
+            str | None: O ID do documento de metadados criado, ou None em
+                        caso de erro.
+        """
+        metadata = self._store_content(
+            user_uid, file_obj, file_name, content_type, size, on_progress
+        )
+        if metadata is None:
+            return None
+
+        doc_id = self.fb_manager.add_document(
+            self.documents_path(user_uid),
+            {
+                **metadata,
+                "description": description,
+                "uploaded_at": firestore.SERVER_TIMESTAMP,
+            },
+        )
+        if not doc_id:
+            # Desfaz a referência para não impedir a remoção futura do arquivo;
+            # um arquivo sem referências é recolhido pelo coletor de órfãos.
+            self._release_content(user_uid, metadata)
+            return None
+        SearchIndex(self.fb_manager, user_uid).update(
+            DOCUMENTS_KIND,
+            doc_id,
+            "",
+            document_text(file_name, description),
+            label=file_name,
+        )
+        return doc_id
+
+    def store_documents(
+        self,
+        user_uid: str,
+        uploads: list,
+        description: str = "",
+        max_workers: int = DEFAULT_UPLOAD_WORKERS,
+        on_tick: callable = None,
+    ) -> list[str | None]:
+        """Armazena vários arquivos em paralelo e grava os metadados em lote.
+
+        Os uploads são feitos por um pool limitado de threads, de modo que o
+        tempo total se aproxima do arquivo mais lento, e não da soma de todos.
+        Os metadados dos arquivos enviados com sucesso são gravados juntos,
+        em uma única gravação em lote ao final; se um lote dela falhar, só os
+        arquivos dos lotes não gravados são liberados.
+
+        Args:
+            user_uid (str): O UID do usuário dono dos documentos.
+            uploads (list): Arquivos com os atributos `name`, `type` e `size`
+                            (ex: a lista de `UploadedFile` do Streamlit).
+            description (str): A descrição aplicada a todos os documentos.
+            max_workers (int): A quantidade máxima de uploads simultâneos.
+            on_tick (callable, optional): Função chamada periodicamente, na
+                thread do chamador, com a lista `(bytes_enviados, tamanho_total)`
+                de cada arquivo. Permite atualizar a interface durante o envio.
+
+        Returns:
+            list[str | None]: O ID do documento criado para cada arquivo, na
+                              mesma ordem de `uploads`, ou None nos que falharam.
+        """
+        progress = [(0, upload.size or 0) for upload in uploads]
+
+        def report(index: int) -> callable:
+            def on_progress(sent: int, total: int | None):
+                progress[index] = (sent, total or 0)
+
+            return on_progress
+
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="sigp-upload"
+        ) as executor:
+            futures = [
+                submit_in_context(
+                    executor,
+                    self._store_content,
+                    user_uid,
+                    upload,
+                    upload.name,
+                    upload.type,
+                    upload.size,
+                    report(index),
+                )
+                for index, upload in enumerate(uploads)
+            ]
+            pending = set(futures)
+            while pending:
+                _, pending = wait(pending, timeout=0.25)
+                if on_tick is not None:
+                    on_tick(list(progress))
+
+        stored = []
+        for future in futures:
+            try:
+                stored.append(future.result())
+            except Exception as e:
+                print(f"Erro no upload de arquivo: {e}")
+                stored.append(None)
+
+        successful = [metadata for metadata in stored if metadata is not None]
+        doc_ids = self.fb_manager.add_documents(
+            self.documents_path(user_uid),
+            [
+                {
+                    **metadata,
+                    "description": description,
+                    "uploaded_at": firestore.SERVER_TIMESTAMP,
+                }
+                for metadata in successful
+            ],
+        )
+        # Só os arquivos dos lotes não gravados perdem a referência: os dos
+        # lotes aplicados já têm documento e continuam válidos.
+        for doc_id, metadata in zip(doc_ids, successful):
+            if doc_id is None:
+                self._release_content(user_uid, metadata)
+
+        # As entradas de todos os arquivos vão ao índice em uma única gravação.
+        SearchIndex(self.fb_manager, user_uid).update_many(
+            DOCUMENTS_KIND,
+            [
+                (
+                    doc_id,
+                    "",
+                    document_text(metadata["name"], description),
+                    metadata["name"],
+                )
+                for doc_id, metadata in zip(doc_ids, successful)
+                if doc_id is not None
+            ],
+        )
+        created = iter(doc_ids)
+        return [next(created) if metadata else None for metadata in stored]
+
+    def ensure_search_index(self, user_uid: str):
+        """Indexa, uma única vez, os documentos enviados antes do índice de busca.
+
+        Args:
+            user_uid (str): O UID do usuário dono dos documentos.
+        """
+        search_index = SearchIndex(self.fb_manager, user_uid)
+        if search_index.is_built(DOCUMENTS_KIND):
+            return
+        documents = self.fb_manager.get_all_records(
+            self.documents_path(user_uid), DocumentMeta
+        )
+        search_index.build(
+            DOCUMENTS_KIND,
+            {
+                document.id: document_text(document.name, document.description)
+                for document in documents
+            },
+            {document.id: document.name for document in documents},
+        )
+
+    def file_url(self, document: DocumentMeta) -> str | None:
+        """Retorna o link de acesso ao arquivo de um documento.
+
+        Documentos com caminho no Storage recebem uma URL assinada temporária.
+        Documentos antigos, enviados quando os arquivos eram públicos, usam a
+        URL pública gravada nos metadados.
+
+        Args:
+            document (DocumentMeta): Os metadados do documento.
+        """
+        if document.storage_path:
+            return self.fb_manager.get_file_url(document.storage_path)
+        return document.file_url or None
+
+    def thumbnail_url(self, document: DocumentMeta) -> str | None:
+        """Retorna o link de acesso à miniatura de um documento, se houver.
+
+        Args:
+            document (DocumentMeta): Os metadados do documento.
+        """
+        if document.thumbnail_path:
+            return self.fb_manager.get_file_url(document.thumbnail_path)
+        return document.thumbnail_url
+
+    def delete_document(self, user_uid: str, document: DocumentMeta) -> bool:
+        """Exclui um documento e, se for a última referência, o seu arquivo.
+
+        Documentos antigos, sem hash de conteúdo, têm o arquivo removido
+        diretamente, como antes da deduplicação. A miniatura, se existir, é
+        removida junto com o arquivo original.
+
+        Args:
+            user_uid (str): O UID do usuário dono do documento.
+            document (DocumentMeta): Os metadados do documento a excluir.
+
+        Returns:
+            bool: True se o documento foi excluído, False se a remoção do
+                  arquivo no Storage falhou (os metadados são mantidos).
+        """
+        legacy_file = None
+        if document.content_hash:
+            remaining = self._release_content(
+                user_uid,
+                {
+                    "content_hash": document.content_hash,
+                    "size": document.size,
+                    "mime_type": document.mime_type,
+                },
+            )
+            if remaining is None:
+                return False
+            remove_blob = remaining == 0
+        else:
+            remove_blob = bool(document.storage_path)
+            if remove_blob:
+                # Documentos antigos não gravaram o tamanho do arquivo.
+                legacy_file = self.fb_manager.get_file_info(document.storage_path)
+
+        # O arquivo e a miniatura são excluídos em paralelo, antes dos metadados.
+        storage_paths = (
+            [document.storage_path, document.thumbnail_path] if remove_blob else []
+        )
+        if not self.purge_service.purge_item(
+            self.documents_path(user_uid), document.id, storage_paths
+        ):
+            return False
+
+        if document.content_hash and remove_blob:
+            # O arquivo foi excluído: a marca de remoção já não é necessária.
+            self.fb_manager.delete_tombstone(
+                self.content_index_path(user_uid), document.content_hash
+            )
+        if legacy_file is not None:
+            self.fb_manager.increment_document(
+                self.meta_path(user_uid),
+                STORAGE_USAGE_DOCUMENT,
+                self.usage_delta(legacy_file.size, legacy_file.content_type, sign=-1),
+            )
+        SearchIndex(self.fb_manager, user_uid).update(
+            DOCUMENTS_KIND,
+            document.id,
+            document_text(document.name, document.description),
+            "",
+        )
+        return True
+
+    def get_storage_usage(self, user_uid: str) -> dict:
+        """Retorna o uso de armazenamento do usuário.
+
+        O contador é mantido de forma incremental. Na primeira consulta (ou
+        se o contador ainda não foi inicializado), ele é calculado a partir
+        da listagem dos arquivos do usuário no Storage.
+
+        Args:
+            user_uid (str): O UID do usuário.
+
+        Returns:
+            dict: `bytes`, `file_count` e `by_mime` (bytes e quantidade por
+                  tipo MIME).
+        """
+        usage = self.fb_manager.get_document(
+            self.meta_path(user_uid), STORAGE_USAGE_DOCUMENT
+        )
+        if not usage or not usage.get("initialized"):
+            usage = self.recompute_storage_usage(user_uid)
+        return usage
+
+    def recompute_storage_usage(self, user_uid: str) -> dict:
+        """Recalcula o uso de armazenamento listando os arquivos do usuário.
+
+        Percorre `users/{uid}/documents/` no Storage, ignorando as miniaturas,
+        e sobrescreve o contador incremental com o resultado.
+
+        Args:
+            user_uid (str): O UID do usuário.
+
+        Returns:
+            dict: O uso recalculado, no mesmo formato de `get_storage_usage`.
+        """
+        usage = {"bytes": 0, "file_count": 0, "by_mime": {}}
+        try:
+            for file in self.fb_manager.iter_files(f"users/{user_uid}/documents/"):
+                if file.name.endswith(THUMBNAIL_SUFFIX):
+                    continue
+                delta = self.usage_delta(file.size, file.content_type)
+                usage["bytes"] += delta["bytes"]
+                usage["file_count"] += 1
+                for mime_key, values in delta["by_mime"].items():
+                    bucket = usage["by_mime"].setdefault(
+                        mime_key, {"bytes": 0, "count": 0}
+                    )
+                    bucket["bytes"] += values["bytes"]
+                    bucket["count"] += 1
+        except Exception as e:
+            print(f"Erro ao recalcular o uso de armazenamento: {e}")
+            return usage
+
+        self.fb_manager.set_document(
+            self.meta_path(user_uid),
+            STORAGE_USAGE_DOCUMENT,
+            {**usage, "initialized": True, "recomputed_at": firestore.SERVER_TIMESTAMP},
+        )
+        return usage
+
+    def check_quota(
+        self, user_uid: str, sizes: list[int], reserved: dict | None = None
+    ) -> str | None:
+        """Verifica se novos arquivos cabem na cota do usuário.
+
+        A verificação é feita antes do upload, com os tamanhos informados pelo
+        navegador. Arquivos repetidos (que não ocupariam espaço) também são
+        contados, mantendo a verificação barata.
+
+        Args:
+            user_uid (str): O UID do usuário.
+            sizes (list[int]): Os tamanhos, em bytes, dos arquivos a enviar.
+            reserved (dict | None): Os bytes (`bytes`) e arquivos
+                (`file_count`) já aceitos e ainda não enviados (ex: os da
+                fila de uploads), somados ao uso atual.
+
+        Returns:
+            str | None: Uma mensagem explicando a cota excedida, ou None se
+                        os arquivos couberem.
+        """
+        if self.quota_bytes is None and self.quota_files is None:
+            return None
+        usage = self.get_storage_usage(user_uid)
+        reserved = reserved or {}
+        used_files = usage.get("file_count", 0) + reserved.get("file_count", 0)
+        used_bytes = usage.get("bytes", 0) + reserved.get("bytes", 0)
+        if self.quota_files is not None and used_files + len(sizes) > self.quota_files:
+            return (
+                f"Limite de {self.quota_files} arquivos atingido. "
+                "Exclua alguns documentos antes de enviar novos."
+            )
+        if self.quota_bytes is not None and used_bytes + sum(sizes) > self.quota_bytes:
+            available = max(self.quota_bytes - used_bytes, 0)
+            return (
+                "Espaço insuficiente: restam "
+                f"{available / (1024 * 1024):.1f} MB de "
+                f"{self.quota_bytes / (1024 * 1024):.0f} MB."
+            )
+        return None
@@ -0,0 +1,356 @@
+"""
+Módulo de serviço para gerenciar a agenda de exames dos usuários.
+
+Este módulo define a classe ExamService, que grava os exames com um campo
+`when` (data e horário combinados, ordenável) e os consulta diretamente no
+Firestore: os próximos exames são lidos com filtro, ordenação e limite, e os
+exames concluídos formam um arquivo paginado por cursor. Assim, cada página
+lê apenas os exames que exibe, em vez de todos os já agendados.
+
+As consultas usam os índices compostos de `firestore.indexes.json`. Exames
+excluídos deixam um registro em `exames_excluidos`, usado pelas exportações
+incrementais da agenda (`core.calendar_export`). O título, o médico e o
+local dos exames entram no índice de busca do usuário.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from firebase_admin import firestore
+from .firebase_manager import FirebaseManager
+from .models import Exam, Tombstone
+from .search_index import SearchIndex
+
+# Quantidade máxima de próximos exames (e de exames atrasados) exibidos.
+UPCOMING_EXAMS_LIMIT = 50
+
+# Quantidade de exames concluídos por página do arquivo.
+ARCHIVE_PAGE_SIZE = 10
+
+# Documento, em `users/{uid}/meta`, que registra o preenchimento de `when`.
+EXAMS_SCHEMA_DOCUMENT = "exams"
+
+# Tipo dos exames no índice de busca (o nome da coleção).
+EXAMS_KIND = "exames"
+
+# Por quanto tempo os registros de exames excluídos são mantidos. Exportações
+# incrementais a partir de um ponto mais antigo são feitas por completo.
+TOMBSTONE_RETENTION = timedelta(days=90)
+
+
+def exam_moment(day: date, time_text: str) -> datetime:
+    """Combina a data e o horário ('HH:MM') de um exame em um datetime.
+
+    O horário é o de parede, sem fuso, e é gravado e comparado sempre da
+    mesma forma. Horários inválidos ou não informados contam como 00:00.
+
+    Args:
+        day (date): A data do exame.
+        time_text (str): O horário do exame, no formato 'HH:MM'.
+    """
+    try:
+        moment = datetime.strptime(time_text, "%H:%M").time()
+    except (TypeError, ValueError):
+        moment = datetime.min.time()
+    return datetime.combine(day, moment)
+
+
+def exam_text(title: str, doctor: str, local: str) -> str:
+    """Retorna o texto indexado de um exame (título, médico e local)."""
+    return f"{title}\n{doctor}\n{local}"
+
+
+class ExamService:
+    """Gerencia os exames de um usuário com consultas indexadas.
+
+    Attributes:
+        fb_manager (FirebaseManager): O gerenciador do Firebase.
+        user_uid (str): O UID do usuário dono dos exames.
+        search_index (SearchIndex): O índice de busca do usuário.
+    """
+
+    def __init__(self, firebase_manager: FirebaseManager, user_uid: str):
+        """Inicializa o serviço de exames de um usuário.
+
+        Args:
+            firebase_manager (FirebaseManager): Instância do gerenciador
+                do Firebase para interagir com o Firestore.
+            user_uid (str): O UID do usuário dono dos exames.
+        """
+        self.fb_manager = firebase_manager
+        self.user_uid = user_uid
+        self.search_index = SearchIndex(firebase_manager, user_uid)
+
+    @property
+    def exams_path(self) -> str:
+        """O caminho da coleção de exames do usuário."""
+        return f"users/{self.user_uid}/exames"
+
+    @property
+    def deleted_path(self) -> str:
+        """O caminho da coleção de exames excluídos do usuário."""
+        return f"users/{self.user_uid}/exames_excluidos"
+
+    @property
+    def meta_path(self) -> str:
+        """O caminho da coleção de dados agregados do usuário."""
+        return f"users/{self.user_uid}/meta"
+
+    def ensure_when_field(self) -> bool:
+        """Preenche, uma única vez, o campo `when` dos exames antigos.
+
+        Exames gravados antes do campo não aparecem nas consultas. Na primeira
+        execução, todos os exames são lidos e os que não têm `when` recebem o
+        valor calculado de `date` e `time` (ou a data de criação, se a data
+        for inválida). Um marcador em `meta` impede que a leitura completa se
+        repita.
+
+        Returns:
+            bool: True se os exames já estavam ou foram atualizados.
+        """
+        schema = self.fb_manager.get_document(self.meta_path, EXAMS_SCHEMA_DOCUMENT)
+        if schema and schema.get("when_backfilled"):
+            return True
+
+        operations = []
+        for exam in self.fb_manager.get_all_records(self.exams_path, Exam):
+            if exam.when is not None:
+                continue
+            if exam.date is not None:
+                when = exam_moment(exam.date, exam.time)
+            elif exam.created_at is not None:
+                when = exam.created_at
+            else:
+                continue
+            operations.append(
+                (
+                    self.exams_path,
+                    exam.id,
+                    {"when": when, "updated_at": firestore.SERVER_TIMESTAMP},
+                )
+            )
+        # O marcador vai no último lote: só é gravado se os exames foram.
+        operations.append(
+            (self.meta_path, EXAMS_SCHEMA_DOCUMENT, {"when_backfilled": True})
+        )
+        return self.fb_manager.batch_write(operations)
+
+    def ensure_search_index(self):
+        """Indexa, uma única vez, os exames criados antes do índice de busca."""
+        if self.search_index.is_built(EXAMS_KIND):
+            return
+        # Sem ordenação: exames antigos, ainda sem `when`, também são indexados.
+        exams = self.fb_manager.get_all_records(self.exams_path, Exam)
+        self.search_index.build(
+            EXAMS_KIND,
+            {exam.id: exam_text(exam.title, exam.doctor, exam.local) for exam in exams},
+            {exam.id: exam.title for exam in exams},
+        )
+
+    def create(
+        self,
+        title: str,
+        day: date,
+        time_text: str,
+        local: str,
+        doctor: str,
+        notes: str,
+    ) -> str | None:
+        """Agenda um novo exame.
+
+        Args:
+            title (str): A especialidade do exame.
+            day (date): A data do exame.
+            time_text (str): O horário do exame, no formato 'HH:MM'.
+            local (str): A clínica ou o hospital.
+            doctor (str): O nome do médico.
+            notes (str): Informações adicionais.
+
+        Returns:
+            str | None: O ID do exame criado, ou None em caso de erro.
+        """
+        doc_id = self.fb_manager.add_document(
+            self.exams_path,
+            {
+                "title": title,
+                "date": day.strftime("%Y-%m-%d"),
+                "time": time_text,
+                "when": exam_moment(day, time_text),
+                "local": local,
+                "doctor": doctor,
+                "notes": notes,
+                "created_at": firestore.SERVER_TIMESTAMP,
+                "updated_at": firestore.SERVER_TIMESTAMP,
+                "completed": False,
+            },
+        )
+        if doc_id:
+            self.search_index.update(
+                EXAMS_KIND, doc_id, "", exam_text(title, doctor, local), label=title
+            )
+        return doc_id
+
+    def upcoming(
+        self, now: datetime | None = None, limit: int = UPCOMING_EXAMS_LIMIT
+    ) -> list[Exam]:
+        """Retorna os próximos exames não concluídos, do mais próximo ao mais distante.
+
+        Args:
+            now (datetime | None): O momento de referência. Se None, usa o atual.
+            limit (int): A quantidade máxima de exames.
+        """
+        return self.fb_manager.query_records(
+            self.exams_path,
+            Exam,
+            filters=[("completed", "==", False), ("when", ">=", now or datetime.now())],
+            order_by=[("when", firestore.Query.ASCENDING)],
+            limit=limit,
+        )
+
+    def overdue(
+        self, now: datetime | None = None, limit: int = UPCOMING_EXAMS_LIMIT
+    ) -> list[Exam]:
+        """Retorna os exames não concluídos cuja data já passou, dos mais recentes aos antigos.
+
+        Args:
+            now (datetime | None): O momento de referência. Se None, usa o atual.
+            limit (int): A quantidade máxima de exames.
+        """
+        return self.fb_manager.query_records(
+            self.exams_path,
+            Exam,
+            filters=[("completed", "==", False), ("when", "<", now or datetime.now())],
+            order_by=[("when", firestore.Query.DESCENDING)],
+            limit=limit,
+        )
+
+    def archive_page(
+        self, cursor: dict | None = None, page_size: int = ARCHIVE_PAGE_SIZE
+    ) -> tuple[list[Exam], dict | None]:
+        """Retorna uma página do arquivo de exames concluídos, dos mais recentes aos antigos.
+
+        Args:
+            cursor (dict | None): O cursor devolvido pela página anterior, ou
+                                  None para a primeira página.
+            page_size (int): A quantidade de exames por página.
+
+        Returns:
+            tuple[list[Exam], dict | None]: Os exames da página e o cursor da
+                próxima página (None se esta for a última).
+        """
+        # Um exame a mais indica se existe uma próxima página.
+        exams = self.fb_manager.query_records(
+            self.exams_path,
+            Exam,
+            filters=[("completed", "==", True)],
+            order_by=[
+                ("when", firestore.Query.DESCENDING),
+                ("__name__", firestore.Query.DESCENDING),
+            ],
+            limit=page_size + 1,
+            start_after=cursor,
+        )
+        if len(exams) <= page_size:
+            return exams, None
+        exams = exams[:page_size]
+        last = exams[-1]
+        return exams, {"when": last.when, "__name__": last.id}
+
+    def complete(self, exam: Exam):
+        """Marca um exame como concluído, movendo-o para o arquivo.
+
+        Args:
+            exam (Exam): O exame a concluir.
+        """
+        self.fb_manager.update_document(
+            self.exams_path,
+            exam.id,
+            {"completed": True, "updated_at": firestore.SERVER_TIMESTAMP},
+        )
+
+    def delete(self, exam: Exam):
+        """Exclui um exame, registrando a exclusão para as exportações incrementais.
+
+        Args:
+            exam (Exam): O exame a excluir.
+        """
+        self.fb_manager.delete_document(self.exams_path, exam.id)
+        self.fb_manager.set_document(
+            self.deleted_path, exam.id, {"deleted_at": firestore.SERVER_TIMESTAMP}
+        )
+        self.search_index.update(
+            EXAMS_KIND, exam.id, exam_text(exam.title, exam.doctor, exam.local), ""
+        )
+
+    def iter_exams(self, since: datetime | None = None):
+        """Percorre os exames do usuário, página a página.
+
+        Args:
+            since (datetime | None): Se informado, apenas os exames alterados
+                                     depois deste momento.
+
+        Yields:
+            Exam: Os exames, por data (ou por alteração, com `since`).
+        """
+        if since is None:
+            return self.fb_manager.iter_records(
+                self.exams_path, Exam, order_by=[("when", firestore.Query.ASCENDING)]
+            )
+        return self.fb_manager.iter_records(
+            self.exams_path,
+            Exam,
+            filters=[("updated_at", ">", since)],
+            order_by=[("updated_at", firestore.Query.ASCENDING)],
+        )
+
+    def iter_deleted(self, since: datetime):
+        """Percorre os exames excluídos depois de um momento, página a página.
+
+        Args:
+            since (datetime): O momento a partir do qual as exclusões interessam.
+
+        Yields:
+            Tombstone: Os registros das exclusões, da mais antiga à mais recente.
+        """
+        return self.fb_manager.iter_records(
+            self.deleted_path,
+            Tombstone,
+            filters=[("deleted_at", ">", since)],
+            order_by=[("deleted_at", firestore.Query.ASCENDING)],
+        )
+
+    def prune_deleted(self) -> int:
+        """Remove os registros de exclusão mais antigos que `TOMBSTONE_RETENTION`.
+
+        Returns:
+            int: A quantidade de registros removidos.
+        """
+        cutoff = datetime.now(timezone.utc) - TOMBSTONE_RETENTION
+        expired = [
+            tombstone.id
+            for tombstone in self.fb_manager.iter_records(
+                self.deleted_path,
+                Tombstone,
+                filters=[("deleted_at", "<", cutoff)],
+                order_by=[("deleted_at", firestore.Query.ASCENDING)],
+            )
+        ]
+        for doc_id in expired:
+            self.fb_manager.delete_document(self.deleted_path, doc_id)
+        return len(expired)
+
+    def last_export_token(self) -> str | None:
+        """Retorna o token de sincronização da última exportação da agenda."""
+        schema = self.fb_manager.get_document(self.meta_path, EXAMS_SCHEMA_DOCUMENT)
+        return (schema or {}).get("export_token")
+
+    def save_export_token(self, token: str):
+        """Guarda o token de sincronização da exportação mais recente.
+
+        Os registros de exclusão expirados são removidos em seguida.
+
+        Args:
+            token (str): O token devolvido pela exportação.
+        """
+        self.fb_manager.batch_write(
+            [(self.meta_path, EXAMS_SCHEMA_DOCUMENT, {"export_token": token})]
+        )
+        self.prune_deleted()
@@ -0,0 +1,200 @@
+"""
+Módulo de comparação entre os totais de gastos por agregação e por leitura completa.
+
+Os relatórios e a página de gastos calculavam os totais baixando todos os
+gastos do usuário; hoje usam consultas de agregação do Firestore. Este módulo
+mede as duas abordagens sobre os dados reais de um usuário, com os mesmos
+totais (meses do relatório, categorias e tipos), e informa as leituras
+cobradas e a latência de cada uma. Executado pela linha de comando:
+
+    python -m core.expense_benchmark --key chave.json --bucket meu-bucket --user UID
+    python -m core.expense_benchmark --key chave.json --bucket meu-bucket --user UID --runs 5
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from datetime import date
+from .expense_service import (
+    CARD_EXPENSE,
+    EXPENSE_CATEGORIES,
+    FIXED_EXPENSE,
+    ExpenseService,
+    shift_month,
+)
+from .firebase_manager import FirebaseManager
+
+# Quantidade padrão de repetições de cada abordagem.
+DEFAULT_BENCHMARK_RUNS = 3
+
+# Meses calculados em cada repetição, como no gráfico dos relatórios.
+BENCHMARK_PAST_MONTHS = 5
+BENCHMARK_FUTURE_MONTHS = 6
+
+
+@dataclass
+class BenchmarkResult:
+    """O custo medido de uma abordagem.
+
+    Attributes:
+        approach (str): O nome da abordagem ('scan' ou 'aggregation').
+        runs (int): A quantidade de repetições.
+        reads (int): As leituras cobradas por repetição.
+        median_ms (float): A latência mediana, em milissegundos.
+        min_ms (float): A menor latência, em milissegundos.
+    """
+
+    approach: str
+    runs: int
+    reads: int
+    median_ms: float
+    min_ms: float
+
+
+def scan_totals(service: ExpenseService, months: list[date]) -> dict:
+    """Calcula os totais baixando todos os gastos (a abordagem anterior).
+
+    Args:
+        service (ExpenseService): O serviço de gastos do usuário.
+        months (list[date]): O primeiro dia de cada mês calculado.
+
+    Returns:
+        dict: Os totais por mês (`monthly`), por categoria (`categories`) e
+              por tipo (`types`).
+    """
+    monthly = defaultdict(float)
+    categories = defaultdict(float)
+    types = defaultdict(lambda: {"count": 0, "total": 0.0})
+    for expense in service.list_expenses():
+        types[expense.tipo]["count"] += 1
+        types[expense.tipo]["total"] += expense.valor
+        categories[expense.categoria] += expense.valor
+        if expense.data is None:
+            continue
+        if expense.tipo == FIXED_EXPENSE:
+            monthly[(expense.data.year, expense.data.month)] += expense.valor
+        elif expense.tipo == CARD_EXPENSE:
+            for offset in range(expense.parcelas):
+                month = shift_month(expense.data.year, expense.data.month, offset)
+                monthly[month] += expense.valor_parcela
+    return {
+        "monthly": {month: monthly[(month.year, month.month)] for month in months},
+        "categories": dict(categories),
+        "types": dict(types),
+    }
+
+
+def aggregation_totals(service: ExpenseService, months: list[date]) -> dict:
+    """Calcula os mesmos totais com consultas de agregação.
+
+    Args:
+        service (ExpenseService): O serviço de gastos do usuário.
+        months (list[date]): O primeiro dia de cada mês calculado.
+
+    Returns:
+        dict: Os totais por mês (`monthly`), por categoria (`categories`) e
+              por tipo (`types`).
+    """
+    monthly = service.monthly_spending(months) or {}
+    return {
+        "monthly": {month: totals["total"] for month, totals in monthly.items()},
+        "categories": service.category_totals(EXPENSE_CATEGORIES),
+        "types": {
+            expense_type: service.type_summary(expense_type)
+            for expense_type in (FIXED_EXPENSE, CARD_EXPENSE)
+        },
+    }
+
+
+def run_benchmark(
+    firebase_manager: FirebaseManager,
+    user_uid: str,
+    runs: int = DEFAULT_BENCHMARK_RUNS,
+) -> list[BenchmarkResult]:
+    """Mede as duas abordagens sobre os gastos de um usuário.
+
+    Args:
+        firebase_manager (FirebaseManager): O gerenciador do Firebase.
+        user_uid (str): O UID do usuário cujos gastos são usados.
+        runs (int): A quantidade de repetições de cada abordagem.
+
+    Returns:
+        list[BenchmarkResult]: O resultado da leitura completa e o das
+                               agregações, nesta ordem.
+    """
+    service = ExpenseService(firebase_manager, user_uid)
+    # As agregações somam os campos do esquema atual.
+    if not service.ensure_schema():
+        print(
+            "Aviso: a migração dos gastos falhou; as agregações não incluem "
+            "os gastos antigos.",
+            file=sys.stderr,
+        )
+    today = date.today()
+    months = [
+        date(*shift_month(today.year, today.month, offset), 1)
+        for offset in range(-BENCHMARK_PAST_MONTHS, BENCHMARK_FUTURE_MONTHS + 1)
+    ]
+
+    results = []
+    for approach, compute in (
+        ("scan", scan_totals),
+        ("aggregation", aggregation_totals),
+    ):
+        latencies = []
+        reads_before = firebase_manager.session_usage["reads"]
+        for _ in range(runs):
+            started = time.perf_counter()
+            compute(service, months)
+            latencies.append((time.perf_counter() - started) * 1000)
+        reads = firebase_manager.session_usage["reads"] - reads_before
+        results.append(
+            BenchmarkResult(
+                approach=approach,
+                runs=runs,
+                reads=reads // max(runs, 1),
+                median_ms=round(statistics.median(latencies), 1),
+                min_ms=round(min(latencies), 1),
+            )
+        )
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Ponto de entrada da linha de comando da comparação.
+
+    Args:
+        argv (list[str] | None): Os argumentos da linha de comando.
+
+    Returns:
+        int: O código de saída.
+    """
+    parser = argparse.ArgumentParser(
+        description="Compara o custo dos totais de gastos por agregação e por leitura completa."
+    )
+    parser.add_argument(
+        "--key", required=True, help="Caminho do JSON da conta de serviço."
+    )
+    parser.add_argument("--bucket", required=True, help="O bucket do Cloud Storage.")
+    parser.add_argument("--user", required=True, help="O UID do usuário.")
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=DEFAULT_BENCHMARK_RUNS,
+        help="Quantidade de repetições de cada abordagem.",
+    )
+    args = parser.parse_args(argv)
+
+    firebase_manager = FirebaseManager(args.key, args.bucket, web_api_key="")
+    results = run_benchmark(firebase_manager, args.user, args.runs)
+    json.dump([asdict(result) for result in results], sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
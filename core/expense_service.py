@@ -0,0 +1,542 @@
+"""
+Módulo de serviço para gerenciar os gastos dos usuários.
+
+Este módulo define a classe ExpenseService, que grava, edita e exclui os
+gastos no Firestore (coleção 'gastos'), mantendo as suas entradas no índice
+de busca do usuário atualizadas a cada gravação. Os totais (do mês, por tipo
+e por categoria) são calculados por consultas de agregação no Firestore, sem
+baixar os gastos: cada soma custa uma leitura a cada 1000 gastos somados.
+
+Os gastos seguem um esquema versionado (`schema_version`). No esquema 2, as
+datas (`data`, `criado_em` e `fim_parcelamento`) são Timestamps nativos e os
+valores (`valor_centavos` e `valor_parcela_centavos`) são inteiros em
+centavos, o que permite filtrar por intervalo de datas e somar sem erros de
+arredondamento. Os gastos do esquema 1 (datas em texto e valores em reais)
+são reescritos em lotes por `migrate_schema`, na primeira visita do usuário
+ou por `core.migrations`, para todos os usuários.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from firebase_admin import firestore
+from .firebase_manager import FIRESTORE_BATCH_LIMIT, FirebaseManager
+from .models import Expense
+from .request_context import submit_in_context
+from .search_index import SearchIndex
+
+# Tipo dos gastos no índice de busca (o nome da coleção).
+EXPENSES_KIND = "gastos"
+
+# Valores do campo `tipo` dos gastos.
+FIXED_EXPENSE = "Fixo"
+CARD_EXPENSE = "Cartão de Crédito"
+
+# Tipos de gasto oferecidos nos formulários.
+EXPENSE_TYPES = (FIXED_EXPENSE, CARD_EXPENSE)
+
+# Categorias de gasto oferecidas nos formulários.
+EXPENSE_CATEGORIES = [
+    "Necessário",
+    "Lazer",
+    "Imprevisto",
+    "Alimentação",
+    "Transporte",
+    "Educação",
+    "Moradia",
+    "Saúde",
+    "Outro",
+]
+
+# Categoria que acumula, nos totais, os gastos com categorias fora da lista
+# somada (categorias antigas ou digitadas à mão).
+OTHER_CATEGORY = "Outro"
+
+# Quantidade máxima de consultas de agregação simultâneas.
+AGGREGATION_WORKERS = 8
+
+# Versão atual do esquema dos gastos (Timestamps e valores em centavos).
+EXPENSES_SCHEMA_VERSION = 2
+
+# Documento, em `users/{uid}/meta`, que registra a versão dos gastos migrados.
+EXPENSES_SCHEMA_DOCUMENT = "expenses"
+
+
+def shift_month(year: int, month: int, months: int) -> tuple[int, int]:
+    """Soma `months` meses a um mês, retornando `(ano, mês)`."""
+    index = year * 12 + month - 1 + months
+    return index // 12, index % 12 + 1
+
+
+def installment_end(day: date, installments: int) -> date:
+    """Retorna o primeiro dia do mês da última parcela de uma compra parcelada.
+
+    Args:
+        day (date): A data da compra (mês da primeira parcela).
+        installments (int): A quantidade de parcelas.
+    """
+    year, month = shift_month(day.year, day.month, max(installments, 1) - 1)
+    return date(year, month, 1)
+
+
+def day_moment(day: date) -> datetime:
+    """Converte uma data no Timestamp gravado (meia-noite, sem fuso).
+
+    Como o `when` dos exames, o valor é gravado e comparado sempre da mesma
+    forma, e volta do Firestore como o mesmo dia.
+    """
+    return datetime(day.year, day.month, day.day)
+
+
+def to_cents(value: float) -> int:
+    """Converte um valor em reais em centavos."""
+    return round(value * 100)
+
+
+def expense_fields(values: dict) -> dict:
+    """Converte os campos de um gasto, como informados, para o esquema atual.
+
+    Valores em reais (`valor` e `valor_parcela`) viram centavos e a data
+    (`data`, um date) vira Timestamp; os demais campos são mantidos.
+
+    Args:
+        values (dict): Os campos informados no formulário.
+
+    Returns:
+        dict: Os campos prontos para gravar.
+    """
+    fields = dict(values)
+    for name in ("valor", "valor_parcela"):
+        if name in fields:
+            fields[f"{name}_centavos"] = to_cents(fields.pop(name))
+    if isinstance(fields.get("data"), date):
+        fields["data"] = day_moment(fields["data"])
+    return fields
+
+
+def upgraded_expense(expense: Expense) -> dict:
+    """Retorna os campos que levam um gasto do esquema 1 ao esquema atual.
+
+    Os campos são mesclados ao documento: os valores em reais são removidos
+    e os campos ilegíveis (datas inválidas) são mantidos como estão.
+
+    Args:
+        expense (Expense): O gasto lido do documento antigo.
+    """
+    fields = {
+        "valor_centavos": expense.valor_centavos,
+        "valor": firestore.DELETE_FIELD,
+        "valor_parcela": firestore.DELETE_FIELD,
+        "schema_version": EXPENSES_SCHEMA_VERSION,
+    }
+    if expense.data is not None:
+        fields["data"] = day_moment(expense.data)
+    if expense.criado_em is not None:
+        fields["criado_em"] = expense.criado_em
+    if expense.tipo == CARD_EXPENSE:
+        fields["valor_parcela_centavos"] = expense.valor_parcela_centavos
+        end = (
+            installment_end(expense.data, expense.parcelas)
+            if expense.data is not None
+            else expense.fim_parcelamento
+        )
+        if end is not None:
+            fields["fim_parcelamento"] = day_moment(end)
+    return fields
+
+
+def expense_text(description: str, category: str) -> str:
+    """Retorna o texto indexado de um gasto (descrição e categoria)."""
+    return f"{description}\n{category}"
+
+
+class ExpenseService:
+    """Gerencia os gastos de um usuário e as suas entradas no índice de busca.
+
+    Attributes:
+        fb_manager (FirebaseManager): O gerenciador do Firebase.
+        user_uid (str): O UID do usuário dono dos gastos.
+        search_index (SearchIndex): O índice de busca do usuário.
+    """
+
+    def __init__(self, firebase_manager: FirebaseManager, user_uid: str):
+        """Inicializa o serviço de gastos de um usuário.
+
+        Args:
+            firebase_manager (FirebaseManager): Instância do gerenciador
+                do Firebase para interagir com o Firestore.
+            user_uid (str): O UID do usuário dono dos gastos.
+        """
+        self.fb_manager = firebase_manager
+        self.user_uid = user_uid
+        self.search_index = SearchIndex(firebase_manager, user_uid)
+
+    @property
+    def expenses_path(self) -> str:
+        """O caminho da coleção de gastos do usuário."""
+        return f"users/{self.user_uid}/gastos"
+
+    @property
+    def meta_path(self) -> str:
+        """O caminho da coleção de dados agregados do usuário."""
+        return f"users/{self.user_uid}/meta"
+
+    def is_migrated(self) -> bool:
+        """Indica se os gastos do usuário já foram migrados para o esquema atual."""
+        schema = self.fb_manager.get_document(self.meta_path, EXPENSES_SCHEMA_DOCUMENT)
+        version = (schema or {}).get("schema_version", 0)
+        return version >= EXPENSES_SCHEMA_VERSION
+
+    def ensure_schema(self) -> bool:
+        """Migra, uma única vez, os gastos do usuário para o esquema atual.
+
+        As consultas de agregação filtram e somam os campos do esquema atual;
+        gastos antigos não migrados ficariam fora dos totais. Um marcador em
+        `meta` evita ler os gastos novamente depois da migração.
+
+        Returns:
+            bool: True se os gastos já estavam ou foram migrados.
+        """
+        return self.is_migrated() or self.migrate_schema() is not None
+
+    def migrate_schema(self, dry_run: bool = False) -> dict | None:
+        """Reescreve os gastos do esquema 1 no esquema atual, em lotes.
+
+        Os gastos são lidos página a página e cada página é gravada em um
+        lote antes da leitura da próxima: se a migração for interrompida, os
+        gastos já gravados estão no esquema atual e são ignorados na
+        execução seguinte, que continua dos restantes. Executar a migração de
+        novo não altera nada. O marcador em `meta` vai no último lote.
+
+        Args:
+            dry_run (bool): Se True, apenas conta os gastos a migrar.
+
+        Returns:
+            dict | None: A quantidade de gastos lidos (`scanned`) e
+                         migrados, ou a migrar (`migrated`), ou None se uma
+                         leitura ou gravação falhar.
+        """
+        scanned = migrated = 0
+        operations = []
+        try:
+            for expense in self.fb_manager.iter_records(
+                self.expenses_path, Expense, page_size=FIRESTORE_BATCH_LIMIT
+            ):
+                scanned += 1
+                if expense.schema_version >= EXPENSES_SCHEMA_VERSION:
+                    continue
+                migrated += 1
+                operations.append(
+                    (self.expenses_path, expense.id, upgraded_expense(expense))
+                )
+                if len(operations) == FIRESTORE_BATCH_LIMIT:
+                    if not dry_run and not self.fb_manager.batch_write(operations):
+                        return None
+                    operations = []
+        except Exception as e:
+            print(f"Erro ao migrar os gastos do usuário {self.user_uid}: {e}")
+            return None
+
+        if not dry_run:
+            operations.append(
+                (
+                    self.meta_path,
+                    EXPENSES_SCHEMA_DOCUMENT,
+                    {"schema_version": EXPENSES_SCHEMA_VERSION},
+                )
+            )
+            if not self.fb_manager.batch_write(operations):
+                return None
+        return {"scanned": scanned, "migrated": migrated}
+
+    def list_expenses(self) -> list[Expense]:
+        """Retorna todos os gastos do usuário."""
+        return self.fb_manager.get_all_records(self.expenses_path, Expense)
+
+    def ensure_search_index(self):
+        """Indexa, uma única vez, os gastos registrados antes do índice de busca."""
+        if self.search_index.is_built(EXPENSES_KIND):
+            return
+        expenses = self.list_expenses()
+        self.search_index.build(
+            EXPENSES_KIND,
+            {
+                expense.id: expense_text(expense.descricao, expense.categoria)
+                for expense in expenses
+            },
+            {expense.id: expense.descricao for expense in expenses},
+        )
+
+    def list_by_type(self, expense_type: str) -> list[Expense]:
+        """Retorna os gastos de um tipo, dos mais recentes aos mais antigos.
+
+        Args:
+            expense_type (str): O tipo dos gastos (`FIXED_EXPENSE` ou
+                                `CARD_EXPENSE`).
+        """
+        expenses = self.fb_manager.query_records(
+            self.expenses_path, Expense, filters=[("tipo", "==", expense_type)]
+        )
+        return sorted(expenses, key=lambda x: x.data or date.max, reverse=True)
+
+    def list_other_types(
+        self, expense_types: tuple[str, ...] = EXPENSE_TYPES
+    ) -> list[Expense]:
+        """Retorna os gastos com tipos fora de `expense_types`, dos mais recentes.
+
+        Gastos sem o campo `tipo` não aparecem em consultas com filtro, então
+        todos os gastos são lidos e filtrados aqui. A página só chama este
+        método quando `other_types_summary` encontra gastos desse grupo.
+
+        Args:
+            expense_types (tuple[str, ...]): Os tipos listados à parte.
+        """
+        expenses = [
+            expense
+            for expense in self.list_expenses()
+            if expense.tipo not in expense_types
+        ]
+        return sorted(expenses, key=lambda x: x.data or date.max, reverse=True)
+
+    def type_summary(self, expense_type: str | None) -> dict | None:
+        """Resume os gastos de um tipo com uma única consulta de agregação.
+
+        Args:
+            expense_type (str | None): O tipo dos gastos. Se None, resume
+                                       todos os gastos.
+
+        Returns:
+            dict | None: `count`, `total` e `average` (valor médio, ou None
+                         sem gastos, em reais) do tipo, ou None em caso de erro.
+        """
+        values = self.fb_manager.aggregate(
+            self.expenses_path,
+            {
+                "count": ("count", None),
+                "total": ("sum", "valor_centavos"),
+                "average": ("avg", "valor_centavos"),
+            },
+            filters=[("tipo", "==", expense_type)] if expense_type else [],
+        )
+        if values is None:
+            return None
+        average = values["average"]
+        return {
+            "count": values["count"],
+            "total": (values["total"] or 0) / 100,
+            "average": average / 100 if average is not None else None,
+        }
+
+    def other_types_summary(self, summaries: dict[str, dict | None]) -> dict | None:
+        """Resume os gastos com tipos fora dos já resumidos (o restante).
+
+        O resumo é a diferença entre o de todos os gastos e os de
+        `summaries`, de modo que gastos com tipos antigos, digitados à mão ou
+        sem tipo também entram nos totais da página.
+
+        Args:
+            summaries (dict[str, dict | None]): Os resumos de `type_summary`,
+                                                por tipo.
+
+        Returns:
+            dict | None: `count`, `total` e `average` do restante, como em
+                         `type_summary`, ou None em caso de erro.
+        """
+        overall = self.type_summary(None)
+        if overall is None or any(summary is None for summary in summaries.values()):
+            return None
+        count = overall["count"] - sum(s["count"] for s in summaries.values())
+        total = round(overall["total"] - sum(s["total"] for s in summaries.values()), 2)
+        return {
+            "count": count,
+            "total": total,
+            "average": total / count if count else None,
+        }
+
+    def _run_concurrently(self, calls: dict) -> dict:
+        """Executa chamadas independentes em paralelo, na execução atual.
+
+        Args:
+            calls (dict): Tuplas `(função, *argumentos)`, por nome.
+
+        Returns:
+            dict: O resultado de cada chamada, por nome.
+        """
+        with ThreadPoolExecutor(
+            max_workers=AGGREGATION_WORKERS, thread_name_prefix="sigp-aggregate"
+        ) as executor:
+            futures = {
+                name: submit_in_context(executor, *call) for name, call in calls.items()
+            }
+        return {name: future.result() for name, future in futures.items()}
+
+    def category_totals(
+        self, categories: list[str] = EXPENSE_CATEGORIES
+    ) -> dict[str, float] | None:
+        """Soma o valor total dos gastos de cada categoria, em paralelo.
+
+        Uma soma sem filtro acompanha as das categorias; a diferença (gastos
+        com categorias fora da lista, antigas ou digitadas à mão) é somada a
+        `OTHER_CATEGORY`, para que os totais cubram todos os gastos.
+
+        Args:
+            categories (list[str]): As categorias somadas.
+
+        Returns:
+            dict[str, float] | None: O total, em reais, de cada categoria com
+                                     gastos, ou None se alguma soma falhar.
+        """
+        calls = {
+            category: (
+                self.fb_manager.sum_field,
+                self.expenses_path,
+                "valor_centavos",
+                [("categoria", "==", category)],
+            )
+            for category in categories
+        }
+        calls[None] = (self.fb_manager.sum_field, self.expenses_path, "valor_centavos")
+        totals = self._run_concurrently(calls)
+        if any(total is None for total in totals.values()):
+            return None
+        overall = totals.pop(None)
+        remainder = overall - sum(totals.values())
+        if remainder:
+            totals[OTHER_CATEGORY] = totals.get(OTHER_CATEGORY, 0) + remainder
+        return {category: total / 100 for category, total in totals.items() if total}
+
+    def month_spending(self, today: date | None = None) -> dict | None:
+        """Calcula os gastos de um mês com duas consultas de agregação.
+
+        Entram os gastos fixos com data no mês e as parcelas, no mês, das
+        compras no cartão ainda não quitadas (compradas até o mês e com a
+        última parcela a partir dele), como nos relatórios financeiros. A
+        soma das parcelas filtra intervalos em dois campos (`data` e
+        `fim_parcelamento`), com o índice composto de `firestore.indexes.json`
+        (a igualdade em `tipo`, os intervalos na ordem alfabética dos campos e
+        o ID do documento, como o Firestore exige).
+
+        Args:
+            today (date | None): Um dia do mês consultado. Se None, o atual.
+
+        Returns:
+            dict | None: Os totais `fixed`, `installments` e `total`, em
+                         reais, ou None em caso de erro.
+        """
+        today = today or date.today()
+        month_start = day_moment(today.replace(day=1))
+        next_month_start = day_moment(date(*shift_month(today.year, today.month, 1), 1))
+
+        fixed = self.fb_manager.sum_field(
+            self.expenses_path,
+            "valor_centavos",
+            filters=[
+                ("tipo", "==", FIXED_EXPENSE),
+                ("data", ">=", month_start),
+                ("data", "<", next_month_start),
+            ],
+        )
+        installments = self.fb_manager.sum_field(
+            self.expenses_path,
+            "valor_parcela_centavos",
+            filters=[
+                ("tipo", "==", CARD_EXPENSE),
+                ("fim_parcelamento", ">=", month_start),
+                ("data", "<", next_month_start),
+            ],
+        )
+        if fixed is None or installments is None:
+            return None
+        return {
+            "fixed": fixed / 100,
+            "installments": installments / 100,
+            "total": (fixed + installments) / 100,
+        }
+
+    def monthly_spending(self, months: list[date]) -> dict[date, dict] | None:
+        """Calcula os gastos de vários meses, com os meses em paralelo.
+
+        Args:
+            months (list[date]): Um dia de cada mês consultado.
+
+        Returns:
+            dict[date, dict] | None: Os totais de `month_spending` de cada
+                                     mês, ou None se algum falhar.
+        """
+        spending = self._run_concurrently(
+            {month: (self.month_spending, month) for month in months}
+        )
+        if any(totals is None for totals in spending.values()):
+            return None
+        return spending
+
+    def create(self, data: dict) -> str | None:
+        """Registra um gasto e o adiciona ao índice de busca.
+
+        Os valores são informados em reais e a data como date (veja
+        `expense_fields`); o mês da última parcela das compras no cartão e a
+        data de criação são preenchidos aqui.
+
+        Args:
+            data (dict): Os dados do gasto.
+
+        Returns:
+            str | None: O ID do gasto criado, ou None em caso de erro.
+        """
+        document = {
+            **expense_fields(data),
+            "criado_em": firestore.SERVER_TIMESTAMP,
+            "schema_version": EXPENSES_SCHEMA_VERSION,
+        }
+        if data.get("tipo") == CARD_EXPENSE and isinstance(data.get("data"), date):
+            document["fim_parcelamento"] = day_moment(
+                installment_end(data["data"], data.get("parcelas", 1))
+            )
+        doc_id = self.fb_manager.add_document(self.expenses_path, document)
+        if doc_id:
+            self.search_index.update(
+                EXPENSES_KIND,
+                doc_id,
+                "",
+                expense_text(data.get("descricao", ""), data.get("categoria", "")),
+                label=data.get("descricao"),
+            )
+        return doc_id
+
+    def update(self, expense: Expense, data: dict):
+        """Atualiza um gasto e os termos alterados no índice de busca.
+
+        Se a quantidade de parcelas mudar, o mês da última parcela também é
+        recalculado.
+
+        Args:
+            expense (Expense): O gasto antes da edição.
+            data (dict): Os campos alterados, com os valores em reais.
+        """
+        fields = expense_fields(data)
+        if "parcelas" in data and expense.data is not None:
+            fields["fim_parcelamento"] = day_moment(
+                installment_end(expense.data, data["parcelas"])
+            )
+        self.fb_manager.update_document(self.expenses_path, expense.id, fields)
+        description = data.get("descricao", expense.descricao)
+        self.search_index.update(
+            EXPENSES_KIND,
+            expense.id,
+            expense_text(expense.descricao, expense.categoria),
+            expense_text(description, data.get("categoria", expense.categoria)),
+            label=description,
+        )
+
+    def delete(self, expense: Expense):
+        """Exclui um gasto e as suas entradas no índice de busca.
+
+        Args:
+            expense (Expense): O gasto a excluir.
+        """
+        self.fb_manager.delete_document(self.expenses_path, expense.id)
+        self.search_index.update(
+            EXPENSES_KIND,
+            expense.id,
+            expense_text(expense.descricao, expense.categoria),
+            "",
+        )
@@ -8,12 +8,128 @@ O objetivo é simplificar as operações de CRUD e o manuseio de arquivos
 em outras partes do projeto.
 """
 
+import copy
 import firebase_admin
+import math
 import requests
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 from firebase_admin import credentials, firestore, storage, auth
 from firebase_admin.auth import UserRecord
+from google.api_core.exceptions import NotFound
+from .byte_cache import get_byte_cache
+from .instrumentation import (
+    argument_size,
+    current_metrics,
+    estimate_size,
+    finish_run_metrics,
+    instrumented,
+    result_size,
+    start_run_metrics,
+)
+from .request_context import (
+    RequestContext,
+    activate_context,
+    current_context,
+    deactivate_context,
+)
+from .models import to_record
+from .usage_accounting import get_usage_ledger
 import requests
 
+# Tamanho padrão do cache de conteúdo de arquivos baixados, compartilhado
+# por todas as sessões do processo.
+DEFAULT_DOWNLOAD_CACHE_BYTES = 64 * 1024 * 1024
+
+# Tamanho de cada bloco dos uploads em streaming. O Cloud Storage exige
+# múltiplos de 256 KB; este valor limita a memória usada por upload.
+DEFAULT_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Quantidade máxima de operações em uma gravação em lote do Firestore.
+FIRESTORE_BATCH_LIMIT = 500
+
+# Limites das leituras de coleções guardadas por sessão no modo econômico:
+# quantidade de coleções, bytes estimados e por quanto tempo (em segundos)
+# uma leitura é reaproveitada, já que escritas de outras sessões não a
+# invalidam.
+ECONOMY_CACHE_ENTRIES = 32
+ECONOMY_CACHE_BYTES = 8 * 1024 * 1024
+ECONOMY_CACHE_TTL = 300
+
+# Nome da contagem acrescentada às agregações que não a pedem: somas e médias
+# também são cobradas pelas entradas percorridas, que só a contagem informa.
+BILLING_COUNT_ALIAS = "_billed_entries"
+
+# Validade das URLs assinadas dos arquivos e a antecedência com que uma URL
+# em cache é renovada, para que nenhum link exibido expire logo em seguida.
+SIGNED_URL_TTL = timedelta(hours=1)
+SIGNED_URL_REFRESH_MARGIN = timedelta(minutes=5)
+
+# Campo que marca um contador de referências liberado cujo recurso ainda
+# está sendo removido (ver `release_reference`).
+TOMBSTONE_FIELD = "released"
+
+
+@dataclass(slots=True, frozen=True)
+class FileInfo:
+    """Os dados básicos de um arquivo do Cloud Storage, obtidos na listagem."""
+
+    name: str
+    size: int
+    content_type: str | None
+    updated: datetime | None
+
+
+def _increment_payload(increments: dict) -> dict:
+    """Converte valores numéricos (inclusive em mapas aninhados) em `Increment`."""
+    return {
+        field: (
+            _increment_payload(amount)
+            if isinstance(amount, dict)
+            else firestore.Increment(amount)
+        )
+        for field, amount in increments.items()
+    }
+
+
+def _streamed_size(result, args, kwargs) -> int:
+    """Bytes enviados por `upload_stream`, informados pelo argumento `size`."""
+    return kwargs.get("size") or 0
+
+
+class _ProgressReader:
+    """Envolve um arquivo e notifica o progresso a cada bloco lido.
+
+    O cliente do Cloud Storage lê o arquivo bloco a bloco durante o upload
+    resumível; cada leitura atualiza o total enviado e chama o callback.
+    """
+
+    def __init__(self, stream, total_size: int | None, on_progress: callable = None):
+        self._stream = stream
+        self._total_size = total_size
+        self._on_progress = on_progress
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._stream.read(size)
+        self.bytes_read += len(chunk)
+        if self._on_progress is not None:
+            self._on_progress(self.bytes_read, self._total_size)
+        return chunk
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        position = self._stream.seek(offset, whence)
+        self.bytes_read = position
+        return position
+
+    def tell(self) -> int:
+        return self._stream.tell()
+
 
 class FirebaseManager:
     """Gerencia a conexão e as operações com os serviços do Firebase.
@@ -27,9 +143,22 @@ class FirebaseManager:
         bucket: Instância do cliente do Cloud Storage para operações de
                 armazenamento de arquivos.
         web_api_key (str): A chave de API web pública do Firebase para chamadas de cliente.
+        session_id (str): Identificador da sessão, usado na contabilização de custos.
+        session_usage (dict): Documentos lidos, escritos e excluídos nesta sessão.
+        read_budget (int | None): Limite de leituras da sessão antes de passar
+                                  ao modo econômico (leituras em cache).
+        file_cache (ByteLRUCache): Cache do conteúdo dos arquivos baixados.
     """
 
-    def __init__(self, key_path: str, storage_bucket: str, web_api_key: str):
+    def __init__(
+        self,
+        key_path: str,
+        storage_bucket: str,
+        web_api_key: str,
+        usage_dir: str = ".sigp/usage",
+        read_budget: int | None = None,
+        download_cache_bytes: int = DEFAULT_DOWNLOAD_CACHE_BYTES,
+    ):
         """Inicializa a conexão com o Firebase usando uma chave de serviço.
 
         Args:
@@ -38,6 +167,11 @@ class FirebaseManager:
             storage_bucket (str): O URL do bucket do Firebase Cloud Storage
                                   (ex: 'seu-projeto.appspot.com').
             web_api_key (str): A chave de API web pública do Firebase.
+            usage_dir (str): Diretório local das consolidações diárias de uso.
+            read_budget (int | None): Limite de documentos lidos por sessão.
+                                      Se None, não há limite.
+            download_cache_bytes (int): Tamanho máximo, em bytes, do cache de
+                                        arquivos baixados.
         """
         try:
             # Inicializa o app apenas se ainda não houver um inicializado.
@@ -51,8 +185,156 @@ class FirebaseManager:
         self.bucket = storage.bucket()
         self.web_api_key = web_api_key
 
+        self.session_id = uuid.uuid4().hex
+        self.session_usage = {"reads": 0, "writes": 0, "deletes": 0}
+        self.read_budget = read_budget
+        self._usage_ledger = get_usage_ledger(usage_dir)
+        self._usage_lock = threading.Lock()
+        self._collection_cache: OrderedDict[str, tuple] = OrderedDict()
+        self._collection_cache_bytes = 0
+        self._signed_urls: dict[str, tuple[str, float]] = {}
+        self._signed_urls_lock = threading.Lock()
+        self.file_cache = get_byte_cache(download_cache_bytes)
+
+    # --- CONTEXTO DE EXECUÇÃO ---
+
+    @contextmanager
+    def request_scope(self):
+        """Abre um contexto de requisições válido por uma execução do script.
+
+        Dentro do contexto, chamadas idênticas a `get_document` e
+        `get_all_documents` são feitas apenas uma vez, e chamadores
+        simultâneos compartilham o resultado da leitura em andamento.
+        Escritas em uma coleção descartam as leituras memorizadas dela.
+        As métricas de desempenho da execução também são coletadas neste
+        escopo e emitidas como logs estruturados ao final.
+        """
+        metrics_token = start_run_metrics()
+        context = RequestContext()
+        token = activate_context(context)
+        try:
+            yield
+        finally:
+            deactivate_context(token)
+            finish_run_metrics(metrics_token)
+            self._usage_ledger.add(
+                context.user_uid, self.session_id, context.page, context.usage
+            )
+            self._usage_ledger.flush_if_due()
+
+    def set_run_labels(self, user_uid: str | None, page: str | None):
+        """Identifica o usuário e a página da execução atual.
+
+        Os rótulos são usados para atribuir as métricas de desempenho e as
+        operações cobradas pelo Firestore a quem e ao que as originou.
+
+        Args:
+            user_uid (str | None): O UID do usuário autenticado.
+            page (str | None): O nome da página sendo renderizada.
+        """
+        context = current_context()
+        if context is not None:
+            context.user_uid = user_uid
+            context.page = page
+        metrics = current_metrics()
+        if metrics is not None:
+            metrics.page = page
+
+    def read_budget_exceeded(self) -> bool:
+        """Indica se a sessão já ultrapassou seu limite de leituras.
+
+        Returns:
+            bool: True se houver um limite configurado e ele já foi atingido.
+        """
+        return (
+            self.read_budget is not None
+            and self.session_usage["reads"] >= self.read_budget
+        )
+
+    def _count_usage(self, operation: str, amount: int = 1):
+        """Contabiliza documentos lidos, escritos ou excluídos.
+
+        Args:
+            operation (str): 'reads', 'writes' ou 'deletes'.
+            amount (int): A quantidade de documentos afetados.
+        """
+        with self._usage_lock:
+            self.session_usage[operation] += amount
+
+        context = current_context()
+        if context is not None:
+            context.count_usage(operation, amount)
+        else:
+            self._usage_ledger.add(None, self.session_id, None, {operation: amount})
+
+    def _invalidate_reads(self, collection_name: str):
+        """Descarta as leituras memorizadas de uma coleção no contexto atual.
+
+        Args:
+            collection_name (str): O nome da coleção que foi modificada.
+        """
+        with self._usage_lock:
+            entry = self._collection_cache.pop(collection_name, None)
+            if entry is not None:
+                self._collection_cache_bytes -= entry[1]
+
+        context = current_context()
+        if context is not None:
+            context.invalidate(collection_name)
+
+    def _cached_collection(self, collection_name: str) -> list[dict] | None:
+        """Retorna uma cópia da leitura guardada de uma coleção, se ainda válida.
+
+        Args:
+            collection_name (str): O nome da coleção.
+
+        Returns:
+            list[dict] | None: Os documentos, ou None se não houver leitura
+                               guardada ou se ela expirou.
+        """
+        with self._usage_lock:
+            entry = self._collection_cache.get(collection_name)
+            if entry is None:
+                return None
+            stored_at, size, documents = entry
+            if time.monotonic() - stored_at >= ECONOMY_CACHE_TTL:
+                del self._collection_cache[collection_name]
+                self._collection_cache_bytes -= size
+                return None
+            self._collection_cache.move_to_end(collection_name)
+        return copy.deepcopy(documents)
+
+    def _cache_collection(self, collection_name: str, documents: list[dict]):
+        """Guarda uma cópia da leitura de uma coleção para o modo econômico.
+
+        As leituras menos usadas são descartadas quando os limites de
+        `ECONOMY_CACHE_ENTRIES` coleções ou `ECONOMY_CACHE_BYTES` bytes são
+        ultrapassados; coleções maiores que o limite de bytes não são guardadas.
+
+        Args:
+            collection_name (str): O nome da coleção.
+            documents (list[dict]): Os documentos lidos.
+        """
+        size = estimate_size(documents)
+        if size > ECONOMY_CACHE_BYTES:
+            return
+        entry = (time.monotonic(), size, copy.deepcopy(documents))
+        with self._usage_lock:
+            previous = self._collection_cache.pop(collection_name, None)
+            if previous is not None:
+                self._collection_cache_bytes -= previous[1]
+            self._collection_cache[collection_name] = entry
+            self._collection_cache_bytes += size
+            while (
+                len(self._collection_cache) > ECONOMY_CACHE_ENTRIES
+                or self._collection_cache_bytes > ECONOMY_CACHE_BYTES
+            ):
+                _, (_, evicted_size, _) = self._collection_cache.popitem(last=False)
+                self._collection_cache_bytes -= evicted_size
+
     # --- MÉTODOS DO FIRESTORE (BANCO DE DADOS) ---
 
+    @instrumented("firestore", size_of=argument_size(2))
     def add_document(self, collection_name: str, data: dict) -> str | None:
         """Adiciona um novo documento a uma coleção do Firestore.
 
@@ -66,10 +348,105 @@ class FirebaseManager:
         """
         try:
             _, doc_ref = self.db.collection(collection_name).add(data)
+            self._count_usage("writes")
             return doc_ref.id
         except Exception:
             return None
+        finally:
+            self._invalidate_reads(collection_name)
+
+    def new_document_id(self, collection_name: str) -> str:
+        """Gera o ID de um novo documento de uma coleção, sem acessar o Firestore.
+
+        Útil para gravar, em um mesmo lote, um documento novo e outros que
+        dependem do seu ID.
+
+        Args:
+            collection_name (str): O nome da coleção do documento.
 
+        Returns:
+            str: Um ID aleatório, como os gerados por `add_document`.
+        """
+        return self.db.collection(collection_name).document().id
+
+    @instrumented("firestore", size_of=argument_size(2))
+    def add_documents(
+        self, collection_name: str, items: list[dict]
+    ) -> list[str | None]:
+        """Adiciona vários documentos a uma coleção em gravações em lote.
+
+        Os documentos são enviados em lotes de até 500 (limite do Firestore),
+        cada lote aplicado de forma atômica. Se um lote falhar, os seguintes
+        não são enviados, e os anteriores permanecem aplicados.
+
+        Args:
+            collection_name (str): O nome da coleção onde os documentos
+                                   serão adicionados.
+            items (list[dict]): Os dados de cada documento.
+
+        Returns:
+            list[str | None]: Os IDs dos documentos criados, na mesma ordem
+                              de `items`, com None nos documentos dos lotes
+                              que não foram aplicados.
+        """
+        collection = self.db.collection(collection_name)
+        doc_ids = []
+        try:
+            for start in range(0, len(items), FIRESTORE_BATCH_LIMIT):
+                chunk = items[start : start + FIRESTORE_BATCH_LIMIT]
+                batch = self.db.batch()
+                chunk_ids = []
+                for data in chunk:
+                    doc_ref = collection.document()
+                    batch.set(doc_ref, data)
+                    chunk_ids.append(doc_ref.id)
+                batch.commit()
+                doc_ids.extend(chunk_ids)
+                self._count_usage("writes", len(chunk))
+            return doc_ids
+        except Exception as e:
+            print(f"Erro ao adicionar documentos em lote: {e}")
+            return doc_ids + [None] * (len(items) - len(doc_ids))
+        finally:
+            self._invalidate_reads(collection_name)
+
+    @instrumented("firestore", size_of=argument_size(1))
+    def batch_write(self, operations: list[tuple]) -> bool:
+        """Mescla dados em vários documentos por meio de gravações em lote.
+
+        As operações são enviadas em lotes de até 500 (limite do Firestore);
+        cada lote é aplicado de forma atômica. Valores `firestore.DELETE_FIELD`
+        removem o campo correspondente.
+
+        Args:
+            operations (list[tuple]): Tuplas `(coleção, id, dados)`; os dados
+                são mesclados ao documento, que é criado se não existir.
+
+        Returns:
+            bool: True se todos os lotes foram aplicados, False caso contrário
+                  (os lotes anteriores ao erro permanecem aplicados).
+        """
+        try:
+            for start in range(0, len(operations), FIRESTORE_BATCH_LIMIT):
+                chunk = operations[start : start + FIRESTORE_BATCH_LIMIT]
+                batch = self.db.batch()
+                for collection_name, document_id, data in chunk:
+                    batch.set(
+                        self.db.collection(collection_name).document(document_id),
+                        data,
+                        merge=True,
+                    )
+                batch.commit()
+                self._count_usage("writes", len(chunk))
+            return True
+        except Exception as e:
+            print(f"Erro na gravação em lote: {e}")
+            return False
+        finally:
+            for collection_name in {operation[0] for operation in operations}:
+                self._invalidate_reads(collection_name)
+
+    @instrumented("firestore", size_of=argument_size(3))
     def set_document(self, collection_name: str, document_id: str, data: dict):
         """Cria ou sobrescreve um documento no Firestore.
 
@@ -83,9 +460,13 @@ class FirebaseManager:
         """
         try:
             self.db.collection(collection_name).document(document_id).set(data)
+            self._count_usage("writes")
         except Exception:
             pass
+        finally:
+            self._invalidate_reads(collection_name)
 
+    @instrumented("firestore", size_of=result_size)
     def get_document(self, collection_name: str, document_id: str) -> dict | None:
         """Busca um único documento do Firestore pelo seu ID.
 
@@ -97,31 +478,452 @@ class FirebaseManager:
             dict | None: Um dicionário com os dados do documento, ou None se
                          o documento não for encontrado ou em caso de erro.
         """
+        context = current_context()
+        if context is None:
+            return self._fetch_document(collection_name, document_id)
+
+        data = context.coalesce(
+            ("get_document", collection_name, document_id),
+            lambda: self._fetch_document(collection_name, document_id),
+        )
+        # Cada chamador recebe sua própria cópia, pois as páginas alteram os dicionários.
+        return dict(data) if data is not None else None
+
+    def _fetch_document(self, collection_name: str, document_id: str) -> dict | None:
+        """Lê um documento diretamente do Firestore, sem deduplicação."""
         try:
             doc = self.db.collection(collection_name).document(document_id).get()
+            self._count_usage("reads")
             if doc.exists:
                 return doc.to_dict()
             return None
         except Exception:
             return None
 
+    @instrumented("firestore", size_of=result_size)
+    def get_documents(
+        self, collection_name: str, document_ids: list[str]
+    ) -> dict[str, dict]:
+        """Busca vários documentos de uma coleção em uma única requisição.
+
+        Args:
+            collection_name (str): O nome da coleção dos documentos.
+            document_ids (list[str]): Os IDs dos documentos.
+
+        Returns:
+            dict[str, dict]: Os dados de cada documento existente, por ID.
+                             Documentos inexistentes são omitidos.
+        """
+        if not document_ids:
+            return {}
+        collection = self.db.collection(collection_name)
+        try:
+            snapshots = list(
+                self.db.get_all(
+                    [collection.document(doc_id) for doc_id in document_ids]
+                )
+            )
+        except Exception as e:
+            print(f"Erro ao buscar documentos: {e}")
+            return {}
+        # Documentos inexistentes também são cobrados como leitura.
+        self._count_usage("reads", len(document_ids))
+        return {
+            snapshot.id: snapshot.to_dict() for snapshot in snapshots if snapshot.exists
+        }
+
+    @instrumented("firestore", size_of=result_size)
     def get_all_documents(self, collection_name: str) -> list[dict]:
         """Busca todos os documentos de uma coleção.
 
         Args:
             collection_name (str): O nome da coleção a ser lida.
 
+        Quando a sessão ultrapassa seu limite de leituras, a última leitura da
+        coleção feita depois disso é reaproveitada (modo econômico) até que
+        uma escrita feita por este gerenciador a invalide ou que ela expire
+        (`ECONOMY_CACHE_TTL`).
+
         Returns:
             list[dict]: Uma lista de dicionários, onde cada dicionário representa
                         um documento (com seu ID como chave). Retorna uma lista
                         vazia em caso de erro.
         """
+        context = current_context()
+        if context is None:
+            return self._fetch_all_documents(collection_name)
+
+        documents = self._coalesced_documents(context, collection_name)
+        context.collection_sizes[collection_name] = len(documents)
+        return [
+            {doc_id: dict(data)} for item in documents for doc_id, data in item.items()
+        ]
+
+    @instrumented("firestore", size_of=result_size)
+    def get_all_records(self, collection_name: str, model: type) -> list:
+        """Busca todos os documentos de uma coleção já convertidos em modelos.
+
+        A conversão (incluindo a interpretação das datas) é feita uma única
+        vez por leitura, e os registros imutáveis são compartilhados entre os
+        chamadores da mesma execução.
+
+        Args:
+            collection_name (str): O nome da coleção a ser lida.
+            model (type): A classe do modelo de `core.models` (ex: Expense).
+
+        Returns:
+            list: Uma lista de instâncias de `model`. Retorna uma lista vazia
+                  em caso de erro.
+        """
+
+        def convert(documents: list[dict]) -> list:
+            return [
+                to_record(model, doc_id, data)
+                for item in documents
+                for doc_id, data in item.items()
+            ]
+
+        context = current_context()
+        if context is None:
+            return convert(self._fetch_all_documents(collection_name))
+
+        # A conversão parte da mesma leitura de `get_all_documents`: a coleção
+        # é lida uma única vez, seja qual for o método chamado.
+        records = context.coalesce(
+            ("get_all_records", collection_name, model.__name__),
+            lambda: convert(self._coalesced_documents(context, collection_name)),
+        )
+        context.collection_sizes[collection_name] = len(records)
+        return list(records)
+
+    def _coalesced_documents(self, context, collection_name: str) -> list[dict]:
+        """Lê uma coleção uma única vez por execução, para documentos e registros.
+
+        Os documentos retornados são compartilhados: os chamadores não devem
+        modificá-los.
+        """
+        return context.coalesce(
+            ("get_all_documents", collection_name),
+            lambda: self._fetch_all_documents(collection_name),
+        )
+
+    def _fetch_all_documents(self, collection_name: str) -> list[dict]:
+        """Lê todos os documentos de uma coleção, sem deduplicação.
+
+        No modo econômico, a leitura guardada da coleção é reaproveitada; o
+        chamador sempre recebe documentos próprios, que pode modificar.
+        """
+        if self.read_budget_exceeded():
+            cached_documents = self._cached_collection(collection_name)
+            if cached_documents is not None:
+                return cached_documents
+
         try:
             docs = self.db.collection(collection_name).stream()
-            return [{doc.id: doc.to_dict()} for doc in docs]
+            documents = [{doc.id: doc.to_dict()} for doc in docs]
         except Exception:
             return []
 
+        # Consultas vazias também são cobradas como uma leitura.
+        self._count_usage("reads", max(len(documents), 1))
+        # As leituras só são guardadas depois que o limite é atingido: antes
+        # disso, o modo econômico não as usaria.
+        if self.read_budget_exceeded():
+            self._cache_collection(collection_name, documents)
+        return documents
+
+    def iter_field_values(
+        self, collection_name: str, field: str, page_size: int = 1000
+    ):
+        """Percorre os valores de um campo de uma coleção, em ordem crescente.
+
+        A coleção é lida página a página (com cursor), trazendo apenas o campo
+        pedido, de modo que coleções muito grandes são percorridas com memória
+        limitada. Documentos sem o campo são ignorados pelo Firestore.
+
+        Args:
+            collection_name (str): O nome da coleção.
+            field (str): O nome do campo a percorrer.
+            page_size (int): A quantidade de documentos lidos por página.
+
+        Yields:
+            Os valores do campo, ordenados.
+        """
+        query = (
+            self.db.collection(collection_name)
+            .order_by(field)
+            .select([field])
+            .limit(page_size)
+        )
+        last_snapshot = None
+        while True:
+            page_query = (
+                query.start_after(last_snapshot) if last_snapshot is not None else query
+            )
+            snapshots = list(page_query.stream())
+            self._count_usage("reads", max(len(snapshots), 1))
+            for snapshot in snapshots:
+                yield snapshot.get(field)
+            if len(snapshots) < page_size:
+                return
+            last_snapshot = snapshots[-1]
+
+    def iter_document_ids(self, collection_name: str, page_size: int = 1000):
+        """Percorre os IDs dos documentos de uma coleção, página a página.
+
+        Documentos sem dados, mas com subcoleções (como os de `users`, cujos
+        dados ficam nas subcoleções), também são listados.
+
+        Args:
+            collection_name (str): O nome da coleção.
+            page_size (int): A quantidade de IDs lidos por página.
+
+        Yields:
+            str: Os IDs dos documentos.
+        """
+        references = self.db.collection(collection_name).list_documents(
+            page_size=page_size
+        )
+        for reference in references:
+            self._count_usage("reads")
+            yield reference.id
+
+    @instrumented("firestore", size_of=result_size)
+    def query_records(
+        self,
+        collection_name: str,
+        model: type,
+        filters: list[tuple] = (),
+        order_by: list[tuple] = (),
+        limit: int | None = None,
+        start_after: dict | None = None,
+    ) -> list:
+        """Consulta documentos de uma coleção já convertidos em modelos.
+
+        Apenas os documentos que atendem à consulta são lidos (e cobrados).
+        Consultas com igualdade em um campo e intervalo ou ordenação em outro
+        exigem um índice composto (veja `firestore.indexes.json`).
+
+        Args:
+            collection_name (str): O nome da coleção a ser consultada.
+            model (type): A classe do modelo de `core.models` (ex: Exam).
+            filters (list[tuple]): Condições `(campo, operador, valor)`,
+                                   ex: `("completed", "==", False)`.
+            order_by (list[tuple]): Ordenações `(campo, direção)`, com direção
+                                    `firestore.Query.ASCENDING` ou `DESCENDING`.
+                                    Use o campo `__name__` para ordenar pelo ID.
+            limit (int | None): A quantidade máxima de documentos.
+            start_after (dict | None): Cursor com os valores dos campos de
+                                       ordenação do último documento da página
+                                       anterior (`__name__` recebe o ID).
+
+        Returns:
+            list: Uma lista de instâncias de `model`. Retorna uma lista vazia
+                  em caso de erro.
+        """
+
+        def load() -> list:
+            query = self.db.collection(collection_name)
+            for field, operator, value in filters:
+                query = query.where(
+                    filter=firestore.FieldFilter(field, operator, value)
+                )
+            for field, direction in order_by:
+                query = query.order_by(field, direction=direction)
+            if start_after is not None:
+                query = query.start_after(start_after)
+            if limit is not None:
+                query = query.limit(limit)
+            try:
+                snapshots = list(query.stream())
+            except Exception as e:
+                print(f"Erro ao consultar documentos: {e}")
+                return []
+            # Consultas vazias também são cobradas como uma leitura.
+            self._count_usage("reads", max(len(snapshots), 1))
+            return [
+                to_record(model, snapshot.id, snapshot.to_dict())
+                for snapshot in snapshots
+            ]
+
+        context = current_context()
+        if context is None:
+            return load()
+
+        key = (
+            "query_records",
+            collection_name,
+            model.__name__,
+            repr((filters, order_by, limit, start_after)),
+        )
+        return list(context.coalesce(key, load))
+
+    @instrumented("firestore")
+    def aggregate(
+        self,
+        collection_name: str,
+        aggregations: dict[str, tuple],
+        filters: list[tuple] = (),
+    ) -> dict | None:
+        """Calcula agregações (contagem, soma, média) no próprio Firestore.
+
+        Os documentos não são transferidos: o servidor percorre o índice da
+        consulta e devolve apenas os valores agregados. Cada consulta é
+        cobrada como uma leitura a cada 1000 entradas de índice percorridas
+        (no mínimo uma), em vez de uma por documento. Para contabilizar essas
+        leituras, uma contagem é acrescentada às consultas que não a pedem.
+
+        Args:
+            collection_name (str): O nome da coleção a ser consultada.
+            aggregations (dict[str, tuple]): As agregações, por nome, como
+                `(operação, campo)`, com operação 'count', 'sum' ou 'avg'
+                (o campo é ignorado na contagem), ex:
+                `{"total": ("sum", "valor"), "quantidade": ("count", None)}`.
+            filters (list[tuple]): Condições `(campo, operador, valor)`, como
+                                   em `query_records`.
+
+        Returns:
+            dict | None: O valor de cada agregação, por nome, ou None em caso
+                         de erro. Somas sem documentos valem 0 e médias, None.
+        """
+
+        def load() -> dict | None:
+            query = self.db.collection(collection_name)
+            for field, operator, value in filters:
+                query = query.where(
+                    filter=firestore.FieldFilter(field, operator, value)
+                )
+            requested = dict(aggregations)
+            if not any(operation == "count" for operation, _ in requested.values()):
+                requested[BILLING_COUNT_ALIAS] = ("count", None)
+            aggregation_query = None
+            for alias, (operation, field) in requested.items():
+                target = aggregation_query or query
+                arguments = () if operation == "count" else (field,)
+                aggregation_query = getattr(target, operation)(*arguments, alias=alias)
+            try:
+                results = aggregation_query.get()
+            except Exception as e:
+                print(f"Erro ao agregar documentos: {e}")
+                return None
+            values = {result.alias: result.value for row in results for result in row}
+            counted = max(
+                values.get(alias) or 0
+                for alias, (operation, _) in requested.items()
+                if operation == "count"
+            )
+            values.pop(BILLING_COUNT_ALIAS, None)
+            self._count_usage("reads", max(math.ceil(counted / 1000), 1))
+            return values
+
+        context = current_context()
+        if context is None:
+            return load()
+
+        key = (
+            "aggregate",
+            collection_name,
+            repr((sorted(aggregations.items()), filters)),
+        )
+        values = context.coalesce(key, load)
+        return dict(values) if values is not None else None
+
+    def count_documents(
+        self, collection_name: str, filters: list[tuple] = ()
+    ) -> int | None:
+        """Conta os documentos de uma consulta, sem lê-los.
+
+        Args:
+            collection_name (str): O nome da coleção a ser consultada.
+            filters (list[tuple]): Condições `(campo, operador, valor)`.
+
+        Returns:
+            int | None: A quantidade de documentos, ou None em caso de erro.
+        """
+        values = self.aggregate(collection_name, {"count": ("count", None)}, filters)
+        return values["count"] if values is not None else None
+
+    def sum_field(
+        self, collection_name: str, field: str, filters: list[tuple] = ()
+    ) -> float | None:
+        """Soma um campo numérico dos documentos de uma consulta, sem lê-los.
+
+        Documentos sem o campo, ou com valor não numérico, são ignorados.
+
+        Args:
+            collection_name (str): O nome da coleção a ser consultada.
+            field (str): O campo somado.
+            filters (list[tuple]): Condições `(campo, operador, valor)`.
+
+        Returns:
+            float | None: A soma (0 se nenhum documento atender à consulta),
+                          ou None em caso de erro.
+        """
+        values = self.aggregate(collection_name, {"sum": ("sum", field)}, filters)
+        return (values["sum"] or 0) if values is not None else None
+
+    def avg_field(
+        self, collection_name: str, field: str, filters: list[tuple] = ()
+    ) -> float | None:
+        """Calcula a média de um campo numérico de uma consulta, sem lê-la.
+
+        Args:
+            collection_name (str): O nome da coleção a ser consultada.
+            field (str): O campo cuja média é calculada.
+            filters (list[tuple]): Condições `(campo, operador, valor)`.
+
+        Returns:
+            float | None: A média, ou None se nenhum documento atender à
+                          consulta ou em caso de erro.
+        """
+        values = self.aggregate(collection_name, {"avg": ("avg", field)}, filters)
+        return values["avg"] if values is not None else None
+
+    def iter_records(
+        self,
+        collection_name: str,
+        model: type,
+        filters: list[tuple] = (),
+        order_by: list[tuple] = (),
+        page_size: int = 500,
+    ):
+        """Percorre os documentos de uma consulta, página a página, como modelos.
+
+        Cada página é lida com um cursor a partir do último documento da
+        anterior, de modo que consultas com muitos resultados são percorridas
+        com memória limitada ao tamanho de uma página.
+
+        Args:
+            collection_name (str): O nome da coleção a ser consultada.
+            model (type): A classe do modelo de `core.models` (ex: Exam).
+            filters (list[tuple]): Condições `(campo, operador, valor)`.
+            order_by (list[tuple]): Ordenações `(campo, direção)`.
+            page_size (int): A quantidade de documentos lidos por página.
+
+        Yields:
+            Instâncias de `model`, na ordem da consulta.
+        """
+        query = self.db.collection(collection_name)
+        for field, operator, value in filters:
+            query = query.where(filter=firestore.FieldFilter(field, operator, value))
+        for field, direction in order_by:
+            query = query.order_by(field, direction=direction)
+        query = query.limit(page_size)
+
+        last_snapshot = None
+        while True:
+            page_query = (
+                query.start_after(last_snapshot) if last_snapshot is not None else query
+            )
+            snapshots = list(page_query.stream())
+            self._count_usage("reads", max(len(snapshots), 1))
+            for snapshot in snapshots:
+                yield to_record(model, snapshot.id, snapshot.to_dict())
+            if len(snapshots) < page_size:
+                return
+            last_snapshot = snapshots[-1]
+
+    @instrumented("firestore", size_of=argument_size(3))
     def update_document(self, collection_name: str, document_id: str, data: dict):
         """Atualiza um documento existente no Firestore.
 
@@ -132,9 +934,13 @@ class FirebaseManager:
         """
         try:
             self.db.collection(collection_name).document(document_id).update(data)
+            self._count_usage("writes")
         except Exception:
             pass
+        finally:
+            self._invalidate_reads(collection_name)
 
+    @instrumented("firestore")
     def delete_document(self, collection_name: str, document_id: str):
         """Deleta um documento do Firestore.
 
@@ -144,14 +950,291 @@ class FirebaseManager:
         """
         try:
             self.db.collection(collection_name).document(document_id).delete()
+            self._count_usage("deletes")
         except Exception:
             pass
+        finally:
+            self._invalidate_reads(collection_name)
+
+    @instrumented("firestore")
+    def delete_collection(
+        self,
+        collection_name: str,
+        on_progress: callable = None,
+        filters: list[tuple] = (),
+    ) -> int | None:
+        """Deleta todos os documentos de uma coleção em gravações em lote.
+
+        Os documentos são listados por página, sem carregar seus dados, e
+        excluídos em lotes de até 500 (limite do Firestore). Subcoleções dos
+        documentos não são afetadas.
+
+        Args:
+            collection_name (str): O nome da coleção a ser esvaziada.
+            on_progress (callable, optional): Função chamada com a quantidade
+                acumulada de documentos excluídos após cada lote.
+            filters (list[tuple]): Condições `(campo, operador, valor)` que
+                restringem a exclusão aos documentos que as atendem.
+
+        Returns:
+            int | None: A quantidade de documentos excluídos, ou None em caso
+                        de erro (os lotes já aplicados permanecem excluídos).
+        """
+        query = self.db.collection(collection_name)
+        for field, operator, value in filters:
+            query = query.where(filter=firestore.FieldFilter(field, operator, value))
+        deleted = 0
+        try:
+            while True:
+                doc_refs = list(query.limit(FIRESTORE_BATCH_LIMIT).select([]).stream())
+                self._count_usage("reads", max(len(doc_refs), 1))
+                if not doc_refs:
+                    return deleted
+                batch = self.db.batch()
+                for doc in doc_refs:
+                    batch.delete(doc.reference)
+                batch.commit()
+                self._count_usage("deletes", len(doc_refs))
+                deleted += len(doc_refs)
+                if on_progress is not None:
+                    on_progress(deleted)
+        except Exception as e:
+            print(f"Erro ao deletar a coleção '{collection_name}': {e}")
+            return None
+        finally:
+            self._invalidate_reads(collection_name)
+
+    @instrumented("firestore")
+    def increment_document(
+        self,
+        collection_name: str,
+        document_id: str,
+        increments: dict,
+        data: dict | None = None,
+    ) -> bool:
+        """Incrementa campos numéricos de um documento de forma atômica.
+
+        O documento é criado se não existir; campos ausentes começam em zero.
+
+        Args:
+            collection_name (str): O nome da coleção do documento.
+            document_id (str): O ID do documento.
+            increments (dict): Os campos e os valores a somar (podem ser
+                               negativos). Mapas aninhados são incrementados
+                               campo a campo.
+            data (dict | None): Campos adicionais a gravar junto (mesclados).
+
+        Returns:
+            bool: True se a operação foi bem-sucedida, False caso contrário.
+        """
+        payload = {**(data or {}), **_increment_payload(increments)}
+        try:
+            self.db.collection(collection_name).document(document_id).set(
+                payload, merge=True
+            )
+            self._count_usage("writes")
+            return True
+        except Exception as e:
+            print(f"Erro ao incrementar documento: {e}")
+            return False
+        finally:
+            self._invalidate_reads(collection_name)
+
+    @instrumented("firestore")
+    def acquire_reference(
+        self,
+        collection_name: str,
+        document_id: str,
+        data: dict | None = None,
+        field: str = "refcount",
+        on_create: tuple | None = None,
+        only_existing: bool = False,
+    ) -> int | None:
+        """Incrementa um contador de referências, criando o documento se preciso.
+
+        A leitura e a gravação acontecem em uma transação, de modo que, entre
+        aquisições simultâneas de um documento ainda inexistente, apenas uma
+        o cria. É a operação inversa de `release_reference`. Uma marca de
+        remoção (`TOMBSTONE_FIELD`) conta como documento inexistente e é
+        substituída por um contador novo.
+
+        Args:
+            collection_name (str): O nome da coleção do documento.
+            document_id (str): O ID do documento com o contador.
+            data (dict | None): Campos gravados junto com o contador.
+            field (str): O nome do campo contador.
+            on_create (tuple | None): Tupla `(coleção, id, incrementos)` de um
+                documento a incrementar na mesma transação, apenas quando o
+                documento de referências é criado.
+            only_existing (bool): Se True, apenas incrementa um contador ativo,
+                sem criar o documento (ex: ao reaproveitar o recurso que ele
+                referencia, que pode ter sido liberado nesse meio-tempo).
+
+        Returns:
+            int | None: Quantas referências existem após a aquisição (0 se
+                        `only_existing` e não há contador ativo), ou None em
+                        caso de erro.
+        """
+        doc_ref = self.db.collection(collection_name).document(document_id)
+
+        @firestore.transactional
+        def acquire(transaction) -> int:
+            snapshot = doc_ref.get(transaction=transaction)
+            current = snapshot.to_dict() if snapshot.exists else None
+            if current is not None and not current.get(TOMBSTONE_FIELD):
+                references = (current.get(field) or 0) + 1
+                transaction.update(doc_ref, {**(data or {}), field: references})
+                return references
+            if only_existing:
+                return 0
+            transaction.set(doc_ref, {**(data or {}), field: 1})
+            if on_create is not None:
+                create_collection, create_id, increments = on_create
+                transaction.set(
+                    self.db.collection(create_collection).document(create_id),
+                    _increment_payload(increments),
+                    merge=True,
+                )
+            return 1
+
+        try:
+            references = acquire(self.db.transaction())
+            self._count_usage("reads")
+            if references:
+                self._count_usage(
+                    "writes", 2 if references == 1 and on_create is not None else 1
+                )
+            return references
+        except Exception as e:
+            print(f"Erro ao adquirir referência: {e}")
+            return None
+        finally:
+            self._invalidate_reads(collection_name)
+            if on_create is not None:
+                self._invalidate_reads(on_create[0])
+
+    @instrumented("firestore")
+    def release_reference(
+        self,
+        collection_name: str,
+        document_id: str,
+        field: str = "refcount",
+        on_release: tuple | None = None,
+        tombstone: bool = False,
+    ) -> int | None:
+        """Decrementa um contador de referências e remove o documento ao zerar.
+
+        A leitura, o decremento e a exclusão acontecem em uma transação, de
+        modo que liberações simultâneas não se perdem.
+
+        Com `tombstone`, o documento da última referência não é excluído, e
+        sim substituído por uma marca de remoção, enquanto o chamador remove
+        o recurso referenciado; `delete_tombstone` exclui a marca ao final.
+        Aquisições feitas nesse meio-tempo veem a marca e criam um contador
+        novo, em vez de reaproveitar o recurso sendo removido.
+
+        Args:
+            collection_name (str): O nome da coleção do documento.
+            document_id (str): O ID do documento com o contador.
+            field (str): O nome do campo contador.
+            on_release (tuple | None): Tupla `(coleção, id, incrementos)` de
+                um documento a incrementar na mesma transação, apenas quando
+                a última referência é liberada.
+            tombstone (bool): Se True, marca o documento como removido em vez
+                de excluí-lo ao liberar a última referência.
+
+        Returns:
+            int | None: Quantas referências restam (0 se o documento foi
+                        removido, marcado ou já não existia), ou None em
+                        caso de erro.
+        """
+        doc_ref = self.db.collection(collection_name).document(document_id)
+
+        @firestore.transactional
+        def release(transaction) -> int | None:
+            snapshot = doc_ref.get(transaction=transaction)
+            current = snapshot.to_dict() if snapshot.exists else None
+            if current is None or current.get(TOMBSTONE_FIELD):
+                return None
+            remaining = max((current.get(field) or 0) - 1, 0)
+            if remaining == 0:
+                if tombstone:
+                    transaction.set(doc_ref, {field: 0, TOMBSTONE_FIELD: True})
+                else:
+                    transaction.delete(doc_ref)
+                if on_release is not None:
+                    release_collection, release_id, increments = on_release
+                    transaction.set(
+                        self.db.collection(release_collection).document(release_id),
+                        _increment_payload(increments),
+                        merge=True,
+                    )
+            else:
+                transaction.update(doc_ref, {field: remaining})
+            return remaining
+
+        try:
+            remaining = release(self.db.transaction())
+            self._count_usage("reads")
+            if remaining is None:
+                return 0
+            self._count_usage(
+                "deletes" if remaining == 0 and not tombstone else "writes"
+            )
+            if remaining == 0 and on_release is not None:
+                self._count_usage("writes")
+            return remaining
+        except Exception as e:
+            print(f"Erro ao liberar referência: {e}")
+            return None
+        finally:
+            self._invalidate_reads(collection_name)
+            if on_release is not None:
+                self._invalidate_reads(on_release[0])
+
+    @instrumented("firestore")
+    def delete_tombstone(self, collection_name: str, document_id: str) -> bool:
+        """Exclui a marca de remoção deixada por `release_reference`.
+
+        A marca só é excluída se ainda estiver lá: um contador recriado por
+        uma aquisição posterior é mantido.
+
+        Args:
+            collection_name (str): O nome da coleção do documento.
+            document_id (str): O ID do documento com o contador.
+
+        Returns:
+            bool: True se a marca foi excluída (ou já não existia), False em
+                  caso de erro.
+        """
+        doc_ref = self.db.collection(collection_name).document(document_id)
+
+        @firestore.transactional
+        def delete(transaction) -> bool:
+            snapshot = doc_ref.get(transaction=transaction)
+            if snapshot.exists and snapshot.to_dict().get(TOMBSTONE_FIELD):
+                transaction.delete(doc_ref)
+                return True
+            return False
+
+        try:
+            deleted = delete(self.db.transaction())
+            self._count_usage("reads")
+            if deleted:
+                self._count_usage("deletes")
+            return True
+        except Exception as e:
+            print(f"Erro ao excluir marca de remoção: {e}")
+            return False
+        finally:
+            self._invalidate_reads(collection_name)
 
     # --- MÉTODOS DO STORAGE (ARQUIVOS) ---
 
+    @instrumented("storage", size_of=argument_size(1))
     def upload_file(
         self, file_content: bytes, storage_path: str, content_type: str | None = None
-    ) -> str | None:
+    ) -> bool:
         """Faz o upload de um arquivo para o Cloud Storage a partir de seu conteúdo em bytes.
 
         Args:
@@ -162,8 +1245,9 @@ class FirebaseManager:
                                        Se None, o tipo será inferido pelo Storage.
 
         Returns:
-            str | None: A URL pública do arquivo após o upload, ou None em
-                        caso de erro.
+            bool: True se o upload foi concluído com sucesso, False caso
+                  contrário. O arquivo permanece privado; use
+                  `get_file_url` para obter um link de acesso.
         """
         try:
             blob = self.bucket.blob(storage_path)
@@ -171,12 +1255,97 @@ class FirebaseManager:
                 blob.upload_from_string(file_content, content_type=content_type)
             else:
                 blob.upload_from_string(file_content)
-            blob.make_public()
-            return blob.public_url
+            self._forget_signed_url(storage_path)
+            self.file_cache.pop(storage_path)
+            return True
+        except Exception as e:
+            print(f"Erro no upload de arquivo: {e}")
+            return False
+
+    @instrumented("storage", size_of=_streamed_size)
+    def upload_stream(
+        self,
+        file_obj,
+        storage_path: str,
+        content_type: str | None = None,
+        size: int | None = None,
+        chunk_size: int = DEFAULT_UPLOAD_CHUNK_SIZE,
+        on_progress: callable = None,
+    ) -> bool:
+        """Faz o upload de um arquivo em blocos, por meio de um upload resumível.
+
+        Diferente de `upload_file`, o conteúdo nunca é carregado inteiro em
+        memória: o arquivo é lido bloco a bloco, limitando a memória de cada
+        upload a aproximadamente `chunk_size`.
+
+        Args:
+            file_obj: Um objeto de arquivo binário com `read`, `seek` e `tell`
+                      (ex: o `UploadedFile` do Streamlit ou um arquivo aberto).
+            storage_path (str): O caminho de destino no Cloud Storage.
+            content_type (str | None): O tipo MIME do arquivo.
+            size (int | None): O tamanho total do arquivo em bytes, se conhecido.
+            chunk_size (int): O tamanho de cada bloco, múltiplo de 256 KB.
+            on_progress (callable, optional): Função chamada com
+                `(bytes_enviados, tamanho_total)` a cada bloco lido.
+
+        Returns:
+            bool: True se o upload foi concluído com sucesso, False caso
+                  contrário. O arquivo permanece privado; use
+                  `get_file_url` para obter um link de acesso.
+        """
+        try:
+            blob = self.bucket.blob(storage_path, chunk_size=chunk_size)
+            reader = _ProgressReader(file_obj, size, on_progress)
+            blob.upload_from_file(
+                reader, rewind=True, size=size, content_type=content_type
+            )
+            self._forget_signed_url(storage_path)
+            self.file_cache.pop(storage_path)
+            return True
         except Exception as e:
             print(f"Erro no upload de arquivo: {e}")
+            return False
+
+    @instrumented("storage")
+    def get_file_url(self, storage_path: str) -> str | None:
+        """Retorna uma URL assinada (V4) de leitura temporária de um arquivo.
+
+        A assinatura é feita localmente com a chave da conta de serviço, sem
+        chamadas de rede. Cada URL é reaproveitada até pouco antes de expirar,
+        então renderizar a lista de documentos não repete a assinatura.
+
+        Args:
+            storage_path (str): O caminho do arquivo no Cloud Storage.
+
+        Returns:
+            str | None: A URL assinada, válida por `SIGNED_URL_TTL`, ou None
+                        em caso de erro.
+        """
+        now = time.monotonic()
+        with self._signed_urls_lock:
+            cached = self._signed_urls.get(storage_path)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+
+        try:
+            url = self.bucket.blob(storage_path).generate_signed_url(
+                version="v4", expiration=SIGNED_URL_TTL, method="GET"
+            )
+        except Exception as e:
+            print(f"Erro ao gerar URL assinada: {e}")
             return None
 
+        reuse_until = now + (SIGNED_URL_TTL - SIGNED_URL_REFRESH_MARGIN).total_seconds()
+        with self._signed_urls_lock:
+            self._signed_urls[storage_path] = (url, reuse_until)
+        return url
+
+    def _forget_signed_url(self, storage_path: str):
+        """Descarta a URL assinada em cache de um arquivo sobrescrito ou removido."""
+        with self._signed_urls_lock:
+            self._signed_urls.pop(storage_path, None)
+
+    @instrumented("storage")
     def download_file(self, storage_path: str, local_path: str):
         """Baixa um arquivo do Cloud Storage para o sistema local.
 
@@ -190,6 +1359,87 @@ class FirebaseManager:
         except Exception:
             pass
 
+    @instrumented("storage", size_of=result_size)
+    def download_bytes(
+        self, storage_path: str, start: int | None = None, end: int | None = None
+    ) -> bytes | None:
+        """Baixa o conteúdo de um arquivo do Cloud Storage para a memória.
+
+        Downloads completos passam pelo cache de arquivos: um arquivo aberto
+        repetidamente é baixado do Storage apenas uma vez. Downloads parciais
+        (com `start` ou `end`) não usam o cache.
+
+        Args:
+            storage_path (str): O caminho do arquivo no Cloud Storage.
+            start (int | None): O primeiro byte a baixar (inclusivo).
+            end (int | None): O último byte a baixar (inclusivo).
+
+        Returns:
+            bytes | None: O conteúdo baixado, ou None em caso de erro.
+        """
+        ranged = start is not None or end is not None
+        if not ranged:
+            cached = self.file_cache.get(storage_path)
+            if cached is not None:
+                return cached
+
+        try:
+            data = self.bucket.blob(storage_path).download_as_bytes(
+                start=start, end=end
+            )
+        except Exception as e:
+            print(f"Erro ao baixar arquivo do Storage: {e}")
+            return None
+
+        if not ranged:
+            self.file_cache.put(storage_path, data)
+        return data
+
+    def iter_file(
+        self,
+        storage_path: str,
+        chunk_size: int = DEFAULT_UPLOAD_CHUNK_SIZE,
+        start: int = 0,
+        end: int | None = None,
+    ):
+        """Percorre o conteúdo de um arquivo em blocos, por requisições parciais.
+
+        Apenas um bloco fica em memória por vez, permitindo processar ou
+        repassar arquivos grandes sem carregá-los inteiros.
+
+        Args:
+            storage_path (str): O caminho do arquivo no Cloud Storage.
+            chunk_size (int): O tamanho de cada bloco, em bytes.
+            start (int): O primeiro byte a ler (inclusivo).
+            end (int | None): O último byte a ler (inclusivo). Se None, lê
+                              até o fim do arquivo.
+
+        Yields:
+            bytes: Os blocos do arquivo, em ordem.
+
+        Raises:
+            IOError: Se um bloco não puder ser baixado.
+        """
+        if end is None:
+            blob = self.bucket.get_blob(storage_path)
+            if blob is None:
+                return
+            end = blob.size - 1
+
+        position = start
+        while position <= end:
+            chunk_end = min(position + chunk_size - 1, end)
+            chunk = self.download_bytes(storage_path, position, chunk_end)
+            if chunk is None:
+                raise IOError(
+                    f"Falha ao baixar '{storage_path}' a partir de {position}."
+                )
+            if not chunk:
+                return
+            yield chunk
+            position += len(chunk)
+
+    @instrumented("storage")
     def delete_file(self, storage_path: str) -> bool:
         """Deleta um arquivo do Cloud Storage.
 
@@ -198,18 +1448,77 @@ class FirebaseManager:
                                 deletado.
 
         Returns:
-            bool: True se o arquivo foi deletado com sucesso, False caso contrário.
+            bool: True se o arquivo foi deletado com sucesso (ou já não
+                  existia), False caso contrário.
         """
+        self._forget_signed_url(storage_path)
+        self.file_cache.pop(storage_path)
         try:
             blob = self.bucket.blob(storage_path)
             blob.delete()
             return True
+        except NotFound:
+            return True
         except Exception as e:
             print(f"Erro ao deletar arquivo do Storage: {e}")
             return False
 
+    @instrumented("storage")
+    def list_files(self, prefix: str) -> list[str] | None:
+        """Lista os caminhos dos arquivos do Cloud Storage sob um prefixo.
+
+        Args:
+            prefix (str): O prefixo dos caminhos (ex: 'users/{uid}/').
+
+        Returns:
+            list[str] | None: Os caminhos encontrados, ou None em caso de erro.
+        """
+        try:
+            return [file.name for file in self.iter_files(prefix)]
+        except Exception as e:
+            print(f"Erro ao listar arquivos do Storage: {e}")
+            return None
+
+    def iter_files(self, prefix: str, page_size: int = 1000):
+        """Percorre os arquivos do Cloud Storage sob um prefixo, página a página.
+
+        Os arquivos são retornados em ordem lexicográfica de caminho, e apenas
+        uma página da listagem fica em memória por vez.
+
+        Args:
+            prefix (str): O prefixo dos caminhos (ex: 'users/').
+            page_size (int): A quantidade de arquivos por página da listagem.
+
+        Yields:
+            FileInfo: O caminho, o tamanho, o tipo e a data de atualização de
+                      cada arquivo.
+        """
+        for blob in self.bucket.list_blobs(prefix=prefix, page_size=page_size):
+            yield FileInfo(blob.name, blob.size or 0, blob.content_type, blob.updated)
+
+    @instrumented("storage")
+    def get_file_info(self, storage_path: str) -> FileInfo | None:
+        """Retorna os dados básicos de um arquivo do Cloud Storage.
+
+        Args:
+            storage_path (str): O caminho do arquivo no Cloud Storage.
+
+        Returns:
+            FileInfo | None: Os dados do arquivo, ou None se ele não existir
+                             ou em caso de erro.
+        """
+        try:
+            blob = self.bucket.get_blob(storage_path)
+        except Exception as e:
+            print(f"Erro ao consultar arquivo do Storage: {e}")
+            return None
+        if blob is None:
+            return None
+        return FileInfo(blob.name, blob.size or 0, blob.content_type, blob.updated)
+
     # --- MÉTODOS DE AUTENTICAÇÃO ---
 
+    @instrumented("auth")
     def create_user_record(
         self, email: str, password: str, display_name: str = None
     ) -> UserRecord:
@@ -232,6 +1541,7 @@ class FirebaseManager:
         )
         return user_record
 
+    @instrumented("auth")
     def get_user_by_email(self, email: str) -> UserRecord | None:
         """Busca um usuário no Firebase Authentication pelo e-mail.
 
@@ -247,6 +1557,27 @@ class FirebaseManager:
         except auth.UserNotFoundError:
             return None
 
+    @instrumented("auth")
+    def delete_user_record(self, uid: str) -> bool:
+        """Exclui um usuário do Firebase Authentication.
+
+        Args:
+            uid (str): O UID do usuário a ser excluído.
+
+        Returns:
+            bool: True se o usuário foi excluído (ou já não existia), False
+                  caso contrário.
+        """
+        try:
+            auth.delete_user(uid)
+            return True
+        except auth.UserNotFoundError:
+            return True
+        except Exception as e:
+            print(f"Erro ao excluir o usuário do Authentication: {e}")
+            return False
+
+    @instrumented("auth", size_of=result_size)
     def sign_in_with_email_and_password(self, email: str, password: str) -> dict:
         """Faz login usando a API REST do Firebase Authentication.
 
@@ -270,6 +1601,7 @@ class FirebaseManager:
         response.raise_for_status()
         return response.json()
 
+    @instrumented("auth")
     def send_password_reset_email(self, email: str) -> None:
         """Envia um e-mail de redefinição de senha usando a API REST.
 
@@ -0,0 +1,313 @@
+"""
+Módulo de coleta de arquivos órfãos do Cloud Storage.
+
+Falhas parciais (por exemplo, o upload concluído e a gravação dos metadados
+não, ou o arquivo excluído e os metadados não) deixam o Storage e o
+Firestore divergentes. Este módulo define a classe GarbageCollector, que
+compara os arquivos de `users/{uid}/documents/` com os caminhos referenciados
+pelos metadados e pelo índice de conteúdo, e exclui os arquivos órfãos.
+
+As duas fontes são percorridas como fluxos ordenados e comparadas por
+intercalação (merge join), sem montar conjuntos em memória: o consumo de
+memória independe da quantidade de objetos. Também pode ser executado pela
+linha de comando:
+
+    python -m core.garbage_collector --key chave.json --bucket meu-bucket
+    python -m core.garbage_collector --key chave.json --bucket meu-bucket --delete
+"""
+
+import argparse
+import heapq
+import itertools
+import json
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from .document_service import DocumentService
+from .firebase_manager import FileInfo, FirebaseManager
+
+# Arquivos modificados há menos tempo que isso não são excluídos: podem
+# pertencer a um upload cujos metadados ainda estão sendo gravados.
+DEFAULT_GRACE_PERIOD = timedelta(hours=1)
+
+# Quantidade padrão de exclusões simultâneas no Storage.
+DEFAULT_GC_WORKERS = 16
+
+# Quantidade máxima de caminhos de exemplo guardados no relatório.
+REPORT_SAMPLE_SIZE = 20
+
+# Campos dos metadados e do índice de conteúdo que referenciam arquivos.
+REFERENCE_FIELDS = ("storage_path", "thumbnail_path")
+
+
+@dataclass(slots=True)
+class GarbageReport:
+    """O resultado de uma coleta de arquivos órfãos.
+
+    Attributes:
+        dry_run (bool): Se a coleta apenas relatou, sem excluir arquivos.
+        users (int): Quantidade de usuários com arquivos verificados.
+        scanned_files (int): Quantidade de arquivos verificados.
+        orphan_files (int): Arquivos sem nenhuma referência.
+        orphan_bytes (int): O total de bytes dos arquivos órfãos.
+        skipped_recent (int): Órfãos mantidos por estarem no período de carência.
+        deleted_files (int): Órfãos excluídos com sucesso.
+        failed_files (int): Órfãos cuja exclusão falhou.
+        dangling_references (int): Referências a arquivos inexistentes.
+        orphan_samples (list[str]): Exemplos de caminhos órfãos.
+        dangling_samples (list[str]): Exemplos de referências sem arquivo.
+    """
+
+    dry_run: bool
+    users: int = 0
+    scanned_files: int = 0
+    orphan_files: int = 0
+    orphan_bytes: int = 0
+    skipped_recent: int = 0
+    deleted_files: int = 0
+    failed_files: int = 0
+    dangling_references: int = 0
+    orphan_samples: list[str] = field(default_factory=list)
+    dangling_samples: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        """Converte o relatório em um dicionário serializável em JSON."""
+        return asdict(self)
+
+
+def _owner_of(file: FileInfo) -> str | None:
+    """Retorna o UID dono de um arquivo em `users/{uid}/documents/`, se for o caso."""
+    parts = file.name.split("/", 3)
+    if len(parts) == 4 and parts[0] == "users" and parts[2] == "documents":
+        return parts[1]
+    return None
+
+
+def merge_diff(files, references):
+    """Compara dois fluxos ordenados de caminhos por intercalação.
+
+    Args:
+        files: Iterável de FileInfo ordenado por `name`.
+        references: Iterável de caminhos (str) ordenado e sem repetições.
+
+    Yields:
+        tuple: `("orphan", FileInfo)` para arquivos sem referência e
+               `("dangling", str)` para referências sem arquivo.
+    """
+    references = iter(references)
+    reference = next(references, None)
+    for file in files:
+        while reference is not None and reference < file.name:
+            yield "dangling", reference
+            reference = next(references, None)
+        if reference == file.name:
+            reference = next(references, None)
+            continue
+        yield "orphan", file
+    while reference is not None:
+        yield "dangling", reference
+        reference = next(references, None)
+
+
+class GarbageCollector:
+    """Encontra e exclui arquivos de documentos sem referência no Firestore.
+
+    Attributes:
+        fb_manager (FirebaseManager): O gerenciador do Firebase.
+        grace_period (timedelta): A idade mínima de um arquivo para excluí-lo.
+        max_workers (int): A quantidade máxima de exclusões simultâneas.
+    """
+
+    def __init__(
+        self,
+        firebase_manager: FirebaseManager,
+        grace_period: timedelta = DEFAULT_GRACE_PERIOD,
+        max_workers: int = DEFAULT_GC_WORKERS,
+    ):
+        """Inicializa o coletor.
+
+        Args:
+            firebase_manager (FirebaseManager): Instância do gerenciador
+                do Firebase para interagir com o Firestore e o Storage.
+            grace_period (timedelta): A idade mínima de um arquivo para excluí-lo.
+            max_workers (int): A quantidade máxima de exclusões simultâneas.
+        """
+        self.fb_manager = firebase_manager
+        self.grace_period = grace_period
+        self.max_workers = max_workers
+
+    def referenced_paths(self, user_uid: str):
+        """Percorre, em ordem e sem repetições, os caminhos referenciados.
+
+        Une os fluxos ordenados de `storage_path` e `thumbnail_path` dos
+        metadados e do índice de conteúdo do usuário.
+
+        Args:
+            user_uid (str): O UID do usuário.
+
+        Yields:
+            str: Os caminhos referenciados, em ordem crescente.
+        """
+        streams = [
+            (
+                value
+                for value in self.fb_manager.iter_field_values(collection, field_name)
+                if isinstance(value, str)
+            )
+            for collection in (
+                DocumentService.documents_path(user_uid),
+                DocumentService.content_index_path(user_uid),
+            )
+            for field_name in REFERENCE_FIELDS
+        ]
+        previous = None
+        for path in heapq.merge(*streams):
+            if path != previous:
+                yield path
+                previous = path
+
+    def run(
+        self,
+        dry_run: bool = True,
+        user_uid: str | None = None,
+        on_progress: callable = None,
+    ) -> GarbageReport:
+        """Executa a coleta para um usuário ou para todos.
+
+        Args:
+            dry_run (bool): Se True, apenas relata os órfãos, sem excluí-los.
+            user_uid (str | None): Restringe a coleta a um usuário.
+            on_progress (callable, optional): Função chamada com o relatório
+                parcial ao fim de cada usuário.
+
+        Returns:
+            GarbageReport: O relatório da coleta.
+        """
+        report = GarbageReport(dry_run=dry_run)
+        cutoff = datetime.now(timezone.utc) - self.grace_period
+        prefix = f"users/{user_uid}/documents/" if user_uid else "users/"
+        files = (file for file in self.fb_manager.iter_files(prefix) if _owner_of(file))
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="sigp-gc"
+        ) as executor:
+            in_flight = set()
+            for owner, owner_files in itertools.groupby(files, key=_owner_of):
+                report.users += 1
+                for kind, item in merge_diff(
+                    self._counted(owner_files, report), self.referenced_paths(owner)
+                ):
+                    if kind == "dangling":
+                        report.dangling_references += 1
+                        self._sample(report.dangling_samples, item)
+                        continue
+
+                    report.orphan_files += 1
+                    report.orphan_bytes += item.size
+                    self._sample(report.orphan_samples, item.name)
+                    if item.updated is not None and item.updated > cutoff:
+                        report.skipped_recent += 1
+                    elif not dry_run:
+                        in_flight = self._delete(executor, in_flight, item, report)
+                if on_progress is not None:
+                    on_progress(report)
+
+            self._collect(in_flight, report)
+        return report
+
+    @staticmethod
+    def _counted(files, report: GarbageReport):
+        """Repassa os arquivos de um fluxo, contando-os no relatório."""
+        for file in files:
+            report.scanned_files += 1
+            yield file
+
+    @staticmethod
+    def _sample(samples: list[str], path: str):
+        """Guarda um caminho de exemplo, até o limite do relatório."""
+        if len(samples) < REPORT_SAMPLE_SIZE:
+            samples.append(path)
+
+    def _delete(
+        self, executor, in_flight: set, file: FileInfo, report: GarbageReport
+    ) -> set:
+        """Agenda a exclusão de um órfão, limitando as exclusões pendentes."""
+        if len(in_flight) >= self.max_workers * 4:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            self._collect(done, report)
+        in_flight.add(executor.submit(self.fb_manager.delete_file, file.name))
+        return in_flight
+
+    @staticmethod
+    def _collect(futures, report: GarbageReport):
+        """Contabiliza o resultado das exclusões concluídas."""
+        for future in futures:
+            try:
+                deleted = future.result()
+            except Exception as e:
+                print(f"Erro ao deletar arquivo órfão: {e}")
+                deleted = False
+            if deleted:
+                report.deleted_files += 1
+            else:
+                report.failed_files += 1
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Ponto de entrada da linha de comando do coletor.
+
+    Args:
+        argv (list[str] | None): Os argumentos da linha de comando.
+
+    Returns:
+        int: O código de saída (1 se alguma exclusão falhou).
+    """
+    parser = argparse.ArgumentParser(
+        description="Encontra e exclui arquivos de documentos órfãos no Storage."
+    )
+    parser.add_argument(
+        "--key", required=True, help="Caminho do JSON da conta de serviço."
+    )
+    parser.add_argument("--bucket", required=True, help="O bucket do Cloud Storage.")
+    parser.add_argument("--user", help="Restringe a coleta a um UID.")
+    parser.add_argument(
+        "--delete",
+        action="store_true",
+        help="Exclui os órfãos (sem esta opção, apenas gera o relatório).",
+    )
+    parser.add_argument(
+        "--grace-minutes",
+        type=int,
+        default=int(DEFAULT_GRACE_PERIOD.total_seconds() // 60),
+        help="Idade mínima, em minutos, de um arquivo para excluí-lo.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_GC_WORKERS,
+        help="Quantidade de exclusões simultâneas.",
+    )
+    args = parser.parse_args(argv)
+
+    firebase_manager = FirebaseManager(args.key, args.bucket, web_api_key="")
+    collector = GarbageCollector(
+        firebase_manager,
+        grace_period=timedelta(minutes=args.grace_minutes),
+        max_workers=args.workers,
+    )
+    report = collector.run(
+        dry_run=not args.delete,
+        user_uid=args.user,
+        on_progress=lambda partial: print(
+            f"{partial.users} usuário(s), {partial.scanned_files} arquivo(s), "
+            f"{partial.orphan_files} órfão(s)",
+            file=sys.stderr,
+        ),
+    )
+    print(json.dumps(report.to_dict(), ensure_ascii=False, indent=2))
+    return 1 if report.failed_files else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
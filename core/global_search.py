@@ -0,0 +1,77 @@
+"""
+Módulo da busca unificada entre as áreas do aplicativo.
+
+Este módulo define a classe GlobalSearch, que consulta de uma só vez os
+gastos, as anotações, os exames, os treinos e os documentos do usuário. Todos
+são servidos pelo mesmo índice de busca (`SearchIndex`), mantido por cada
+serviço a cada gravação; a consulta lê apenas os documentos dos termos
+encontrados, sem percorrer as coleções.
+"""
+
+from .document_service import DocumentService
+from .exam_service import ExamService
+from .expense_service import ExpenseService
+from .firebase_manager import FirebaseManager
+from .note_service import NoteService
+from .search_index import SearchIndex
+from .workout_service import WorkoutService
+
+# Quantidade máxima de resultados exibidos pela busca unificada.
+GLOBAL_SEARCH_LIMIT = 10
+
+
+class GlobalSearch:
+    """Busca unificada nos registros de todas as áreas de um usuário.
+
+    Attributes:
+        fb_manager (FirebaseManager): O gerenciador do Firebase.
+        user_uid (str): O UID do usuário dono dos registros.
+        search_index (SearchIndex): O índice de busca do usuário.
+    """
+
+    def __init__(self, firebase_manager: FirebaseManager, user_uid: str):
+        """Inicializa a busca unificada de um usuário.
+
+        Args:
+            firebase_manager (FirebaseManager): Instância do gerenciador
+                do Firebase para interagir com o Firestore.
+            user_uid (str): O UID do usuário dono dos registros.
+        """
+        self.fb_manager = firebase_manager
+        self.user_uid = user_uid
+        self.search_index = SearchIndex(firebase_manager, user_uid)
+
+    def ensure_index(self):
+        """Indexa, uma única vez por tipo, os registros anteriores ao índice.
+
+        Índices gravados em uma versão anterior do formato são descartados e
+        reconstruídos por completo.
+        """
+        if not self.search_index.ensure_version():
+            return
+        NoteService(self.fb_manager, self.user_uid).ensure_search_index()
+        ExamService(self.fb_manager, self.user_uid).ensure_search_index()
+        WorkoutService(self.fb_manager, self.user_uid).ensure_search_index()
+        ExpenseService(self.fb_manager, self.user_uid).ensure_search_index()
+        DocumentService(self.fb_manager).ensure_search_index(self.user_uid)
+
+    def search(
+        self, query: str, limit: int = GLOBAL_SEARCH_LIMIT
+    ) -> list[tuple[str, str, str]]:
+        """Busca os registros de todas as áreas que correspondem à consulta.
+
+        Args:
+            query (str): O texto da consulta (palavras incompletas ou com um
+                erro de digitação também são encontradas).
+            limit (int): A quantidade máxima de resultados.
+
+        Returns:
+            list[tuple[str, str, str]]: Tuplas `(tipo, id, rótulo)`, da mais
+                para a menos relevante. O tipo é o nome da coleção do registro.
+        """
+        records = [
+            (kind, doc_id)
+            for kind, doc_id, _ in self.search_index.search(query, limit=limit)
+        ]
+        labels = self.search_index.labels_of(records)
+        return [(kind, doc_id, label) for (kind, doc_id), label in zip(records, labels)]
@@ -0,0 +1,280 @@
+"""
+Módulo de instrumentação de desempenho da aplicação.
+
+Este módulo define a classe RunMetrics, que acumula, para uma execução
+(rerun) do script, a quantidade de chamadas, o histograma de latências e
+os bytes transferidos de cada operação instrumentada. Ele também fornece o
+decorador `instrumented`, aplicado aos métodos do FirebaseManager e às
+funções `render_*_page`, e a emissão das métricas como logs estruturados.
+"""
+
+import json
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+
+logger = logging.getLogger("sigp.performance")
+
+# Limites superiores (em milissegundos) dos intervalos do histograma de latência.
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+
+# Métricas da execução atual. Cada thread de script do Streamlit possui a sua.
+_current_metrics: ContextVar["RunMetrics | None"] = ContextVar(
+    "sigp_run_metrics", default=None
+)
+
+
+class CallStats:
+    """Estatísticas acumuladas de uma operação durante uma execução.
+
+    Attributes:
+        count (int): Quantidade de chamadas.
+        errors (int): Quantidade de chamadas que lançaram exceção.
+        total_ms (float): Soma das latências, em milissegundos.
+        max_ms (float): Maior latência observada, em milissegundos.
+        bytes (int): Total estimado de bytes transferidos.
+        buckets (list[int]): Contagem de chamadas por intervalo de `LATENCY_BUCKETS_MS`.
+    """
+
+    __slots__ = ("count", "errors", "total_ms", "max_ms", "bytes", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.bytes = 0
+        self.buckets = [0] * len(LATENCY_BUCKETS_MS)
+
+    def add(self, elapsed_ms: float, nbytes: int, failed: bool):
+        """Registra uma chamada nas estatísticas."""
+        self.count += 1
+        self.errors += int(failed)
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.bytes += nbytes
+        for index, upper_bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= upper_bound:
+                self.buckets[index] += 1
+                break
+
+    def percentile(self, fraction: float) -> float:
+        """Estima um percentil da latência pelo limite superior do intervalo.
+
+        Args:
+            fraction (float): O percentil desejado, entre 0 e 1 (ex: 0.95).
+
+        Returns:
+            float: O limite superior do intervalo que contém o percentil, ou a
+            maior latência observada quando ele cai no último intervalo.
+        """
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= target:
+                return min(LATENCY_BUCKETS_MS[index], self.max_ms)
+        return self.max_ms
+
+
+class RunMetrics:
+    """Métricas de desempenho de uma única execução do script.
+
+    Attributes:
+        page (str | None): A página renderizada nesta execução, quando conhecida.
+        started_at (datetime): O momento em que a execução começou.
+        calls (dict[str, CallStats]): Estatísticas por nome de operação.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self.page = None
+        self.started_at = datetime.now()
+        self.calls: dict[str, CallStats] = {}
+
+    def record(self, name: str, elapsed_ms: float, nbytes: int = 0, failed=False):
+        """Registra uma chamada de uma operação.
+
+        Args:
+            name (str): O nome da operação (ex: 'firestore.get_document').
+            elapsed_ms (float): A latência da chamada, em milissegundos.
+            nbytes (int): Os bytes transferidos pela chamada.
+            failed (bool): Se a chamada terminou com uma exceção.
+        """
+        with self._lock:
+            stats = self.calls.get(name)
+            if stats is None:
+                stats = self.calls[name] = CallStats()
+            stats.add(elapsed_ms, nbytes, failed)
+
+    def elapsed_ms(self) -> float:
+        """Retorna o tempo decorrido desde o início da execução, em milissegundos."""
+        return (time.perf_counter() - self._started) * 1000
+
+    def summary(self) -> list[dict]:
+        """Resume as métricas por operação, da mais custosa para a menos custosa.
+
+        Returns:
+            list[dict]: Uma linha por operação, com contagem, latências e bytes.
+        """
+        with self._lock:
+            items = list(self.calls.items())
+
+        rows = [
+            {
+                "call": name,
+                "count": stats.count,
+                "errors": stats.errors,
+                "total_ms": round(stats.total_ms, 1),
+                "p50_ms": round(stats.percentile(0.5), 1),
+                "p95_ms": round(stats.percentile(0.95), 1),
+                "max_ms": round(stats.max_ms, 1),
+                "bytes": stats.bytes,
+            }
+            for name, stats in items
+        ]
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows
+
+    def log(self):
+        """Emite uma linha de log estruturado (JSON) por operação registrada."""
+        if not self.calls or not logger.isEnabledFor(logging.INFO):
+            return
+        run_ms = round(self.elapsed_ms(), 1)
+        for row in self.summary():
+            logger.info(
+                json.dumps(
+                    {
+                        "event": "rerun_call_metrics",
+                        "page": self.page,
+                        "run_ms": run_ms,
+                        **row,
+                    },
+                    ensure_ascii=False,
+                )
+            )
+
+
+def current_metrics() -> RunMetrics | None:
+    """Retorna as métricas da execução atual, ou None fora de uma execução."""
+    return _current_metrics.get()
+
+
+def start_run_metrics():
+    """Inicia a coleta de métricas para a thread atual e retorna o token."""
+    return _current_metrics.set(RunMetrics())
+
+
+def finish_run_metrics(token):
+    """Emite os logs das métricas da execução e encerra a coleta.
+
+    Args:
+        token: O token retornado por `start_run_metrics`.
+    """
+    metrics = _current_metrics.get()
+    _current_metrics.reset(token)
+    if metrics is not None:
+        metrics.log()
+
+
+def estimate_size(value) -> int:
+    """Estima o tamanho em bytes de um valor do Firestore.
+
+    Segue aproximadamente as regras de tamanho de documentos do Firestore:
+    strings ocupam seus bytes UTF-8 mais um, números e datas ocupam 8 bytes,
+    e mapas somam o tamanho de suas chaves e valores.
+
+    Args:
+        value: O valor a ser medido (dict, list, str, bytes, número etc.).
+
+    Returns:
+        int: O tamanho estimado, em bytes.
+    """
+    if value is None or isinstance(value, bool):
+        return 1
+    if isinstance(value, str):
+        return len(value.encode("utf-8")) + 1
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(
+            estimate_size(str(key)) + estimate_size(item) for key, item in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_size(item) for item in value)
+    if hasattr(value, "__dataclass_fields__"):
+        return sum(
+            estimate_size(name) + estimate_size(getattr(value, name))
+            for name in value.__dataclass_fields__
+        )
+    return 8
+
+
+def result_size(result, args, kwargs) -> int:
+    """Mede os bytes transferidos pelo valor retornado da chamada."""
+    return estimate_size(result)
+
+
+def argument_size(index: int) -> callable:
+    """Cria uma função que mede os bytes do argumento posicional `index`.
+
+    Args:
+        index (int): A posição do argumento (contando `self` nos métodos).
+    """
+
+    def measure(result, args, kwargs) -> int:
+        return estimate_size(args[index]) if len(args) > index else 0
+
+    return measure
+
+
+def instrumented(category: str, size_of: callable = None):
+    """Decorador que registra latência, contagem e bytes de uma função.
+
+    A operação é registrada como `'{category}.{nome_da_funcao}'` nas métricas
+    da execução atual. Fora de uma execução, a função é chamada sem custo
+    adicional.
+
+    Args:
+        category (str): A categoria da operação (ex: 'firestore', 'storage', 'page').
+        size_of (callable, optional): Função que recebe `(resultado, args, kwargs)`
+            e retorna os bytes transferidos pela chamada.
+    """
+
+    def decorator(func):
+        name = f"{category}.{func.__name__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            metrics = _current_metrics.get()
+            if metrics is None:
+                return func(*args, **kwargs)
+
+            started = time.perf_counter()
+            failed = False
+            result = None
+            try:
+                result = func(*args, **kwargs)
+                return result
+            except Exception:
+                failed = True
+                raise
+            finally:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                nbytes = 0
+                if size_of is not None and not failed:
+                    try:
+                        nbytes = size_of(result, args, kwargs)
+                    except Exception:
+                        nbytes = 0
+                metrics.record(name, elapsed_ms, nbytes, failed)
+
+        return wrapper
+
+    return decorator
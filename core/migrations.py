@@ -0,0 +1,220 @@
+"""
+Módulo de migração do esquema dos dados dos usuários.
+
+Os gastos passaram a seguir um esquema versionado (veja
+`core.expense_service`): datas como Timestamps nativos e valores inteiros em
+centavos. Cada usuário é migrado na primeira visita às páginas financeiras;
+este módulo define a classe SchemaMigrator, que migra todos os usuários de
+uma vez, em paralelo, sem esperar pelas visitas.
+
+A migração é retomável e idempotente: os gastos de cada usuário são
+reescritos em lotes, cada gasto migrado registra a versão do esquema e cada
+usuário concluído recebe um marcador em `meta`. Uma execução interrompida
+pode ser repetida, e continua dos usuários e gastos restantes. Executado
+pela linha de comando:
+
+    python -m core.migrations --key chave.json --bucket meu-bucket
+    python -m core.migrations --key chave.json --bucket meu-bucket --dry-run
+    python -m core.migrations --key chave.json --bucket meu-bucket --user UID
+"""
+
+import argparse
+import json
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from .expense_service import ExpenseService
+from .firebase_manager import FirebaseManager
+
+# Quantidade padrão de usuários migrados simultaneamente.
+DEFAULT_MIGRATION_WORKERS = 8
+
+# Coleção cujos documentos são os usuários com dados no Firestore.
+USERS_COLLECTION = "users"
+
+
+@dataclass(slots=True)
+class MigrationReport:
+    """O resultado de uma migração de esquema.
+
+    Attributes:
+        dry_run (bool): Se a migração apenas contou, sem gravar.
+        users (int): Quantidade de usuários verificados.
+        up_to_date_users (int): Usuários já migrados em execuções anteriores.
+        migrated_users (int): Usuários migrados (ou a migrar) nesta execução.
+        scanned_expenses (int): Quantidade de gastos lidos.
+        migrated_expenses (int): Gastos reescritos (ou a reescrever).
+        failed_users (list[str]): Os UIDs cuja migração falhou.
+    """
+
+    dry_run: bool
+    users: int = 0
+    up_to_date_users: int = 0
+    migrated_users: int = 0
+    scanned_expenses: int = 0
+    migrated_expenses: int = 0
+    failed_users: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        """Converte o relatório em um dicionário serializável em JSON."""
+        return asdict(self)
+
+
+class SchemaMigrator:
+    """Migra os gastos de todos os usuários para o esquema atual.
+
+    Attributes:
+        fb_manager (FirebaseManager): O gerenciador do Firebase.
+        max_workers (int): A quantidade máxima de usuários migrados ao mesmo tempo.
+    """
+
+    def __init__(
+        self,
+        firebase_manager: FirebaseManager,
+        max_workers: int = DEFAULT_MIGRATION_WORKERS,
+    ):
+        """Inicializa o migrador.
+
+        Args:
+            firebase_manager (FirebaseManager): Instância do gerenciador
+                do Firebase para interagir com o Firestore.
+            max_workers (int): A quantidade máxima de usuários migrados ao
+                               mesmo tempo.
+        """
+        self.fb_manager = firebase_manager
+        self.max_workers = max_workers
+
+    def migrate_user(self, user_uid: str, dry_run: bool = False) -> dict | None:
+        """Migra os gastos de um usuário, se ainda não foram migrados.
+
+        Args:
+            user_uid (str): O UID do usuário.
+            dry_run (bool): Se True, apenas conta os gastos a migrar.
+
+        Returns:
+            dict | None: O resultado de `ExpenseService.migrate_schema`, com
+                         `up_to_date` indicando se o usuário já estava
+                         migrado, ou None se a migração falhou.
+        """
+        service = ExpenseService(self.fb_manager, user_uid)
+        if service.is_migrated():
+            return {"up_to_date": True, "scanned": 0, "migrated": 0}
+        result = service.migrate_schema(dry_run=dry_run)
+        if result is None:
+            return None
+        return {"up_to_date": False, **result}
+
+    def run(
+        self,
+        dry_run: bool = False,
+        user_uid: str | None = None,
+        on_progress: callable = None,
+    ) -> MigrationReport:
+        """Executa a migração para um usuário ou para todos, em paralelo.
+
+        Os usuários são listados aos poucos, com no máximo algumas migrações
+        pendentes por vez, de modo que a memória independe da quantidade de
+        usuários.
+
+        Args:
+            dry_run (bool): Se True, apenas conta os gastos a migrar.
+            user_uid (str | None): Restringe a migração a um usuário.
+            on_progress (callable, optional): Função chamada com o relatório
+                parcial ao fim de cada usuário.
+
+        Returns:
+            MigrationReport: O relatório da migração.
+        """
+        report = MigrationReport(dry_run=dry_run)
+        users = (
+            [user_uid]
+            if user_uid
+            else self.fb_manager.iter_document_ids(USERS_COLLECTION)
+        )
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="sigp-migrate"
+        ) as executor:
+            in_flight = {}
+            for uid in users:
+                if len(in_flight) >= self.max_workers * 4:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    self._collect(done, in_flight, report, on_progress)
+                future = executor.submit(self.migrate_user, uid, dry_run)
+                in_flight[future] = uid
+            self._collect(list(in_flight), in_flight, report, on_progress)
+        return report
+
+    @staticmethod
+    def _collect(
+        futures, in_flight: dict, report: MigrationReport, on_progress: callable
+    ):
+        """Contabiliza o resultado das migrações de usuários concluídas."""
+        for future in futures:
+            uid = in_flight.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Erro ao migrar o usuário {uid}: {e}")
+                result = None
+
+            report.users += 1
+            if result is None:
+                report.failed_users.append(uid)
+            elif result["up_to_date"]:
+                report.up_to_date_users += 1
+            else:
+                report.migrated_users += 1
+                report.scanned_expenses += result["scanned"]
+                report.migrated_expenses += result["migrated"]
+            if on_progress is not None:
+                on_progress(report)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Ponto de entrada da linha de comando da migração.
+
+    Args:
+        argv (list[str] | None): Os argumentos da linha de comando.
+
+    Returns:
+        int: O código de saída (1 se a migração de algum usuário falhou).
+    """
+    parser = argparse.ArgumentParser(
+        description="Migra os gastos dos usuários para o esquema atual."
+    )
+    parser.add_argument(
+        "--key", required=True, help="Caminho do JSON da conta de serviço."
+    )
+    parser.add_argument("--bucket", required=True, help="O bucket do Cloud Storage.")
+    parser.add_argument("--user", help="Restringe a migração a um UID.")
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Apenas conta os gastos a migrar, sem gravar.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_MIGRATION_WORKERS,
+        help="Quantidade de usuários migrados simultaneamente.",
+    )
+    args = parser.parse_args(argv)
+
+    firebase_manager = FirebaseManager(args.key, args.bucket, web_api_key="")
+    migrator = SchemaMigrator(firebase_manager, max_workers=args.workers)
+    report = migrator.run(
+        dry_run=args.dry_run,
+        user_uid=args.user,
+        on_progress=lambda partial: print(
+            f"{partial.users} usuário(s), {partial.migrated_expenses} gasto(s) "
+            f"migrado(s), {len(partial.failed_users)} falha(s)",
+            file=sys.stderr,
+        ),
+    )
+    print(json.dumps(report.to_dict(), ensure_ascii=False, indent=2))
+    return 1 if report.failed_users else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,366 @@
+"""
+Módulo de modelos tipados dos registros do Firestore.
+
+Este módulo define dataclasses compactas (com `__slots__`) para os registros
+exibidos nas páginas — gastos, exames, anotações, treinos e documentos — e
+um único conversor, `to_record`, que transforma os dados brutos do Firestore
+no modelo correspondente. As datas são interpretadas uma única vez na
+conversão, em vez de a cada renderização.
+"""
+
+from dataclasses import dataclass, fields
+from datetime import date, datetime
+from typing import ClassVar
+
+
+def _text(value) -> str:
+    return "" if value is None else str(value)
+
+
+def _number(value) -> float:
+    try:
+        return float(value) if value is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _integer(value) -> int:
+    try:
+        return int(value) if value is not None else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def _flag(value) -> bool:
+    return bool(value)
+
+
+def _integers(value) -> tuple[int, ...]:
+    return tuple(_integer(item) for item in value or ())
+
+
+def _numbers(value) -> tuple[float, ...]:
+    return tuple(_number(item) for item in value or ())
+
+
+def _optional_text(value) -> str | None:
+    return None if value is None else str(value)
+
+
+def _day(value) -> date | None:
+    """Converte 'AAAA-MM-DD', date ou datetime em date."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        try:
+            return date.fromisoformat(value[:10])
+        except ValueError:
+            return None
+    return None
+
+
+def _month(value) -> date | None:
+    """Converte 'MM/AAAA', date ou datetime no primeiro dia do mês."""
+    if isinstance(value, str):
+        try:
+            month, year = value.split("/")
+            return date(int(year), int(month), 1)
+        except ValueError:
+            return None
+    day = _day(value)
+    return day.replace(day=1) if day is not None else None
+
+
+def _reais_to_cents(value) -> int:
+    """Converte um valor em reais (float) em centavos."""
+    return round(_number(value) * 100)
+
+
+def _moment(value) -> datetime | None:
+    """Converte um Timestamp do Firestore, datetime ou string ISO em datetime."""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return None
+
+
+@dataclass(slots=True, frozen=True)
+class Expense:
+    """Um gasto fixo ou de cartão de crédito (coleção 'gastos').
+
+    Os gastos do esquema 2 (`schema_version`) gravam as datas como Timestamp,
+    `fim_parcelamento` como o primeiro dia do mês da última parcela e os
+    valores em centavos; os do esquema 1, ainda não migrados, guardam texto e
+    reais (float) e são convertidos aqui. `valor` e `valor_parcela` são os
+    valores em reais, para exibição.
+    """
+
+    id: str
+    descricao: str
+    valor_centavos: int
+    tipo: str
+    categoria: str
+    data: date | None
+    criado_em: datetime | None
+    parcelas: int
+    valor_parcela_centavos: int
+    fim_parcelamento: date | None
+    schema_version: int
+
+    PARSERS: ClassVar[dict] = {
+        "descricao": _text,
+        "valor_centavos": _integer,
+        "tipo": _text,
+        "categoria": _text,
+        "data": _day,
+        "criado_em": _moment,
+        "parcelas": lambda value: _integer(value) or 1,
+        "valor_parcela_centavos": _integer,
+        "fim_parcelamento": _month,
+        "schema_version": lambda value: _integer(value) or 1,
+    }
+
+    # Campos lidos do esquema 1 quando o documento não tem o campo atual:
+    # `{campo: (campo antigo, conversor)}`.
+    LEGACY_FIELDS: ClassVar[dict] = {
+        "valor_centavos": ("valor", _reais_to_cents),
+        "valor_parcela_centavos": ("valor_parcela", _reais_to_cents),
+    }
+
+    @property
+    def valor(self) -> float:
+        """O valor do gasto, em reais."""
+        return self.valor_centavos / 100
+
+    @property
+    def valor_parcela(self) -> float:
+        """O valor de cada parcela, em reais."""
+        return self.valor_parcela_centavos / 100
+
+
+@dataclass(slots=True, frozen=True)
+class Exam:
+    """Um exame médico agendado (coleção 'exames').
+
+    `when` combina `date` e `time` em um único campo ordenável, usado nas
+    consultas; exames antigos sem ele são preenchidos por `ExamService`.
+    """
+
+    id: str
+    title: str
+    date: date | None
+    time: str
+    when: datetime | None
+    local: str
+    doctor: str
+    notes: str
+    completed: bool
+    created_at: datetime | None
+    updated_at: datetime | None
+
+    PARSERS: ClassVar[dict] = {
+        "title": _text,
+        "date": _day,
+        "time": lambda value: value or "Não informado",
+        "when": _moment,
+        "local": _text,
+        "doctor": _text,
+        "notes": _text,
+        "completed": _flag,
+        "created_at": _moment,
+        "updated_at": _moment,
+    }
+
+
+@dataclass(slots=True, frozen=True)
+class Note:
+    """Uma anotação do usuário (coleção 'anotacoes').
+
+    Anotações grandes não trazem `content`: o conteúdo comprimido fica em
+    'anotacoes_corpo' (`has_body`), e a lista recebe apenas `preview`.
+    """
+
+    id: str
+    title: str
+    content: str
+    preview: str
+    content_size: int
+    has_body: bool
+    created_at: datetime | None
+    updated_at: datetime | None
+
+    PARSERS: ClassVar[dict] = {
+        "title": _text,
+        "content": _text,
+        "preview": _text,
+        "content_size": _integer,
+        "has_body": _flag,
+        "created_at": _moment,
+        "updated_at": _moment,
+    }
+
+
+@dataclass(slots=True, frozen=True)
+class Workout:
+    """Um exercício de treino (coleção 'treinos')."""
+
+    id: str
+    exercise_name: str
+    muscle_group: str
+    warmup_sets: int
+    warmup_reps: int
+    weight_add: float
+    sets: int
+    reps: int
+    weight: float
+    notes: str
+    created_at: datetime | None
+    updated_at: datetime | None
+
+    PARSERS: ClassVar[dict] = {
+        "exercise_name": _text,
+        "muscle_group": _text,
+        "warmup_sets": _integer,
+        "warmup_reps": _integer,
+        "weight_add": _number,
+        "sets": _integer,
+        "reps": _integer,
+        "weight": _number,
+        "notes": _text,
+        "created_at": _moment,
+        "updated_at": _moment,
+    }
+
+
+@dataclass(slots=True, frozen=True)
+class WorkoutSession:
+    """Uma sessão realizada de um exercício (coleção 'treinos_sessoes').
+
+    As séries ficam em listas paralelas no mesmo documento: a série `i` teve
+    `reps[i]` repetições com `weights[i]` kg.
+    """
+
+    id: str
+    exercise_id: str
+    performed_at: datetime | None
+    reps: tuple[int, ...]
+    weights: tuple[float, ...]
+    notes: str
+
+    PARSERS: ClassVar[dict] = {
+        "exercise_id": _text,
+        "performed_at": _moment,
+        "reps": _integers,
+        "weights": _numbers,
+        "notes": _text,
+    }
+
+
+@dataclass(slots=True, frozen=True)
+class DocumentMeta:
+    """Os metadados de um arquivo enviado (coleção 'documents').
+
+    `file_url` e `thumbnail_url` só existem em documentos antigos, enviados
+    quando os arquivos eram públicos; os novos são acessados por URLs
+    assinadas geradas a partir de `storage_path` e `thumbnail_path`.
+    """
+
+    id: str
+    name: str
+    description: str
+    file_url: str
+    mime_type: str
+    storage_path: str | None
+    uploaded_at: datetime | None
+    content_hash: str | None
+    size: int
+    thumbnail_path: str | None
+    thumbnail_url: str | None
+
+    PARSERS: ClassVar[dict] = {
+        "name": _text,
+        "description": _text,
+        "file_url": _text,
+        "mime_type": _text,
+        "storage_path": _optional_text,
+        "uploaded_at": _moment,
+        "content_hash": _optional_text,
+        "size": _integer,
+        "thumbnail_path": _optional_text,
+        "thumbnail_url": _optional_text,
+    }
+
+
+@dataclass(slots=True, frozen=True)
+class Tombstone:
+    """Um registro excluído, mantido para as exportações incrementais.
+
+    Guarda apenas o ID do registro original e o momento da exclusão
+    (ex: coleção 'exames_excluidos').
+    """
+
+    id: str
+    deleted_at: datetime | None
+
+    PARSERS: ClassVar[dict] = {
+        "deleted_at": _moment,
+    }
+
+
+# Ordem dos campos (exceto 'id') de cada modelo, calculada uma única vez.
+_FIELD_PARSERS: dict[type, tuple] = {}
+
+
+def to_record(model: type, document_id: str, data: dict):
+    """Converte os dados brutos de um documento do Firestore no modelo indicado.
+
+    Campos ausentes recebem o valor padrão do seu conversor, e datas em texto
+    são interpretadas aqui, uma única vez. Campos renomeados entre versões do
+    esquema (`LEGACY_FIELDS` do modelo) são lidos do nome antigo quando o
+    documento ainda não tem o atual.
+
+    Args:
+        model (type): A classe do modelo (ex: Expense).
+        document_id (str): O ID do documento no Firestore.
+        data (dict): Os dados brutos do documento.
+
+    Returns:
+        Uma instância de `model`.
+    """
+    parsers = _FIELD_PARSERS.get(model)
+    if parsers is None:
+        legacy_fields = getattr(model, "LEGACY_FIELDS", {})
+        parsers = _FIELD_PARSERS[model] = tuple(
+            (field.name, model.PARSERS[field.name], legacy_fields.get(field.name))
+            for field in fields(model)
+            if field.name != "id"
+        )
+    get = data.get
+    return model(
+        document_id,
+        *[
+            (
+                parse(get(name))
+                if legacy is None or name in data
+                else legacy[1](get(legacy[0]))
+            )
+            for name, parse, legacy in parsers
+        ],
+    )
+
+
+def sort_key_moment(value: datetime | None) -> float:
+    """Chave de ordenação para datas opcionais, com ausentes no início.
+
+    Converte para o timestamp POSIX, evitando comparar datas com e sem fuso.
+
+    Args:
+        value (datetime | None): A data a ser ordenada.
+    """
+    return value.timestamp() if value is not None else float("-inf")
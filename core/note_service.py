@@ -0,0 +1,265 @@
+"""
+Módulo de serviço para gerenciar as anotações dos usuários.
+
+Este módulo define a classe NoteService, que orquestra a criação, a edição e
+a exclusão de anotações no Firestore, mantendo o índice de busca atualizado.
+Conteúdos grandes são gravados comprimidos (zlib) em um documento separado,
+e o documento da lista guarda apenas uma prévia e o tamanho: a lista de
+anotações transfere poucos bytes, e o conteúdo completo só é baixado e
+descomprimido quando o usuário abre a anotação.
+"""
+
+import zlib
+from firebase_admin import firestore
+from .firebase_manager import FirebaseManager
+from .models import Note
+from .search_index import SearchIndex
+
+# Tipo das anotações no índice de busca (o nome da coleção).
+NOTES_KIND = "anotacoes"
+
+# Conteúdos a partir deste tamanho (em bytes UTF-8) são comprimidos.
+NOTE_COMPRESSION_THRESHOLD = 2048
+
+# Quantidade de caracteres da prévia exibida na lista de anotações.
+NOTE_PREVIEW_LENGTH = 200
+
+
+def note_text(title: str, content: str) -> str:
+    """Retorna o texto indexado de uma anotação (título e conteúdo)."""
+    return f"{title}\n{content}"
+
+
+class NoteService:
+    """Gerencia as anotações de um usuário e o seu índice de busca.
+
+    As anotações ficam em `users/{uid}/anotacoes`. Conteúdos grandes são
+    gravados em `users/{uid}/anotacoes_corpo/{id}`, comprimidos, e a anotação
+    guarda `preview`, `content_size` e `has_body` no lugar de `content`.
+
+    Attributes:
+        fb_manager (FirebaseManager): O gerenciador do Firebase.
+        user_uid (str): O UID do usuário dono das anotações.
+        search_index (SearchIndex): O índice de busca do usuário.
+    """
+
+    def __init__(self, firebase_manager: FirebaseManager, user_uid: str):
+        """Inicializa o serviço de anotações de um usuário.
+
+        Args:
+            firebase_manager (FirebaseManager): Instância do gerenciador
+                do Firebase para interagir com o Firestore.
+            user_uid (str): O UID do usuário dono das anotações.
+        """
+        self.fb_manager = firebase_manager
+        self.user_uid = user_uid
+        self.search_index = SearchIndex(firebase_manager, user_uid)
+
+    @property
+    def notes_path(self) -> str:
+        """O caminho da coleção de anotações do usuário."""
+        return f"users/{self.user_uid}/anotacoes"
+
+    @property
+    def bodies_path(self) -> str:
+        """O caminho da coleção de conteúdos comprimidos do usuário."""
+        return f"users/{self.user_uid}/anotacoes_corpo"
+
+    def list_notes(self) -> list[Note]:
+        """Retorna as anotações do usuário, sem os conteúdos comprimidos."""
+        return self.fb_manager.get_all_records(self.notes_path, Note)
+
+    @staticmethod
+    def _split_content(content: str) -> tuple[dict, bytes | None]:
+        """Separa os campos da lista e o corpo comprimido de um conteúdo.
+
+        Returns:
+            tuple[dict, bytes | None]: Os campos de conteúdo da anotação e o
+                corpo comprimido, ou None se o conteúdo fica na própria
+                anotação.
+        """
+        encoded = content.encode("utf-8")
+        if len(encoded) >= NOTE_COMPRESSION_THRESHOLD:
+            body = zlib.compress(encoded)
+            # Textos pouco compressíveis ficam na anotação, como antes.
+            if len(body) < len(encoded):
+                return {
+                    "content": firestore.DELETE_FIELD,
+                    "preview": content[:NOTE_PREVIEW_LENGTH],
+                    "content_size": len(encoded),
+                    "has_body": True,
+                }, body
+        return {
+            "content": content,
+            "preview": firestore.DELETE_FIELD,
+            "content_size": len(encoded),
+            "has_body": False,
+        }, None
+
+    def load_content(self, note: Note) -> str | None:
+        """Retorna o conteúdo completo de uma anotação.
+
+        Conteúdos comprimidos são baixados e descomprimidos apenas aqui.
+
+        Args:
+            note (Note): A anotação.
+
+        Returns:
+            str | None: O conteúdo completo, ou None se o corpo comprimido não
+                        puder ser carregado (a prévia não o substitui, para
+                        que uma edição não grave o conteúdo truncado).
+        """
+        if not note.has_body:
+            return note.content
+        body = self.fb_manager.get_document(self.bodies_path, note.id) or {}
+        return self._decompress(body.get("body"))
+
+    @staticmethod
+    def _decompress(body: bytes | None) -> str | None:
+        """Descomprime um corpo, retornando None se ele faltar ou estiver corrompido."""
+        if body is None:
+            return None
+        try:
+            return zlib.decompress(body).decode("utf-8")
+        except (zlib.error, UnicodeDecodeError) as e:
+            print(f"Erro ao descomprimir anotação: {e}")
+            return None
+
+    def load_texts(self, notes: list[Note]) -> dict[str, str]:
+        """Retorna o texto indexável de várias anotações, por ID.
+
+        Os corpos comprimidos são buscados em uma única requisição.
+
+        Args:
+            notes (list[Note]): As anotações.
+        """
+        bodies = self.fb_manager.get_documents(
+            self.bodies_path, [note.id for note in notes if note.has_body]
+        )
+        texts = {}
+        for note in notes:
+            content = note.content
+            if note.has_body:
+                # Sem o corpo, ao menos a prévia entra no índice.
+                content = (
+                    self._decompress(bodies.get(note.id, {}).get("body"))
+                    or note.preview
+                )
+            texts[note.id] = note_text(note.title, content)
+        return texts
+
+    def ensure_search_index(self):
+        """Indexa, uma única vez, as anotações criadas antes do índice de busca."""
+        if not self.search_index.is_built(NOTES_KIND):
+            notes = self.list_notes()
+            self.search_index.build(
+                NOTES_KIND,
+                self.load_texts(notes),
+                {note.id: note.title for note in notes},
+            )
+
+    def create(self, title: str, content: str) -> str | None:
+        """Cria uma anotação e a adiciona ao índice de busca.
+
+        A anotação e o seu corpo comprimido são gravados no mesmo lote: ou
+        ambos são criados, ou nenhum.
+
+        Args:
+            title (str): O título da anotação.
+            content (str): O conteúdo da anotação.
+
+        Returns:
+            str | None: O ID da anotação criada, ou None em caso de erro.
+        """
+        fields, body = self._split_content(content)
+        # Na criação, não há campos a remover.
+        fields = {
+            key: value
+            for key, value in fields.items()
+            if value is not firestore.DELETE_FIELD
+        }
+        doc_id = self.fb_manager.new_document_id(self.notes_path)
+        operations = [
+            (
+                self.notes_path,
+                doc_id,
+                {
+                    "title": title,
+                    **fields,
+                    "created_at": firestore.SERVER_TIMESTAMP,
+                    "updated_at": firestore.SERVER_TIMESTAMP,
+                    "user_uid": self.user_uid,
+                },
+            )
+        ]
+        if body is not None:
+            operations.append(
+                (self.bodies_path, doc_id, {"body": body, "encoding": "zlib"})
+            )
+        if not self.fb_manager.batch_write(operations):
+            return None
+        self.search_index.update(
+            NOTES_KIND, doc_id, "", note_text(title, content), label=title
+        )
+        return doc_id
+
+    def update(self, note: Note, old_content: str, title: str, content: str) -> bool:
+        """Atualiza uma anotação e os termos alterados no índice de busca.
+
+        A anotação e o seu corpo comprimido são gravados no mesmo lote, de
+        modo que ela nunca aponta para um corpo desatualizado.
+
+        Args:
+            note (Note): A anotação antes da edição.
+            old_content (str): O conteúdo completo antes da edição.
+            title (str): O novo título.
+            content (str): O novo conteúdo.
+
+        Returns:
+            bool: True se a anotação foi atualizada, False caso contrário.
+        """
+        fields, body = self._split_content(content)
+        operations = [
+            (
+                self.notes_path,
+                note.id,
+                {
+                    "title": title,
+                    **fields,
+                    "updated_at": firestore.SERVER_TIMESTAMP,
+                },
+            )
+        ]
+        if body is not None:
+            operations.append(
+                (self.bodies_path, note.id, {"body": body, "encoding": "zlib"})
+            )
+        if not self.fb_manager.batch_write(operations):
+            return False
+        # Um corpo que deixou de ser usado é apenas excluído depois: a
+        # anotação já não aponta para ele.
+        if body is None and note.has_body:
+            self.fb_manager.delete_document(self.bodies_path, note.id)
+        self.search_index.update(
+            NOTES_KIND,
+            note.id,
+            note_text(note.title, old_content),
+            note_text(title, content),
+            label=title,
+        )
+        return True
+
+    def delete(self, note: Note):
+        """Exclui uma anotação, o seu corpo comprimido e as suas entradas no índice.
+
+        Args:
+            note (Note): A anotação a excluir.
+        """
+        # Sem o corpo, as entradas da prévia ainda são removidas do índice.
+        old_content = self.load_content(note) or note.preview
+        self.fb_manager.delete_document(self.notes_path, note.id)
+        if note.has_body:
+            self.fb_manager.delete_document(self.bodies_path, note.id)
+        self.search_index.update(
+            NOTES_KIND, note.id, note_text(note.title, old_content), ""
+        )
@@ -0,0 +1,200 @@
+"""
+Módulo de serviço da página de visão geral.
+
+Este módulo define a classe OverviewService, que reúne em uma única chamada
+os dados da visão geral do usuário: os próximos exames, os gastos do mês em
+relação à renda, a quantidade de anotações, documentos e exercícios e as
+atividades mais recentes. Os totais e as quantidades vêm de consultas de
+agregação, e as listas, de consultas ordenadas e limitadas; todas são feitas
+em paralelo, de modo que a página custa poucas leituras e o tempo de uma
+única ida ao Firestore, em vez de carregar cada coleção.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from firebase_admin import firestore
+from .document_service import DOCUMENTS_KIND, DocumentService
+from .exam_service import EXAMS_KIND, ExamService
+from .expense_service import EXPENSES_KIND, ExpenseService
+from .firebase_manager import FirebaseManager
+from .models import DocumentMeta, Exam, Expense, Note, Workout, sort_key_moment
+from .note_service import NOTES_KIND, NoteService
+from .request_context import submit_in_context
+from .workout_service import WORKOUTS_KIND, WorkoutService
+
+# Quantidade de próximos exames exibidos na visão geral.
+OVERVIEW_EXAMS_LIMIT = 5
+
+# Quantidade de atividades recentes exibidas na visão geral.
+RECENT_ACTIVITY_LIMIT = 8
+
+# Quantidade máxima de consultas simultâneas da visão geral.
+OVERVIEW_WORKERS = 8
+
+
+class OverviewService:
+    """Reúne os dados da visão geral de um usuário.
+
+    Attributes:
+        fb_manager (FirebaseManager): O gerenciador do Firebase.
+        user_uid (str): O UID do usuário.
+    """
+
+    def __init__(self, firebase_manager: FirebaseManager, user_uid: str):
+        """Inicializa o serviço da visão geral de um usuário.
+
+        Args:
+            firebase_manager (FirebaseManager): Instância do gerenciador
+                do Firebase para interagir com o Firestore.
+            user_uid (str): O UID do usuário.
+        """
+        self.fb_manager = firebase_manager
+        self.user_uid = user_uid
+        self.exam_service = ExamService(firebase_manager, user_uid)
+        self.expense_service = ExpenseService(firebase_manager, user_uid)
+        self.notes_path = NoteService(firebase_manager, user_uid).notes_path
+        self.workouts_path = WorkoutService(firebase_manager, user_uid).workouts_path
+        self.documents_path = DocumentService.documents_path(user_uid)
+
+    def _upcoming_exams(self) -> list[Exam]:
+        """Retorna os próximos exames, preenchendo antes os exames antigos."""
+        self.exam_service.ensure_when_field()
+        return self.exam_service.upcoming(limit=OVERVIEW_EXAMS_LIMIT)
+
+    def _spending(self, today: date | None) -> dict | None:
+        """Retorna os gastos do mês, migrando antes os gastos antigos.
+
+        Sem a migração, a soma deixaria os gastos antigos de fora; nesse caso,
+        retorna None, e a página avisa que os gastos não foram calculados.
+        """
+        if not self.expense_service.ensure_schema():
+            return None
+        return self.expense_service.month_spending(today)
+
+    def _income(self) -> float:
+        """Retorna a renda mensal registrada (0 se não houver)."""
+        income = self.fb_manager.get_document(
+            f"users/{self.user_uid}/financias", "renda_mensal"
+        )
+        return (income or {}).get("valor", 0)
+
+    def _recent(
+        self, kind: str, collection_name: str, model: type, field: str, label: str
+    ) -> list[tuple]:
+        """Retorna os registros mais recentes de uma coleção.
+
+        Args:
+            kind (str): O tipo dos registros (o nome da coleção).
+            collection_name (str): O caminho da coleção.
+            model (type): A classe do modelo dos registros.
+            field (str): O campo de data usado na ordenação.
+            label (str): O campo exibido como rótulo.
+
+        Returns:
+            list[tuple]: Tuplas `(tipo, rótulo, momento)`.
+        """
+        records = self.fb_manager.query_records(
+            collection_name,
+            model,
+            order_by=[(field, firestore.Query.DESCENDING)],
+            limit=RECENT_ACTIVITY_LIMIT,
+        )
+        return [
+            (kind, getattr(record, label), getattr(record, field)) for record in records
+        ]
+
+    def load(self, today: date | None = None) -> dict:
+        """Carrega os dados da visão geral, com as consultas em paralelo.
+
+        Args:
+            today (date | None): O dia de referência do mês. Se None, o atual.
+
+        Returns:
+            dict: `upcoming_exams` (list[Exam]), `income` (float), `spending`
+                (dict | None, de `ExpenseService.month_spending`), `counts`
+                (quantidade de `notes`, `documents` e `workouts`, ou None se a
+                contagem falhou) e `recent` (tuplas `(tipo, rótulo, momento)`,
+                das mais recentes às mais antigas).
+        """
+        tasks = {
+            "upcoming_exams": (self._upcoming_exams,),
+            "income": (self._income,),
+            "spending": (self._spending, today),
+            "notes": (self.fb_manager.count_documents, self.notes_path),
+            "documents": (self.fb_manager.count_documents, self.documents_path),
+            "workouts": (self.fb_manager.count_documents, self.workouts_path),
+            "recent_notes": (
+                self._recent,
+                NOTES_KIND,
+                self.notes_path,
+                Note,
+                "updated_at",
+                "title",
+            ),
+            "recent_expenses": (
+                self._recent,
+                EXPENSES_KIND,
+                self.expense_service.expenses_path,
+                Expense,
+                "criado_em",
+                "descricao",
+            ),
+            "recent_exams": (
+                self._recent,
+                EXAMS_KIND,
+                self.exam_service.exams_path,
+                Exam,
+                "updated_at",
+                "title",
+            ),
+            "recent_documents": (
+                self._recent,
+                DOCUMENTS_KIND,
+                self.documents_path,
+                DocumentMeta,
+                "uploaded_at",
+                "name",
+            ),
+            "recent_workouts": (
+                self._recent,
+                WORKOUTS_KIND,
+                self.workouts_path,
+                Workout,
+                "updated_at",
+                "exercise_name",
+            ),
+        }
+
+        with ThreadPoolExecutor(
+            max_workers=OVERVIEW_WORKERS, thread_name_prefix="sigp-overview"
+        ) as executor:
+            futures = {
+                name: submit_in_context(executor, *task) for name, task in tasks.items()
+            }
+
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                print(f"Erro ao carregar a visão geral ({name}): {e}")
+                results[name] = None
+
+        recent = [
+            item
+            for name in results
+            if name.startswith("recent_")
+            for item in results[name] or []
+        ]
+        recent.sort(key=lambda item: sort_key_moment(item[2]), reverse=True)
+        return {
+            "upcoming_exams": results["upcoming_exams"] or [],
+            "income": results["income"] or 0,
+            "spending": results["spending"],
+            "counts": {
+                "notes": results["notes"],
+                "documents": results["documents"],
+                "workouts": results["workouts"],
+            },
+            "recent": recent[:RECENT_ACTIVITY_LIMIT],
+        }
@@ -0,0 +1,165 @@
+"""
+Módulo de perfilamento opcional de uma execução do script.
+
+Este módulo define a classe RerunProfiler, usada pelo UIController para
+perfilar uma execução (rerun) completa quando solicitado. Ela combina o
+cProfile, que gera um arquivo `.prof` compatível com `pstats`/snakeviz, com
+um amostrador de pilhas que gera um arquivo de pilhas colapsadas (`.folded`)
+pronto para ferramentas de flamegraph, como `flamegraph.pl` e speedscope.
+"""
+
+import cProfile
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from .request_context import current_context
+
+# Extensões dos arquivos gravados para cada execução perfilada.
+PROFILE_EXTENSIONS = (".prof", ".folded", ".json")
+
+
+class RerunProfiler:
+    """Perfila a thread atual enquanto o contexto estiver aberto.
+
+    Ao sair do contexto, grava no diretório configurado três arquivos com o
+    mesmo prefixo (data/hora e página): o perfil do cProfile (`.prof`), as
+    pilhas colapsadas amostradas (`.folded`) e os metadados da execução
+    (`.json`), incluindo o usuário e o tamanho das coleções lidas. Os
+    arquivos das execuções mais antigas que as `max_runs` mais recentes são
+    removidos, limitando o espaço ocupado em disco. Se outro perfilador já
+    estiver ativo, a execução segue sem perfil e nada é gravado.
+
+    Attributes:
+        output_dir (str): O diretório onde os perfis são gravados.
+        sample_interval (float): O intervalo entre amostras de pilha, em segundos.
+        max_runs (int): A quantidade máxima de execuções mantidas no diretório.
+    """
+
+    def __init__(
+        self, output_dir: str, sample_interval: float = 0.005, max_runs: int = 50
+    ):
+        """Prepara o perfilador.
+
+        Args:
+            output_dir (str): O diretório onde os perfis serão gravados.
+            sample_interval (float): Intervalo entre amostras, em segundos.
+            max_runs (int): Quantidade máxima de execuções mantidas.
+        """
+        self.output_dir = output_dir
+        self.sample_interval = sample_interval
+        self.max_runs = max_runs
+        self._profile = cProfile.Profile()
+        self._stacks = Counter()
+        self._stop = threading.Event()
+        self._target_thread_id = None
+        self._sampler = None
+        self._started = None
+        self._active = False
+
+    def __enter__(self):
+        self._target_thread_id = threading.get_ident()
+        self._sampler = threading.Thread(
+            target=self._sample, name="sigp-rerun-sampler", daemon=True
+        )
+        self._started = time.perf_counter()
+        # O amostrador só começa depois do cProfile. Se outro perfilador já
+        # estiver ativo (no Python 3.12+, o cProfile é único por processo, e
+        # duas execuções perfiladas podem se sobrepor), a execução segue sem
+        # perfil, em vez de falhar a página do usuário.
+        try:
+            self._profile.enable()
+        except Exception as e:
+            print(f"Perfil da execução ignorado: {e}")
+            self._active = False
+            return self
+        try:
+            self._sampler.start()
+        except Exception as e:
+            self._profile.disable()
+            print(f"Perfil da execução ignorado: {e}")
+            self._active = False
+            return self
+        self._active = True
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if not self._active:
+            return False
+        self._profile.disable()
+        self._stop.set()
+        self._sampler.join()
+        duration_ms = (time.perf_counter() - self._started) * 1000
+        try:
+            self._write(duration_ms)
+            self._prune()
+        except Exception as e:
+            print(f"Erro ao gravar o perfil da execução: {e}")
+        return False
+
+    def _sample(self):
+        """Amostra periodicamente a pilha da thread perfilada."""
+        while not self._stop.wait(self.sample_interval):
+            frame = sys._current_frames().get(self._target_thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self._stacks[";".join(reversed(stack))] += 1
+
+    def _write(self, duration_ms: float):
+        """Grava o perfil, as pilhas colapsadas e os metadados da execução."""
+        context = current_context()
+        page = context.page if context is not None else None
+        user_uid = context.user_uid if context is not None else None
+        collection_sizes = dict(context.collection_sizes) if context else {}
+
+        page_tag = re.sub(r"[^\w-]+", "_", page or "sem_pagina").strip("_")
+        prefix = os.path.join(
+            self.output_dir,
+            f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}_{page_tag}",
+        )
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        self._profile.dump_stats(f"{prefix}.prof")
+
+        with open(f"{prefix}.folded", "w", encoding="utf-8") as file:
+            for stack, count in self._stacks.most_common():
+                file.write(f"{stack} {count}\n")
+
+        with open(f"{prefix}.json", "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "page": page,
+                    "user_uid": user_uid,
+                    "duration_ms": round(duration_ms, 1),
+                    "samples": sum(self._stacks.values()),
+                    "sample_interval_ms": self.sample_interval * 1000,
+                    "collection_sizes": collection_sizes,
+                },
+                file,
+                ensure_ascii=False,
+                indent=2,
+            )
+
+    def _prune(self):
+        """Remove os arquivos das execuções além das `max_runs` mais recentes."""
+        runs = {}
+        for name in os.listdir(self.output_dir):
+            prefix, extension = os.path.splitext(name)
+            if extension in PROFILE_EXTENSIONS:
+                runs.setdefault(prefix, []).append(name)
+        # O prefixo começa pela data/hora, então a ordem alfabética é a cronológica.
+        for prefix in sorted(runs)[: max(len(runs) - self.max_runs, 0)]:
+            for name in runs[prefix]:
+                try:
+                    os.remove(os.path.join(self.output_dir, name))
+                except OSError:
+                    pass
@@ -0,0 +1,189 @@
+"""
+Módulo de serviço para a exclusão definitiva de dados dos usuários.
+
+Este módulo define a classe PurgeService, que remove um item isolado ou
+todos os dados de um usuário. Os arquivos do Cloud Storage são excluídos
+em paralelo, por um pool limitado de threads, e os documentos do Firestore
+em gravações em lote, reduzindo o tempo de espera de exclusões grandes.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .firebase_manager import FirebaseManager
+from .request_context import submit_in_context
+from .search_index import forget_user_index
+
+# Coleções do usuário, em `users/{uid}/`, removidas na exclusão da conta.
+USER_COLLECTIONS = (
+    "gastos",
+    "exames",
+    "exames_excluidos",
+    "anotacoes",
+    "anotacoes_corpo",
+    "treinos",
+    "treinos_sessoes",
+    "documents",
+    "financias",
+    "content_index",
+    "meta",
+    "search_index",
+    "search_vocabulary",
+    "search_labels",
+)
+
+# Coleção dos perfis criados no cadastro (AuthService).
+PROFILE_COLLECTION = "usuarios"
+
+# Quantidade padrão de exclusões simultâneas no Storage.
+DEFAULT_PURGE_WORKERS = 8
+
+
+class PurgeService:
+    """Exclui arquivos e documentos de forma concorrente e em lote.
+
+    Attributes:
+        fb_manager (FirebaseManager): O gerenciador do Firebase.
+        max_workers (int): A quantidade máxima de exclusões simultâneas
+                           no Cloud Storage.
+    """
+
+    def __init__(
+        self,
+        firebase_manager: FirebaseManager,
+        max_workers: int = DEFAULT_PURGE_WORKERS,
+    ):
+        """Inicializa o serviço de exclusão com o gerenciador do Firebase.
+
+        Args:
+            firebase_manager (FirebaseManager): Instância do gerenciador
+                do Firebase para interagir com o Firestore e o Storage.
+            max_workers (int): A quantidade máxima de exclusões simultâneas.
+        """
+        self.fb_manager = firebase_manager
+        self.max_workers = max_workers
+
+    def delete_files(
+        self, storage_paths: list[str], on_progress: callable = None
+    ) -> list[str]:
+        """Exclui arquivos do Cloud Storage em paralelo.
+
+        O progresso é informado na thread do chamador, à medida que cada
+        exclusão termina.
+
+        Args:
+            storage_paths (list[str]): Os caminhos dos arquivos a excluir.
+            on_progress (callable, optional): Função chamada com
+                `(excluídos, total)` a cada arquivo processado.
+
+        Returns:
+            list[str]: Os caminhos cuja exclusão falhou (vazia em caso de
+                       sucesso total).
+        """
+        paths = list(dict.fromkeys(path for path in storage_paths if path))
+        if len(paths) <= 1:
+            failed = [path for path in paths if not self.fb_manager.delete_file(path)]
+            if on_progress is not None and paths:
+                on_progress(1, 1)
+            return failed
+
+        failed = []
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(paths)),
+            thread_name_prefix="sigp-purge",
+        ) as executor:
+            futures = {
+                submit_in_context(executor, self.fb_manager.delete_file, path): path
+                for path in paths
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                try:
+                    if not future.result():
+                        failed.append(futures[future])
+                except Exception as e:
+                    print(f"Erro ao deletar arquivo do Storage: {e}")
+                    failed.append(futures[future])
+                if on_progress is not None:
+                    on_progress(done, len(paths))
+        return failed
+
+    def purge_item(
+        self, collection_name: str, document_id: str, storage_paths: list[str] = ()
+    ) -> bool:
+        """Exclui um documento do Firestore e os arquivos associados a ele.
+
+        Os arquivos são excluídos primeiro e em paralelo. Se algum falhar, o
+        documento é mantido, para que a exclusão possa ser repetida.
+
+        Args:
+            collection_name (str): O nome da coleção do documento.
+            document_id (str): O ID do documento a ser excluído.
+            storage_paths (list[str]): Os caminhos dos arquivos associados.
+
+        Returns:
+            bool: True se o item foi excluído, False caso contrário.
+        """
+        if self.delete_files(storage_paths):
+            return False
+        self.fb_manager.delete_document(collection_name, document_id)
+        return True
+
+    def purge_user(
+        self, user_uid: str, on_progress: callable = None, delete_login: bool = True
+    ) -> dict | None:
+        """Exclui todos os dados de um usuário.
+
+        Remove, nesta ordem, os arquivos sob `users/{uid}/` no Storage, as
+        coleções de `USER_COLLECTIONS`, o perfil em `usuarios/{uid}` e,
+        opcionalmente, o login no Firebase Authentication. Se algum arquivo
+        não puder ser excluído, os documentos são mantidos, preservando as
+        referências para uma nova tentativa. Os uploads em segundo plano do
+        usuário devem ser cancelados antes (`UploadQueue.cancel_user`), para
+        que não recriem os dados excluídos.
+
+        Args:
+            user_uid (str): O UID do usuário.
+            on_progress (callable, optional): Função chamada com
+                `(etapa, concluídos, total)` durante a exclusão.
+            delete_login (bool): Se também deve excluir o usuário do
+                                 Firebase Authentication.
+
+        Returns:
+            dict | None: As quantidades de arquivos (`files`) e documentos
+                         (`documents`) excluídos, ou None se a exclusão
+                         não pôde ser concluída.
+        """
+
+        def report(stage: str, done: int, total: int):
+            if on_progress is not None:
+                on_progress(stage, done, total)
+
+        storage_paths = self.fb_manager.list_files(f"users/{user_uid}/")
+        if storage_paths is None:
+            return None
+        report("Arquivos", 0, len(storage_paths))
+        failed = self.delete_files(
+            storage_paths, lambda done, total: report("Arquivos", done, total)
+        )
+        if failed:
+            print(f"Erro ao excluir {len(failed)} arquivo(s) do usuário {user_uid}.")
+            return None
+
+        deleted_documents = 0
+        for position, collection in enumerate(USER_COLLECTIONS):
+            report(collection, position, len(USER_COLLECTIONS))
+            deleted = self.fb_manager.delete_collection(
+                f"users/{user_uid}/{collection}"
+            )
+            if deleted is None:
+                return None
+            deleted_documents += deleted
+        # O índice de busca guardado em memória pertencia às coleções excluídas.
+        forget_user_index(user_uid)
+        report("Coleções", len(USER_COLLECTIONS), len(USER_COLLECTIONS))
+
+        report("Perfil", 0, 1)
+        self.fb_manager.delete_document(PROFILE_COLLECTION, user_uid)
+        if delete_login and not self.fb_manager.delete_user_record(user_uid):
+            return None
+        report("Perfil", 1, 1)
+
+        return {"files": len(storage_paths), "documents": deleted_documents + 1}
@@ -0,0 +1,207 @@
+"""
+Módulo de comparação entre os registros tipados e os dicionários do Firestore.
+
+As páginas recebiam listas de `{id: dados}` e, a cada renderização,
+desempacotavam cada item e interpretavam as datas com `strptime`; hoje
+recebem os modelos compactos de `core.models`, convertidos uma única vez por
+leitura. Este módulo mede, sobre gastos sintéticos, a memória ocupada por
+cada representação, o custo da conversão e o de um laço de renderização.
+Não acessa o Firebase. Executado pela linha de comando:
+
+    python -m core.records_benchmark
+    python -m core.records_benchmark --records 100000 --runs 5
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from .expense_service import CARD_EXPENSE, EXPENSE_CATEGORIES, FIXED_EXPENSE
+from .models import Expense, to_record
+
+# Quantidade padrão de gastos sintéticos.
+DEFAULT_BENCHMARK_RECORDS = 100_000
+
+# Quantidade padrão de repetições de cada laço.
+DEFAULT_BENCHMARK_RUNS = 3
+
+
+@dataclass
+class RecordsBenchmarkResult:
+    """O custo medido de uma representação dos gastos.
+
+    Attributes:
+        representation (str): O nome da representação ('dicts' ou 'records').
+        records (int): A quantidade de gastos.
+        memory_mb (float): A memória ocupada pela lista, em MB.
+        convert_ms (float): O tempo de conversão a partir dos dados brutos,
+                            em milissegundos (0 para os dicionários).
+        loop_median_ms (float): A latência mediana do laço de renderização,
+                                em milissegundos.
+        loop_min_ms (float): A menor latência do laço, em milissegundos.
+    """
+
+    representation: str
+    records: int
+    memory_mb: float
+    convert_ms: float
+    loop_median_ms: float
+    loop_min_ms: float
+
+
+def synthetic_documents(count: int, seed: int = 0) -> list[dict]:
+    """Gera gastos no formato de `get_all_documents` (`[{id: dados}]`).
+
+    Args:
+        count (int): A quantidade de gastos.
+        seed (int): A semente do gerador, para resultados reproduzíveis.
+
+    Returns:
+        list[dict]: Os gastos, com datas em texto como no esquema 1.
+    """
+    rng = random.Random(seed)
+    start = date(2020, 1, 1)
+    documents = []
+    for index in range(count):
+        installments = rng.randint(1, 12)
+        value = round(rng.uniform(5, 2000), 2)
+        documents.append(
+            {
+                f"gasto{index:07d}": {
+                    "descricao": f"Gasto {index}",
+                    "valor": value,
+                    "tipo": rng.choice((FIXED_EXPENSE, CARD_EXPENSE)),
+                    "categoria": rng.choice(EXPENSE_CATEGORIES),
+                    "data": (start + timedelta(days=rng.randint(0, 2000))).isoformat(),
+                    "parcelas": installments,
+                    "valor_parcela": round(value / installments, 2),
+                }
+            }
+        )
+    return documents
+
+
+def loop_dicts(documents: list[dict]) -> float:
+    """O laço de renderização anterior: desempacota e interpreta as datas."""
+    total = 0.0
+    for item in documents:
+        doc_id, data = list(item.items())[0]
+        expense = {"id": doc_id, **data}
+        day = datetime.strptime(expense["data"], "%Y-%m-%d").date()
+        if day.year >= 2020:
+            total += expense["valor"]
+    return total
+
+
+def loop_records(records: list[Expense]) -> float:
+    """O laço de renderização atual: acessa os atributos dos registros."""
+    total = 0.0
+    for expense in records:
+        if expense.data is not None and expense.data.year >= 2020:
+            total += expense.valor
+    return total
+
+
+def _measured_size(build: callable) -> tuple[list, float]:
+    """Constrói uma lista medindo a memória alocada por ela, em MB."""
+    tracemalloc.start()
+    result = build()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, allocated / (1024 * 1024)
+
+
+def _timed_loop(loop: callable, items: list, runs: int) -> list[float]:
+    """Executa o laço `runs` vezes e retorna as latências, em milissegundos."""
+    latencies = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        loop(items)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def run_benchmark(
+    count: int = DEFAULT_BENCHMARK_RECORDS, runs: int = DEFAULT_BENCHMARK_RUNS
+) -> list[RecordsBenchmarkResult]:
+    """Mede as duas representações sobre `count` gastos sintéticos.
+
+    Args:
+        count (int): A quantidade de gastos.
+        runs (int): A quantidade de repetições de cada laço.
+
+    Returns:
+        list[RecordsBenchmarkResult]: O resultado dos dicionários e o dos
+                                      registros, nesta ordem.
+    """
+    documents, documents_mb = _measured_size(lambda: synthetic_documents(count))
+
+    def convert() -> list[Expense]:
+        return [
+            to_record(Expense, doc_id, data)
+            for item in documents
+            for doc_id, data in item.items()
+        ]
+
+    records, records_mb = _measured_size(convert)
+    # A conversão é cronometrada à parte: o tracemalloc a deixaria mais lenta.
+    convert_ms = statistics.median(_timed_loop(lambda _: convert(), documents, runs))
+
+    results = []
+    for representation, items, memory_mb, conversion, loop in (
+        ("dicts", documents, documents_mb, 0.0, loop_dicts),
+        ("records", records, records_mb, convert_ms, loop_records),
+    ):
+        latencies = _timed_loop(loop, items, runs)
+        results.append(
+            RecordsBenchmarkResult(
+                representation=representation,
+                records=count,
+                memory_mb=round(memory_mb, 1),
+                convert_ms=round(conversion, 1),
+                loop_median_ms=round(statistics.median(latencies), 1),
+                loop_min_ms=round(min(latencies), 1),
+            )
+        )
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Ponto de entrada da linha de comando da comparação.
+
+    Args:
+        argv (list[str] | None): Os argumentos da linha de comando.
+
+    Returns:
+        int: O código de saída.
+    """
+    parser = argparse.ArgumentParser(
+        description="Compara a memória e a iteração de registros tipados e dicionários."
+    )
+    parser.add_argument(
+        "--records",
+        type=int,
+        default=DEFAULT_BENCHMARK_RECORDS,
+        help="Quantidade de gastos sintéticos.",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=DEFAULT_BENCHMARK_RUNS,
+        help="Quantidade de repetições de cada laço.",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.records, args.runs)
+    json.dump([asdict(result) for result in results], sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Módulo de contexto de requisições com escopo de execução.
+
+Este módulo define a classe RequestContext, que acompanha uma única
+execução (rerun) do script Streamlit. Ela permite que leituras idênticas
+ao Firestore feitas durante a mesma execução sejam realizadas apenas uma
+vez, compartilhando o resultado (inclusive o que ainda está em andamento)
+entre todos os chamadores, e acumula as operações cobradas pelo Firestore
+atribuídas ao usuário e à página da execução.
+"""
+
+import contextvars
+import threading
+from concurrent.futures import Executor, Future
+from contextvars import ContextVar
+
+# Contexto ativo da execução atual. Cada thread de script do Streamlit possui
+# sua própria cópia, de modo que sessões simultâneas não compartilham dados.
+_current_context: ContextVar["RequestContext | None"] = ContextVar(
+    "sigp_request_context", default=None
+)
+
+
+class RequestContext:
+    """Agrupa e deduplica as leituras feitas durante uma execução do script.
+
+    Cada chave de leitura (por exemplo, `("get_document", coleção, id)`) é
+    associada a um `Future`. O primeiro chamador executa a leitura, e os
+    demais aguardam o mesmo resultado em vez de repetir a chamada de rede.
+    """
+
+    def __init__(self):
+        """Inicializa o contexto com um registro vazio de leituras."""
+        self._lock = threading.Lock()
+        self._requests: dict[tuple, Future] = {}
+        self.user_uid = None
+        self.page = None
+        self.usage = {"reads": 0, "writes": 0, "deletes": 0}
+        self.collection_sizes: dict[str, int] = {}
+
+    def count_usage(self, operation: str, amount: int = 1):
+        """Contabiliza documentos lidos, escritos ou excluídos nesta execução.
+
+        Args:
+            operation (str): 'reads', 'writes' ou 'deletes'.
+            amount (int): A quantidade de documentos afetados.
+        """
+        with self._lock:
+            self.usage[operation] += amount
+
+    def coalesce(self, key: tuple, loader: callable):
+        """Executa `loader` uma única vez por chave durante a execução.
+
+        Args:
+            key (tuple): Identificador da leitura. O segundo elemento deve ser
+                         o nome da coleção, usado na invalidação.
+            loader (callable): Função sem argumentos que realiza a leitura.
+
+        Returns:
+            O resultado de `loader`, compartilhado entre chamadores da mesma chave.
+        """
+        with self._lock:
+            future = self._requests.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._requests[key] = future
+
+        if is_owner:
+            try:
+                future.set_result(loader())
+            except BaseException as e:
+                # Não memoriza falhas: a próxima chamada tenta novamente.
+                with self._lock:
+                    if self._requests.get(key) is future:
+                        del self._requests[key]
+                future.set_exception(e)
+                raise
+
+        return future.result()
+
+    def invalidate(self, collection_name: str):
+        """Descarta as leituras memorizadas de uma coleção após uma escrita.
+
+        Args:
+            collection_name (str): O nome da coleção que foi modificada.
+        """
+        with self._lock:
+            stale_keys = [key for key in self._requests if key[1] == collection_name]
+            for key in stale_keys:
+                del self._requests[key]
+
+
+def current_context() -> RequestContext | None:
+    """Retorna o contexto da execução atual, ou None fora de uma execução."""
+    return _current_context.get()
+
+
+def activate_context(context: RequestContext):
+    """Ativa um contexto para a thread atual e retorna o token para restaurá-lo.
+
+    Args:
+        context (RequestContext): O contexto a ser ativado.
+    """
+    return _current_context.set(context)
+
+
+def deactivate_context(token):
+    """Restaura o contexto anterior a partir do token de `activate_context`."""
+    _current_context.reset(token)
+
+
+def submit_in_context(executor: Executor, fn: callable, *args, **kwargs) -> Future:
+    """Submete uma tarefa a um executor preservando o contexto da execução.
+
+    Threads de um pool não herdam as variáveis de contexto; sem isso, as
+    chamadas feitas pela tarefa não seriam deduplicadas nem contabilizadas
+    nas métricas da execução que as originou.
+
+    Args:
+        executor (Executor): O pool que executará a tarefa.
+        fn (callable): A função a ser executada.
+        *args: Argumentos posicionais de `fn`.
+        **kwargs: Argumentos nomeados de `fn`.
+
+    Returns:
+        Future: O futuro da tarefa submetida.
+    """
+    context = contextvars.copy_context()
+    return executor.submit(context.run, fn, *args, **kwargs)
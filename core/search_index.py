@@ -0,0 +1,794 @@
+"""
+Módulo de busca textual com índice invertido por usuário.
+
+Este módulo define a classe SearchIndex, que mantém no Firestore um índice
+invertido dos textos do usuário (termo → registros que o contêm) e responde
+consultas ordenadas por relevância (TF-IDF). O índice é atualizado de forma
+incremental: a cada criação, edição ou exclusão, apenas os termos que
+mudaram são regravados.
+
+Os textos são normalizados para o português: minúsculas, remoção de acentos,
+remoção de palavras muito comuns e redução simples de plurais, de modo que
+"Reunião", "reuniao" e "reuniões" encontram os mesmos registros.
+
+O vocabulário (termos e frequências) é dividido pelo prefixo dos termos e os
+rótulos (o título exibido de cada registro), pelo registro; as partes lidas
+ficam em memória enquanto a revisão do índice não muda. As consultas
+expandem cada palavra para os termos com o mesmo prefixo e, se não houver
+termo igual, para os termos a um erro de digitação de distância, e então
+leem apenas os documentos desses termos, em uma única requisição. Os
+resultados de cada consulta também são guardados, por revisão do índice.
+"""
+
+import math
+import re
+import threading
+import time
+import unicodedata
+import zlib
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from firebase_admin import firestore
+from .firebase_manager import FirebaseManager
+
+# Palavras muito comuns, já sem acentos, que não são indexadas.
+STOPWORDS = frozenset("""
+    a ao aos as ate com como da das de dela dele deles do dos e ela elas ele
+    eles em entre era essa esse esta este eu foi ha isso isto ja lhe mais mas
+    me meu minha muito na nao nas nem no nos num numa o os ou para pela pelas
+    pelo pelos por pra que se sem ser seu seus sim sobre sua suas tambem te
+    tem ter um uma umas uns
+    """.split())
+
+# Regras de redução de plurais, na ordem em que são testadas.
+_PLURAL_RULES = (
+    ("oes", "ao"),
+    ("aes", "ao"),
+    ("ais", "al"),
+    ("eis", "el"),
+    ("ois", "ol"),
+    ("uis", "ul"),
+    ("ns", "m"),
+    ("res", "r"),
+    ("zes", "z"),
+    ("ses", "s"),
+)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Cada termo é dividido em partes (documentos) para que termos muito
+# frequentes não ultrapassem o limite de 1 MB por documento do Firestore.
+INDEX_SHARDS = 4
+
+# Documento, em `users/{uid}/meta`, com as estatísticas do índice.
+INDEX_STATS_DOCUMENT = "search_index"
+
+# Coleções, em `users/{uid}/`, com a quantidade de registros de cada
+# documento de termo (o vocabulário, um documento por prefixo dos termos) e
+# o rótulo de cada registro indexado (em partes, pelo registro). Divididos,
+# nenhum documento se aproxima dos limites do Firestore (1 MiB e 20.000
+# campos), e gravações de termos diferentes não disputam o mesmo documento.
+VOCABULARY_COLLECTION = "search_vocabulary"
+LABELS_COLLECTION = "search_labels"
+
+# Quantidade de caracteres do prefixo que define o documento de vocabulário
+# de cada termo (os termos têm ao menos dois caracteres).
+VOCABULARY_PREFIX_LENGTH = 2
+
+# Quantidade de partes dos rótulos e tamanho máximo de cada rótulo gravado.
+LABEL_SHARDS = 32
+LABEL_MAX_LENGTH = 120
+
+# Documentos, em `users/{uid}/meta`, do vocabulário e dos rótulos das
+# versões anteriores do índice, excluídos na reconstrução.
+LEGACY_INDEX_DOCUMENTS = ("search_vocabulary", "search_labels")
+
+# Versão do formato do índice. Índices de outra versão são reconstruídos.
+INDEX_VERSION = 3
+
+# Por quanto tempo (em segundos) o índice em memória é usado sem conferir a
+# sua revisão no Firestore.
+INDEX_CACHE_TTL = 60
+
+# Quantidade máxima de usuários com o índice em memória neste processo e de
+# consultas com os resultados guardados para cada usuário.
+INDEX_CACHE_USERS = 64
+RESULT_CACHE_QUERIES = 32
+
+# Quantidade máxima de termos considerados para cada prefixo consultado.
+PREFIX_EXPANSIONS = 8
+
+# Peso dos termos encontrados por prefixo e por tolerância a erros, em
+# relação aos termos iguais aos da consulta.
+PREFIX_WEIGHT = 0.8
+FUZZY_WEIGHT = 0.6
+
+# Tamanho mínimo de uma palavra para a tolerância a erros de digitação.
+FUZZY_MIN_LENGTH = 4
+
+_caches: OrderedDict[str, "_IndexCache"] = OrderedDict()
+_caches_lock = threading.Lock()
+
+
+def forget_user_index(user_uid: str):
+    """Descarta o índice de um usuário guardado em memória (ex: após excluir a conta)."""
+    with _caches_lock:
+        _caches.pop(user_uid, None)
+
+
+def fold_accents(text: str) -> str:
+    """Converte o texto para minúsculas e remove acentos e cedilhas."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def stem(token: str) -> str:
+    """Reduz um termo, já sem acentos, à forma singular aproximada."""
+    if len(token) <= 3 or not token.endswith("s"):
+        return token
+    for suffix, replacement in _PLURAL_RULES:
+        if token.endswith(suffix) and len(token) > len(suffix):
+            return token[: -len(suffix)] + replacement
+    return token[:-1]
+
+
+def tokenize(text: str) -> list[str]:
+    """Divide um texto nos termos indexáveis, normalizados para o português.
+
+    Args:
+        text (str): O texto a ser dividido.
+
+    Returns:
+        list[str]: Os termos, na ordem em que aparecem (com repetições).
+    """
+    return [
+        stem(token)
+        for token in _TOKEN_PATTERN.findall(fold_accents(text or ""))
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+def term_prefix(term: str) -> str:
+    """Retorna o prefixo que define o documento de vocabulário de um termo."""
+    return term[:VOCABULARY_PREFIX_LENGTH]
+
+
+def within_one_edit(first: str, second: str) -> bool:
+    """Indica se dois termos diferem em no máximo uma edição.
+
+    Uma inserção, remoção, substituição ou troca de dois caracteres vizinhos
+    conta como uma edição (os erros de digitação mais comuns).
+    """
+    if len(first) > len(second):
+        first, second = second, first
+    if len(second) - len(first) > 1:
+        return False
+    index = 0
+    while index < len(first) and first[index] == second[index]:
+        index += 1
+    if len(first) != len(second):
+        return first[index:] == second[index + 1 :]
+    if first[index + 1 :] == second[index + 1 :]:
+        return True
+    return (
+        index + 1 < len(first)
+        and first[index] == second[index + 1]
+        and first[index + 1] == second[index]
+        and first[index + 2 :] == second[index + 2 :]
+    )
+
+
+class _Vocabulary:
+    """Cópia em memória dos termos do índice de um usuário com um prefixo.
+
+    Attributes:
+        counts (dict[str, dict]): Quantos registros cada parte de cada termo
+                                  contém, por termo.
+        frequencies (dict[str, int]): Quantos registros contêm cada termo.
+        terms (list[str]): Os termos, em ordem alfabética (para os prefixos).
+    """
+
+    def __init__(self, counts: dict[str, dict]):
+        self.counts = counts
+        self.frequencies = {
+            term: frequency
+            for term, shards in counts.items()
+            if (frequency := sum(shards.values())) > 0
+        }
+        self.terms = sorted(self.frequencies)
+        self._by_length: dict[int, list[str]] | None = None
+
+    def term_documents(self, term: str) -> list[str]:
+        """Retorna os IDs dos documentos (partes) que guardam um termo."""
+        return [
+            f"{term}~{shard}"
+            for shard, count in self.counts.get(term, {}).items()
+            if count > 0
+        ]
+
+    def with_prefix(self, prefix: str) -> list[str]:
+        """Retorna os termos mais frequentes que começam com `prefix`."""
+        matches = []
+        position = bisect_left(self.terms, prefix)
+        while position < len(self.terms) and self.terms[position].startswith(prefix):
+            matches.append(self.terms[position])
+            position += 1
+        matches.sort(key=lambda term: -self.frequencies[term])
+        return matches[:PREFIX_EXPANSIONS]
+
+    def similar(self, term: str) -> list[str]:
+        """Retorna os termos a um erro de digitação de distância de `term`.
+
+        Apenas os termos com o mesmo prefixo e com um caractere a mais ou a
+        menos (ou do mesmo tamanho) são comparados: erros nos primeiros
+        caracteres não são corrigidos.
+        """
+        if self._by_length is None:
+            self._by_length = {}
+            for known in self.terms:
+                self._by_length.setdefault(len(known), []).append(known)
+        return [
+            known
+            for length in (len(term) - 1, len(term), len(term) + 1)
+            for known in self._by_length.get(length, ())
+            if known != term and within_one_edit(term, known)
+        ]
+
+
+class _IndexCache:
+    """Partes do índice de um usuário lidas em uma mesma revisão.
+
+    Attributes:
+        checked_at (float): Quando a revisão foi conferida (`time.monotonic`).
+        revision (int): A revisão do índice, incrementada a cada gravação.
+        doc_count (int): A quantidade de registros indexados.
+        kinds (frozenset[str]): Os tipos já indexados na versão atual.
+        vocabularies (dict[str, _Vocabulary]): Os termos lidos, por prefixo.
+        labels (dict[str, dict]): Os rótulos lidos, por parte.
+        missing (set[str]): Prefixos e partes de rótulos sem documento,
+                            conferidos de novo a cada `INDEX_CACHE_TTL`.
+        results (OrderedDict): Os resultados das consultas recentes.
+    """
+
+    def __init__(self, revision: int, doc_count: int, kinds: frozenset[str]):
+        self.checked_at = time.monotonic()
+        self.revision = revision
+        self.doc_count = doc_count
+        self.kinds = kinds
+        self.vocabularies: dict[str, _Vocabulary] = {}
+        self.labels: dict[str, dict] = {}
+        self.missing: set[str] = set()
+        self.results: OrderedDict[tuple, list] = OrderedDict()
+
+
+class SearchIndex:
+    """Índice invertido dos registros de um usuário, armazenado no Firestore.
+
+    Cada termo é guardado em `users/{uid}/search_index/{termo}~{parte}`, com
+    o mapa `postings` de `"{tipo}:{id}"` para a frequência do termo no
+    registro. O tipo é o nome da coleção do registro (ex: 'anotacoes').
+
+    O vocabulário (`search_vocabulary/{prefixo}`) guarda quantos registros
+    cada documento de termo contém, e os rótulos (`search_labels/{parte}`), o
+    texto exibido de cada registro nos resultados. Ambos são atualizados na
+    mesma gravação em lote que os termos, assim como a revisão do índice
+    (`meta/search_index`), que invalida as cópias em memória.
+
+    Attributes:
+        fb_manager (FirebaseManager): O gerenciador do Firebase.
+        user_uid (str): O UID do usuário dono do índice.
+    """
+
+    def __init__(self, firebase_manager: FirebaseManager, user_uid: str):
+        """Inicializa o índice de um usuário.
+
+        Args:
+            firebase_manager (FirebaseManager): Instância do gerenciador
+                do Firebase para interagir com o Firestore.
+            user_uid (str): O UID do usuário dono do índice.
+        """
+        self.fb_manager = firebase_manager
+        self.user_uid = user_uid
+
+    @property
+    def index_path(self) -> str:
+        """O caminho da coleção de termos do usuário."""
+        return f"users/{self.user_uid}/search_index"
+
+    @property
+    def vocabulary_path(self) -> str:
+        """O caminho da coleção do vocabulário do usuário."""
+        return f"users/{self.user_uid}/{VOCABULARY_COLLECTION}"
+
+    @property
+    def labels_path(self) -> str:
+        """O caminho da coleção dos rótulos do usuário."""
+        return f"users/{self.user_uid}/{LABELS_COLLECTION}"
+
+    @property
+    def meta_path(self) -> str:
+        """O caminho da coleção de dados agregados do usuário."""
+        return f"users/{self.user_uid}/meta"
+
+    @staticmethod
+    def _shard(key: str) -> str:
+        """Retorna a parte do termo que guarda as entradas de um registro."""
+        return str(zlib.crc32(key.encode()) % INDEX_SHARDS)
+
+    @staticmethod
+    def _label_shard(key: str) -> str:
+        """Retorna a parte dos rótulos que guarda o rótulo de um registro."""
+        return str(zlib.crc32(key.encode()) % LABEL_SHARDS)
+
+    def _cache(self) -> _IndexCache:
+        """Retorna as partes do índice em memória, na revisão atual.
+
+        A revisão é conferida no Firestore (uma leitura) no máximo uma vez a
+        cada `INDEX_CACHE_TTL` segundos; enquanto ela não muda, as partes já
+        lidas e os resultados guardados continuam válidos.
+        """
+        with _caches_lock:
+            cache = _caches.get(self.user_uid)
+            if cache is not None:
+                _caches.move_to_end(self.user_uid)
+        if cache is not None and time.monotonic() - cache.checked_at < INDEX_CACHE_TTL:
+            return cache
+
+        stats = self.fb_manager.get_document(self.meta_path, INDEX_STATS_DOCUMENT)
+        stats = stats or {}
+        revision = stats.get("revision", 0)
+        if cache is not None and cache.revision == revision:
+            cache.checked_at = time.monotonic()
+            cache.missing.clear()
+            return cache
+
+        kinds = (
+            frozenset(stats.get("kinds", []))
+            if stats.get("version") == INDEX_VERSION
+            else frozenset()
+        )
+        cache = _IndexCache(revision, stats.get("doc_count", 0), kinds)
+        with _caches_lock:
+            _caches[self.user_uid] = cache
+            _caches.move_to_end(self.user_uid)
+            while len(_caches) > INDEX_CACHE_USERS:
+                _caches.popitem(last=False)
+        return cache
+
+    def _forget_cache(self):
+        """Descarta o índice em memória após uma gravação no índice."""
+        forget_user_index(self.user_uid)
+
+    def _vocabularies(
+        self, cache: _IndexCache, prefixes: set[str]
+    ) -> dict[str, _Vocabulary]:
+        """Retorna os termos dos prefixos, lendo os que não estão em memória.
+
+        Args:
+            cache (_IndexCache): O índice em memória.
+            prefixes (set[str]): Os prefixos necessários.
+
+        Returns:
+            dict[str, _Vocabulary]: Os termos de cada prefixo (vazios para os
+                                    prefixos sem nenhum termo).
+        """
+        pending = [
+            prefix
+            for prefix in prefixes
+            if prefix not in cache.vocabularies and prefix not in cache.missing
+        ]
+        if pending:
+            documents = self.fb_manager.get_documents(self.vocabulary_path, pending)
+            for prefix in pending:
+                if prefix in documents:
+                    cache.vocabularies[prefix] = _Vocabulary(
+                        documents[prefix].get("terms", {})
+                    )
+                else:
+                    cache.missing.add(prefix)
+        empty = _Vocabulary({})
+        return {prefix: cache.vocabularies.get(prefix, empty) for prefix in prefixes}
+
+    def _labels(self, cache: _IndexCache, shards: set[str]) -> dict[str, str]:
+        """Retorna os rótulos das partes, lendo as que não estão em memória.
+
+        Args:
+            cache (_IndexCache): O índice em memória.
+            shards (set[str]): As partes necessárias.
+
+        Returns:
+            dict[str, str]: Os rótulos das partes, por `tipo:id`.
+        """
+        pending = [
+            shard
+            for shard in shards
+            if shard not in cache.labels and f"labels~{shard}" not in cache.missing
+        ]
+        if pending:
+            documents = self.fb_manager.get_documents(self.labels_path, pending)
+            for shard in pending:
+                if shard in documents:
+                    cache.labels[shard] = documents[shard].get("labels", {})
+                else:
+                    cache.missing.add(f"labels~{shard}")
+        return {
+            key: label
+            for shard in shards
+            for key, label in cache.labels.get(shard, {}).items()
+        }
+
+    def update(
+        self,
+        kind: str,
+        doc_id: str,
+        old_text: str,
+        new_text: str,
+        label: str | None = None,
+    ) -> bool:
+        """Atualiza o índice após a criação, edição ou exclusão de um registro.
+
+        Apenas os termos cuja frequência mudou são regravados. Use um texto
+        antigo vazio para registros novos e um texto novo vazio para
+        registros excluídos.
+
+        Args:
+            kind (str): O tipo do registro (ex: 'anotacoes').
+            doc_id (str): O ID do registro.
+            old_text (str): O texto indexado anteriormente.
+            new_text (str): O texto atual.
+            label (str | None): O rótulo exibido nos resultados. Se None, o
+                rótulo atual é mantido (e removido na exclusão).
+
+        Returns:
+            bool: True se o índice foi atualizado, False caso contrário.
+        """
+        return self.update_many(kind, [(doc_id, old_text, new_text, label)])
+
+    def update_many(self, kind: str, changes: list[tuple]) -> bool:
+        """Atualiza o índice para vários registros de um tipo, em lote.
+
+        Args:
+            kind (str): O tipo dos registros (ex: 'documents').
+            changes (list[tuple]): Tuplas `(id, texto_antigo, texto_novo,
+                rótulo)`, com o mesmo significado dos argumentos de `update`.
+
+        Returns:
+            bool: True se o índice foi atualizado, False caso contrário.
+        """
+        operations = []
+        counts: dict[str, Counter] = {}
+        labels = {}
+        indexed = 0
+        for doc_id, old_text, new_text, label in changes:
+            key = f"{kind}:{doc_id}"
+            old_terms = Counter(tokenize(old_text))
+            new_terms = Counter(tokenize(new_text))
+
+            for term in old_terms.keys() | new_terms.keys():
+                frequency = new_terms.get(term)
+                if frequency == old_terms.get(term):
+                    continue
+                shard = self._shard(key)
+                operations.append(
+                    (
+                        self.index_path,
+                        f"{term}~{shard}",
+                        {
+                            "postings": {
+                                key: frequency if frequency else firestore.DELETE_FIELD
+                            }
+                        },
+                    )
+                )
+                if not frequency:
+                    counts.setdefault(term, Counter())[shard] -= 1
+                elif term not in old_terms:
+                    counts.setdefault(term, Counter())[shard] += 1
+
+            # A quantidade de registros indexados alimenta o cálculo do IDF.
+            was_indexed, is_indexed = bool(old_terms), bool(new_terms)
+            if was_indexed != is_indexed:
+                indexed += 1 if is_indexed else -1
+            if not new_text:
+                labels[key] = firestore.DELETE_FIELD
+            elif label is not None:
+                labels[key] = label
+
+        if not operations and not labels:
+            return True
+        operations.extend(self._vocabulary_operations(counts))
+        operations.extend(self._label_operations(labels))
+        # As estatísticas vão por último: a nova revisão só é vista depois
+        # que os termos foram gravados.
+        stats = {"revision": firestore.Increment(1)}
+        if indexed:
+            stats["doc_count"] = firestore.Increment(indexed)
+        operations.append((self.meta_path, INDEX_STATS_DOCUMENT, stats))
+        self._forget_cache()
+        written = self.fb_manager.batch_write(operations)
+        # Descartada de novo: uma leitura feita durante a gravação guardaria
+        # os tipos de antes dela.
+        self._forget_cache()
+        return written
+
+    def _vocabulary_operations(self, counts: dict[str, Counter]) -> list[tuple]:
+        """Retorna as gravações do vocabulário, uma por prefixo alterado.
+
+        Args:
+            counts (dict[str, Counter]): A variação da quantidade de registros
+                de cada parte, por termo.
+        """
+        by_prefix: dict[str, dict] = {}
+        for term, shards in counts.items():
+            by_prefix.setdefault(term_prefix(term), {})[term] = {
+                shard: firestore.Increment(amount) for shard, amount in shards.items()
+            }
+        return [
+            (self.vocabulary_path, prefix, {"terms": terms})
+            for prefix, terms in by_prefix.items()
+        ]
+
+    def _label_operations(self, labels: dict) -> list[tuple]:
+        """Retorna as gravações dos rótulos, uma por parte alterada.
+
+        Rótulos maiores que `LABEL_MAX_LENGTH` são truncados.
+
+        Args:
+            labels (dict): O novo rótulo (ou `DELETE_FIELD`) de cada registro,
+                           por `tipo:id`.
+        """
+        by_shard: dict[str, dict] = {}
+        for key, label in labels.items():
+            if isinstance(label, str):
+                label = label[:LABEL_MAX_LENGTH]
+            by_shard.setdefault(self._label_shard(key), {})[key] = label
+        return [
+            (self.labels_path, shard, {"labels": shard_labels})
+            for shard, shard_labels in by_shard.items()
+        ]
+
+    def is_built(self, kind: str) -> bool:
+        """Indica se os registros de um tipo já foram indexados na versão atual.
+
+        Os tipos indexados vêm das estatísticas guardadas em memória com o
+        índice, conferidas no máximo uma vez a cada `INDEX_CACHE_TTL`
+        segundos, e não de uma leitura a cada renderização das páginas.
+        `build` e `ensure_version` descartam a cópia em memória.
+
+        Args:
+            kind (str): O tipo dos registros (ex: 'anotacoes').
+        """
+        return kind in self._cache().kinds
+
+    def ensure_version(self) -> bool:
+        """Descarta um índice gravado em outra versão do formato.
+
+        Os termos são excluídos e as estatísticas, o vocabulário e os rótulos
+        recomeçam vazios, para que cada tipo seja indexado novamente.
+
+        Returns:
+            bool: True se o índice já estava ou foi colocado na versão atual.
+        """
+        stats = self.fb_manager.get_document(self.meta_path, INDEX_STATS_DOCUMENT)
+        if stats and stats.get("version") == INDEX_VERSION:
+            return True
+        for collection in (self.index_path, self.vocabulary_path, self.labels_path):
+            if self.fb_manager.delete_collection(collection) is None:
+                return False
+        for document_id in LEGACY_INDEX_DOCUMENTS:
+            self.fb_manager.delete_document(self.meta_path, document_id)
+        self.fb_manager.set_document(
+            self.meta_path,
+            INDEX_STATS_DOCUMENT,
+            {
+                "version": INDEX_VERSION,
+                "doc_count": 0,
+                "kinds": [],
+                "revision": (stats or {}).get("revision", 0) + 1,
+            },
+        )
+        self._forget_cache()
+        return True
+
+    def build(
+        self, kind: str, texts: dict[str, str], labels: dict[str, str] | None = None
+    ) -> bool:
+        """Indexa de uma só vez os registros existentes de um tipo.
+
+        Usado uma única vez por tipo, para registros criados antes do índice.
+        As entradas de cada termo são agrupadas, gerando uma gravação por
+        documento de termo em vez de uma por registro. Registros que já têm
+        rótulo foram indexados por `update` e não são contados de novo.
+
+        Args:
+            kind (str): O tipo dos registros (ex: 'anotacoes').
+            texts (dict[str, str]): O texto de cada registro, por ID.
+            labels (dict[str, str] | None): O rótulo de cada registro, por ID.
+
+        Returns:
+            bool: True se o índice foi construído, False caso contrário.
+        """
+        if not self.ensure_version():
+            return False
+        labels = labels or {}
+        # Todas as partes dos rótulos, em uma única requisição.
+        known = self._labels(self._cache(), {str(n) for n in range(LABEL_SHARDS)})
+
+        term_documents: dict[str, dict] = {}
+        counts: dict[str, Counter] = {}
+        new_labels = {}
+        indexed = 0
+        for doc_id, text in texts.items():
+            key = f"{kind}:{doc_id}"
+            terms = Counter(tokenize(text))
+            is_new = key not in known
+            if terms and is_new:
+                indexed += 1
+            shard = self._shard(key)
+            for term, frequency in terms.items():
+                term_documents.setdefault(f"{term}~{shard}", {})[key] = frequency
+                if is_new:
+                    counts.setdefault(term, Counter())[shard] += 1
+            new_labels[key] = labels.get(doc_id) or doc_id
+
+        operations = [
+            (self.index_path, term_document, {"postings": postings})
+            for term_document, postings in term_documents.items()
+        ]
+        operations.extend(self._vocabulary_operations(counts))
+        operations.extend(self._label_operations(new_labels))
+        # As estatísticas vão no último lote: o tipo só conta como indexado
+        # depois que todos os termos foram gravados.
+        operations.append(
+            (
+                self.meta_path,
+                INDEX_STATS_DOCUMENT,
+                {
+                    "doc_count": firestore.Increment(indexed),
+                    "kinds": firestore.ArrayUnion([kind]),
+                    "revision": firestore.Increment(1),
+                },
+            )
+        )
+        self._forget_cache()
+        return self.fb_manager.batch_write(operations)
+
+    def labels_of(self, records: list[tuple[str, str]]) -> list[str]:
+        """Retorna os rótulos de registros indexados, lendo só as partes necessárias.
+
+        Args:
+            records (list[tuple[str, str]]): Tuplas `(tipo, id)`.
+
+        Returns:
+            list[str]: O rótulo de cada registro (ou o seu ID, se não houver),
+                       na mesma ordem.
+        """
+        keys = [f"{kind}:{doc_id}" for kind, doc_id in records]
+        labels = self._labels(self._cache(), {self._label_shard(key) for key in keys})
+        return [labels.get(key) or doc_id for key, (_, doc_id) in zip(keys, records)]
+
+    def label_of(self, kind: str, doc_id: str) -> str:
+        """Retorna o rótulo de um registro indexado (ou o seu ID, se não houver)."""
+        return self.labels_of([(kind, doc_id)])[0]
+
+    @staticmethod
+    def _expand(vocabularies: dict[str, _Vocabulary], token: str) -> dict[str, float]:
+        """Retorna os termos do índice que respondem a uma palavra da consulta.
+
+        Args:
+            vocabularies (dict[str, _Vocabulary]): Os termos em memória, por
+                prefixo (ao menos os prefixos da palavra e do seu singular).
+            token (str): A palavra, já sem acentos e em minúsculas.
+
+        Returns:
+            dict[str, float]: O peso de cada termo encontrado.
+        """
+        stemmed = stem(token)
+        candidates = {}
+        for term in vocabularies[term_prefix(token)].with_prefix(token):
+            candidates[term] = PREFIX_WEIGHT
+        exact = [
+            term
+            for term in (stemmed, token)
+            if term in vocabularies[term_prefix(term)].frequencies
+        ]
+        for term in exact:
+            candidates[term] = 1.0
+        if not exact and len(token) >= FUZZY_MIN_LENGTH:
+            for term in vocabularies[term_prefix(stemmed)].similar(stemmed):
+                candidates.setdefault(term, FUZZY_WEIGHT)
+        return candidates
+
+    def search(
+        self, query: str, kinds: list[str] | None = None, limit: int = 50
+    ) -> list[tuple[str, str, float]]:
+        """Busca registros que contenham os termos da consulta.
+
+        Os resultados são ordenados por TF-IDF: termos raros na coleção do
+        usuário pesam mais que termos frequentes. Cada palavra também
+        encontra os termos que começam com ela (para a busca enquanto se
+        digita) e, se não houver termo igual, os termos a um erro de
+        digitação de distância, com peso menor. Apenas os documentos dos
+        termos encontrados são lidos, em uma única requisição, e os
+        resultados ficam em memória até a próxima gravação no índice.
+
+        Args:
+            query (str): O texto da consulta.
+            kinds (list[str] | None): Restringe a busca a estes tipos.
+            limit (int): A quantidade máxima de resultados.
+
+        Returns:
+            list[tuple[str, str, float]]: Tuplas `(tipo, id, pontuação)`, da
+                                          mais para a menos relevante.
+        """
+        tokens = Counter(
+            token
+            for token in _TOKEN_PATTERN.findall(fold_accents(query or ""))
+            if len(token) > 1 and token not in STOPWORDS
+        )
+        if not tokens:
+            return []
+
+        cache = self._cache()
+        query_key = (
+            frozenset(tokens.items()),
+            tuple(sorted(kinds)) if kinds is not None else None,
+            limit,
+        )
+        with _caches_lock:
+            cached = cache.results.get(query_key)
+            if cached is not None:
+                cache.results.move_to_end(query_key)
+        if cached is not None:
+            return list(cached)
+
+        prefixes = {term_prefix(token) for token in tokens}
+        prefixes |= {term_prefix(stem(token)) for token in tokens}
+        vocabularies = self._vocabularies(cache, prefixes)
+        expansions = {token: self._expand(vocabularies, token) for token in tokens}
+        term_documents = {
+            term_document: term
+            for candidates in expansions.values()
+            for term in candidates
+            for term_document in vocabularies[term_prefix(term)].term_documents(term)
+        }
+        documents = self.fb_manager.get_documents(self.index_path, list(term_documents))
+
+        postings_by_term: dict[str, dict] = {}
+        for document_id, data in documents.items():
+            postings_by_term.setdefault(term_documents[document_id], {}).update(
+                data.get("postings", {})
+            )
+        total_documents = max(cache.doc_count, 1)
+
+        scores: Counter = Counter()
+        for token, candidates in expansions.items():
+            # Cada palavra conta uma vez, pelo melhor termo de cada registro.
+            best: dict[str, float] = {}
+            for term, weight in candidates.items():
+                postings = postings_by_term.get(term, {})
+                idf = math.log((total_documents + 1) / (len(postings) + 1)) + 1
+                for key, frequency in postings.items():
+                    score = (1 + math.log(frequency)) * idf * weight
+                    if score > best.get(key, 0):
+                        best[key] = score
+            for key, score in best.items():
+                scores[key] += score * tokens[token]
+
+        results = []
+        for key, score in scores.most_common():
+            kind, _, doc_id = key.partition(":")
+            if kinds is None or kind in kinds:
+                results.append((kind, doc_id, score))
+                if len(results) >= limit:
+                    break
+
+        # Resultados de leituras incompletas (ex: um erro de rede) ou de
+        # prefixos sem termos não são guardados, para que a próxima consulta
+        # os confira de novo.
+        if len(documents) == len(term_documents) and not prefixes & cache.missing:
+            with _caches_lock:
+                cache.results[query_key] = results
+                while len(cache.results) > RESULT_CACHE_QUERIES:
+                    cache.results.popitem(last=False)
+        return list(results)
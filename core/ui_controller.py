@@ -8,6 +8,13 @@ e delegando a renderização das telas para os módulos de UI apropriados.
 import streamlit as st
 from time import sleep
 from .auth_service import AuthService
+from .profiler import RerunProfiler
+from config.settings import (
+    PROFILER_ADMIN_UIDS,
+    PROFILER_ENABLED,
+    PROFILE_MAX_RUNS,
+    PROFILE_OUTPUT_DIR,
+)
 from ui_pages.login_page import show_login_form
 from ui_pages.register_page import show_register_form
 from ui_pages.dashboard_page import show_dashboard
@@ -69,6 +76,35 @@ class UIController:
 
     def run_app(self):
         """Executa a lógica principal de roteamento e renderiza a página apropriada."""
+        # Cada execução do script abre seu próprio contexto de requisições,
+        # deduplicando leituras repetidas ao Firestore durante o rerun.
+        with self.auth_service.fb_manager.request_scope():
+            if self._profiling_requested():
+                with RerunProfiler(PROFILE_OUTPUT_DIR, max_runs=PROFILE_MAX_RUNS):
+                    self._route()
+            else:
+                self._route()
+
+    def _profiling_requested(self) -> bool:
+        """Indica se esta execução deve ser perfilada.
+
+        O parâmetro `?profile=1` da URL só é atendido para os usuários
+        autenticados listados em `PROFILER_ADMIN_UIDS`: cada execução perfilada
+        grava arquivos em disco, e visitantes não podem acioná-la.
+
+        Returns:
+            bool: True se o perfilamento estiver habilitado nas configurações
+            ou se um administrador o solicitou pela URL.
+        """
+        if PROFILER_ENABLED:
+            return True
+        if st.query_params.get("profile") != "1":
+            return False
+        user_info = st.session_state.user_info or {}
+        return user_info.get("localId") in PROFILER_ADMIN_UIDS
+
+    def _route(self):
+        """Renderiza a página correspondente ao estado atual da sessão."""
         # Lógica de roteamento principal
         if st.session_state.user_info:
             # Passa a responsabilidade de renderização para a página do dashboard
@@ -0,0 +1,514 @@
+"""
+Módulo da fila de uploads em segundo plano.
+
+Este módulo define a classe UploadQueue, que desacopla o envio de documentos
+da execução do script Streamlit. Ao ser aceito, o arquivo é copiado para um
+diretório local e registrado em uma tabela de tarefas SQLite; um pool de
+threads faz então o upload ao Storage, a miniatura e a gravação dos
+metadados. Falhas são repetidas automaticamente, e tarefas interrompidas
+(por exemplo, por um reinício do servidor) são retomadas na inicialização.
+
+Cada tarefa é executada com o gerenciador do Firebase da sessão que a
+enviou, de modo que as leituras e escritas são contabilizadas para essa
+sessão e as leituras em cache dela são descartadas quando o documento é
+gravado. Os arquivos enviados juntos formam um lote, gravado com
+`DocumentService.store_documents` (uploads em paralelo e metadados em lote).
+"""
+
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from .document_service import DEFAULT_UPLOAD_WORKERS, DocumentService
+from .firebase_manager import DEFAULT_UPLOAD_CHUNK_SIZE, FirebaseManager
+
+# Situações possíveis de uma tarefa de upload.
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+# Rótulo de página usado nas métricas e na contabilização dos uploads.
+QUEUE_PAGE_LABEL = "Fila de uploads"
+
+_queues: dict[str, "UploadQueue"] = {}
+_queues_lock = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS upload_jobs (
+    id TEXT PRIMARY KEY,
+    batch_id TEXT,
+    user_uid TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    content_type TEXT,
+    size INTEGER,
+    description TEXT NOT NULL DEFAULT '',
+    spool_path TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    doc_id TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS upload_jobs_user ON upload_jobs (user_uid, created_at);
+"""
+
+
+class _SpooledUpload:
+    """Um arquivo em espera na fila, com os atributos de um `UploadedFile`.
+
+    Repassa as operações de leitura ao arquivo aberto e expõe `name`, `type`
+    e `size`, como esperado por `DocumentService.store_documents`.
+    """
+
+    def __init__(self, file, name: str, content_type: str | None, size: int | None):
+        self._file = file
+        self.name = name
+        self.type = content_type
+        self.size = size
+
+    def __getattr__(self, attribute: str):
+        return getattr(self._file, attribute)
+
+
+class UploadQueue:
+    """Executa uploads de documentos em segundo plano, com tarefas persistidas.
+
+    Cada tarefa passa por `pending` → `running` → `done`. Em caso de erro,
+    ela volta a `pending` e é repetida após um intervalo crescente, até
+    `max_attempts` tentativas; depois disso, fica como `failed` e pode ser
+    repetida manualmente. O arquivo copiado só é removido quando a tarefa
+    é concluída ou descartada.
+
+    As tarefas guardam, em memória, o gerenciador do Firebase da sessão que
+    as enviou. Tarefas retomadas na inicialização, sem uma sessão associada,
+    usam um gerenciador criado por `manager_factory`.
+
+    Attributes:
+        db_path (str): O caminho do banco SQLite com a tabela de tarefas.
+        spool_dir (str): O diretório onde os arquivos aguardam o envio.
+        max_attempts (int): A quantidade máxima de tentativas automáticas.
+        retry_delay (float): O intervalo, em segundos, antes da primeira
+                             repetição; dobra a cada nova tentativa.
+        upload_workers (int): A quantidade máxima de arquivos de um lote
+                              enviados ao mesmo tempo.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        manager_factory: callable,
+        max_workers: int = 4,
+        max_attempts: int = 3,
+        retry_delay: float = 5.0,
+        upload_workers: int = DEFAULT_UPLOAD_WORKERS,
+    ):
+        """Inicializa a fila e retoma as tarefas não concluídas.
+
+        Args:
+            directory (str): O diretório local da tabela de tarefas e dos
+                             arquivos em espera.
+            manager_factory (callable): Função sem argumentos que cria o
+                gerenciador do Firebase das tarefas retomadas sem sessão.
+            max_workers (int): A quantidade máxima de lotes enviados ao mesmo tempo.
+            max_attempts (int): A quantidade máxima de tentativas automáticas.
+            retry_delay (float): O intervalo inicial entre tentativas, em segundos.
+            upload_workers (int): Os arquivos de um lote enviados ao mesmo tempo.
+        """
+        self.db_path = os.path.join(directory, "upload_jobs.sqlite3")
+        self.spool_dir = os.path.join(directory, "spool")
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.upload_workers = upload_workers
+        self._managers: dict[str, FirebaseManager] = {}
+        self._fallback_manager = None
+        self._db_lock = threading.Lock()
+        self._reservation_locks: dict[str, threading.Lock] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="sigp-upload-queue"
+        )
+
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self._connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._db_lock, self._connection:
+            self._connection.executescript(_SCHEMA)
+            columns = {
+                row["name"]
+                for row in self._connection.execute("PRAGMA table_info(upload_jobs)")
+            }
+            if "batch_id" not in columns:
+                # Tabelas criadas antes dos lotes: cada tarefa é o próprio lote.
+                self._connection.execute(
+                    "ALTER TABLE upload_jobs ADD COLUMN batch_id TEXT"
+                )
+            # Tarefas em andamento quando o processo terminou são retomadas.
+            self._connection.execute(
+                "UPDATE upload_jobs SET status = ? WHERE status = ?",
+                (STATUS_PENDING, STATUS_RUNNING),
+            )
+            batches = {}
+            for row in self._connection.execute(
+                "SELECT id, batch_id FROM upload_jobs WHERE status = ?"
+                " ORDER BY created_at",
+                (STATUS_PENDING,),
+            ):
+                batches.setdefault(row["batch_id"] or row["id"], []).append(row["id"])
+        if batches:
+            # Criado aqui, na thread de quem abriu a fila, e não nas do pool.
+            self._fallback_manager = manager_factory()
+        for job_ids in batches.values():
+            self._executor.submit(self._run, job_ids)
+
+    def submit(
+        self,
+        firebase_manager: FirebaseManager,
+        user_uid: str,
+        uploads: list,
+        description: str = "",
+    ) -> list[str | None]:
+        """Aceita arquivos para envio em segundo plano, como um único lote.
+
+        Os arquivos são copiados em blocos para o diretório local da fila, de
+        modo que a execução do script pode terminar logo em seguida.
+
+        Args:
+            firebase_manager (FirebaseManager): O gerenciador do Firebase da
+                sessão que envia os arquivos, usado pelos uploads.
+            user_uid (str): O UID do usuário dono dos documentos.
+            uploads (list): Arquivos com os atributos `name`, `type` e `size`
+                            (ex: a lista de `UploadedFile` do Streamlit).
+            description (str): A descrição aplicada a todos os documentos.
+
+        Returns:
+            list[str | None]: O ID da tarefa criada para cada arquivo, na
+                              mesma ordem de `uploads`, ou None nos que falharam.
+        """
+        batch_id = uuid.uuid4().hex
+        job_ids = [
+            self._spool(batch_id, user_uid, upload, description) for upload in uploads
+        ]
+        accepted = [job_id for job_id in job_ids if job_id]
+        for job_id in accepted:
+            self._managers[job_id] = firebase_manager
+        if accepted:
+            self._executor.submit(self._run, accepted)
+        return job_ids
+
+    def _spool(
+        self, batch_id: str, user_uid: str, upload, description: str
+    ) -> str | None:
+        """Copia um arquivo para o diretório da fila e registra a sua tarefa."""
+        job_id = uuid.uuid4().hex
+        spool_path = os.path.join(self.spool_dir, job_id)
+        try:
+            upload.seek(0)
+            with open(spool_path, "wb") as spool_file:
+                shutil.copyfileobj(upload, spool_file, DEFAULT_UPLOAD_CHUNK_SIZE)
+            now = time.time()
+            with self._db_lock, self._connection:
+                self._connection.execute(
+                    "INSERT INTO upload_jobs (id, batch_id, user_uid, file_name,"
+                    " content_type, size, description, spool_path, status,"
+                    " created_at, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        job_id,
+                        batch_id,
+                        user_uid,
+                        upload.name,
+                        upload.type,
+                        upload.size,
+                        description,
+                        spool_path,
+                        STATUS_PENDING,
+                        now,
+                        now,
+                    ),
+                )
+        except Exception as e:
+            print(f"Erro ao enfileirar upload: {e}")
+            if os.path.exists(spool_path):
+                os.remove(spool_path)
+            return None
+        return job_id
+
+    def queued_usage(self, user_uid: str) -> dict:
+        """Retorna o espaço reservado pelas tarefas ainda não concluídas.
+
+        Os arquivos na fila ainda não constam do uso de armazenamento do
+        usuário, mas devem contar na cota. Tarefas que falharam liberam a
+        reserva até serem repetidas.
+
+        Args:
+            user_uid (str): O UID do usuário.
+
+        Returns:
+            dict: Os bytes (`bytes`) e a quantidade de arquivos (`file_count`)
+                  das tarefas pendentes ou em andamento.
+        """
+        with self._db_lock:
+            row = self._connection.execute(
+                "SELECT COUNT(*) AS file_count, COALESCE(SUM(size), 0) AS bytes"
+                " FROM upload_jobs WHERE user_uid = ? AND status IN (?, ?)",
+                (user_uid, STATUS_PENDING, STATUS_RUNNING),
+            ).fetchone()
+        return {"bytes": row["bytes"], "file_count": row["file_count"]}
+
+    @contextmanager
+    def reservation(self, user_uid: str):
+        """Reserva a cota do usuário enquanto novos arquivos são verificados e enfileirados.
+
+        Envios simultâneos do mesmo usuário (ex: em duas abas) esperam um ao
+        outro, de modo que cada verificação de cota já considera os arquivos
+        enfileirados pelo anterior.
+
+        Args:
+            user_uid (str): O UID do usuário.
+
+        Yields:
+            dict: O espaço reservado pela fila, como em `queued_usage`.
+        """
+        with self._db_lock:
+            lock = self._reservation_locks.setdefault(user_uid, threading.Lock())
+        with lock:
+            yield self.queued_usage(user_uid)
+
+    def list_jobs(self, user_uid: str) -> list[dict]:
+        """Lista as tarefas de upload de um usuário, das mais recentes às antigas.
+
+        Args:
+            user_uid (str): O UID do usuário.
+
+        Returns:
+            list[dict]: As tarefas, com `id`, `file_name`, `size`, `status`,
+                        `attempts`, `error` e `doc_id`.
+        """
+        with self._db_lock:
+            rows = self._connection.execute(
+                "SELECT id, file_name, size, status, attempts, error, doc_id"
+                " FROM upload_jobs WHERE user_uid = ? ORDER BY created_at DESC",
+                (user_uid,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def retry(self, job_id: str, firebase_manager: FirebaseManager) -> bool:
+        """Recoloca na fila uma tarefa que falhou.
+
+        Args:
+            job_id (str): O ID da tarefa.
+            firebase_manager (FirebaseManager): O gerenciador do Firebase da
+                sessão que pediu a repetição.
+
+        Returns:
+            bool: True se a tarefa foi recolocada na fila.
+        """
+        with self._db_lock, self._connection:
+            updated = self._connection.execute(
+                "UPDATE upload_jobs SET status = ?, attempts = 0, error = NULL,"
+                " updated_at = ? WHERE id = ? AND status = ?",
+                (STATUS_PENDING, time.time(), job_id, STATUS_FAILED),
+            ).rowcount
+        if updated:
+            self._managers[job_id] = firebase_manager
+            self._executor.submit(self._run, [job_id])
+        return bool(updated)
+
+    def dismiss(self, job_id: str):
+        """Remove uma tarefa concluída ou que falhou, e o seu arquivo local.
+
+        Args:
+            job_id (str): O ID da tarefa.
+        """
+        with self._db_lock, self._connection:
+            row = self._connection.execute(
+                "SELECT spool_path FROM upload_jobs WHERE id = ? AND status IN (?, ?)",
+                (job_id, STATUS_DONE, STATUS_FAILED),
+            ).fetchone()
+            if row is None:
+                return
+            self._connection.execute("DELETE FROM upload_jobs WHERE id = ?", (job_id,))
+        self._remove_spool(row["spool_path"])
+
+    def cancel_user(self, user_uid: str, timeout: float = 120.0) -> bool:
+        """Cancela todas as tarefas de um usuário e remove os seus arquivos locais.
+
+        Usado antes da exclusão da conta, para que nenhum upload recrie os
+        dados do usuário depois dela. As tarefas que não estão em andamento
+        são removidas na hora; as em andamento não podem ser interrompidas, e
+        a fila aguarda o fim delas antes de removê-las, de modo que o que
+        gravaram seja excluído em seguida.
+
+        Args:
+            user_uid (str): O UID do usuário.
+            timeout (float): O tempo máximo de espera pelas tarefas em
+                             andamento, em segundos.
+
+        Returns:
+            bool: True se todas as tarefas foram canceladas, False se alguma
+                  ainda estava em andamento ao fim da espera.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._db_lock, self._connection:
+                rows = self._connection.execute(
+                    "SELECT id, spool_path FROM upload_jobs"
+                    " WHERE user_uid = ? AND status != ?",
+                    (user_uid, STATUS_RUNNING),
+                ).fetchall()
+                self._connection.executemany(
+                    "DELETE FROM upload_jobs WHERE id = ?",
+                    [(row["id"],) for row in rows],
+                )
+                running = self._connection.execute(
+                    "SELECT COUNT(*) FROM upload_jobs WHERE user_uid = ? AND status = ?",
+                    (user_uid, STATUS_RUNNING),
+                ).fetchone()[0]
+            # Repetições agendadas de tarefas removidas não encontram a tarefa.
+            for row in rows:
+                self._managers.pop(row["id"], None)
+                self._remove_spool(row["spool_path"])
+            if not running:
+                return True
+            if time.monotonic() >= deadline:
+                print(
+                    f"Erro ao cancelar os uploads do usuário {user_uid}: "
+                    f"{running} tarefa(s) ainda em andamento."
+                )
+                return False
+            time.sleep(0.25)
+
+    def _run(self, job_ids: list[str]):
+        """Executa uma tentativa de upload de um lote de tarefas pendentes.
+
+        As tarefas de um lote pertencem ao mesmo usuário e têm a mesma
+        descrição. As que falharem são repetidas individualmente.
+        """
+        placeholders = ", ".join("?" * len(job_ids))
+        with self._db_lock, self._connection:
+            jobs = self._connection.execute(
+                f"SELECT * FROM upload_jobs WHERE status = ? AND id IN ({placeholders})"
+                " ORDER BY created_at",
+                (STATUS_PENDING, *job_ids),
+            ).fetchall()
+            if not jobs:
+                return
+            self._connection.executemany(
+                "UPDATE upload_jobs SET status = ?, attempts = attempts + 1,"
+                " updated_at = ? WHERE id = ?",
+                [(STATUS_RUNNING, time.time(), job["id"]) for job in jobs],
+            )
+
+        user_uid = jobs[0]["user_uid"]
+        firebase_manager = self._manager_for(jobs)
+        doc_ids = [None] * len(jobs)
+        error = "Falha no envio do arquivo ou dos metadados."
+        try:
+            # Cada lote é contabilizado como uma execução do usuário, na
+            # sessão que o enviou.
+            with firebase_manager.request_scope(), ExitStack() as files:
+                firebase_manager.set_run_labels(user_uid, QUEUE_PAGE_LABEL)
+                uploads = [
+                    _SpooledUpload(
+                        files.enter_context(open(job["spool_path"], "rb")),
+                        job["file_name"],
+                        job["content_type"],
+                        job["size"],
+                    )
+                    for job in jobs
+                ]
+                doc_ids = DocumentService(firebase_manager).store_documents(
+                    user_uid,
+                    uploads,
+                    description=jobs[0]["description"],
+                    max_workers=self.upload_workers,
+                )
+        except Exception as e:
+            error = str(e)
+
+        for job, doc_id in zip(jobs, doc_ids):
+            if doc_id:
+                self._finish(job["id"], STATUS_DONE, doc_id=doc_id)
+                self._remove_spool(job["spool_path"])
+                self._managers.pop(job["id"], None)
+                continue
+
+            attempts = job["attempts"] + 1
+            if attempts >= self.max_attempts:
+                self._finish(job["id"], STATUS_FAILED, error=error)
+                self._managers.pop(job["id"], None)
+                continue
+
+            self._finish(job["id"], STATUS_PENDING, error=error)
+            delay = self.retry_delay * 2 ** (attempts - 1)
+            timer = threading.Timer(
+                delay, self._executor.submit, (self._run, [job["id"]])
+            )
+            timer.daemon = True
+            timer.start()
+
+    def _manager_for(self, jobs: list) -> FirebaseManager:
+        """Retorna o gerenciador da sessão que enviou as tarefas.
+
+        Tarefas retomadas na inicialização, sem sessão, usam o gerenciador
+        criado pela fila.
+        """
+        for job in jobs:
+            firebase_manager = self._managers.get(job["id"])
+            if firebase_manager is not None:
+                return firebase_manager
+        return self._fallback_manager
+
+    def _finish(
+        self, job_id: str, status: str, doc_id: str | None = None, error: str = None
+    ):
+        """Grava o resultado de uma tentativa na tabela de tarefas."""
+        with self._db_lock, self._connection:
+            self._connection.execute(
+                "UPDATE upload_jobs SET status = ?, doc_id = ?, error = ?,"
+                " updated_at = ? WHERE id = ?",
+                (status, doc_id, error, time.time(), job_id),
+            )
+
+    @staticmethod
+    def _remove_spool(spool_path: str):
+        """Remove o arquivo local de uma tarefa, se ainda existir."""
+        try:
+            os.remove(spool_path)
+        except FileNotFoundError:
+            pass
+
+
+def get_upload_queue(
+    directory: str,
+    manager_factory: callable,
+    max_workers: int = 4,
+    upload_workers: int = DEFAULT_UPLOAD_WORKERS,
+) -> UploadQueue:
+    """Retorna a fila compartilhada do diretório, criando-a se necessário.
+
+    A fila é única por processo e diretório, mas não guarda o gerenciador do
+    Firebase de nenhuma sessão: cada envio informa o da sua.
+
+    Args:
+        directory (str): O diretório local da fila.
+        manager_factory (callable): Cria o gerenciador do Firebase das
+            tarefas retomadas na inicialização, sem sessão.
+        max_workers (int): A quantidade máxima de lotes enviados ao mesmo tempo.
+        upload_workers (int): Os arquivos de um lote enviados ao mesmo tempo.
+    """
+    with _queues_lock:
+        queue = _queues.get(directory)
+        if queue is None:
+            queue = _queues[directory] = UploadQueue(
+                directory,
+                manager_factory,
+                max_workers=max_workers,
+                upload_workers=upload_workers,
+            )
+        return queue
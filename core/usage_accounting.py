@@ -0,0 +1,135 @@
+"""
+Módulo de contabilização de custos do Firestore.
+
+O Firestore cobra por documento lido, escrito e excluído. Este módulo define
+a classe UsageLedger, que acumula essas contagens por dia, usuário, sessão e
+página, e as persiste periodicamente como consolidações diárias em arquivos
+JSON locais, permitindo acompanhar quais usuários e páginas geram mais custo.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import date
+
+# Operações contabilizadas, na ordem usada nos contadores.
+USAGE_OPERATIONS = ("reads", "writes", "deletes")
+
+_ledgers: dict[str, "UsageLedger"] = {}
+_ledgers_lock = threading.Lock()
+
+
+class UsageLedger:
+    """Acumula e persiste as contagens diárias de operações do Firestore.
+
+    As contagens ficam em memória e são mescladas periodicamente ao arquivo
+    `{diretório}/{AAAA-MM-DD}.json` do dia correspondente. Uma única instância
+    por diretório é compartilhada entre todas as sessões do processo.
+
+    Attributes:
+        directory (str): O diretório local onde as consolidações são gravadas.
+        flush_interval (float): Intervalo mínimo, em segundos, entre gravações.
+    """
+
+    def __init__(self, directory: str, flush_interval: float = 30.0):
+        """Inicializa o acumulador de contagens.
+
+        Args:
+            directory (str): O diretório local das consolidações diárias.
+            flush_interval (float): Intervalo mínimo entre gravações, em segundos.
+        """
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending = defaultdict(lambda: [0, 0, 0])
+        self._last_flush = time.monotonic()
+
+    def add(
+        self,
+        user_uid: str | None,
+        session_id: str,
+        page: str | None,
+        counts: dict,
+    ):
+        """Soma as contagens de uma execução às contagens pendentes do dia.
+
+        Args:
+            user_uid (str | None): O UID do usuário, ou None se desconhecido.
+            session_id (str): O identificador da sessão do navegador.
+            page (str | None): A página que originou as operações.
+            counts (dict): Contagens por operação (`reads`, `writes`, `deletes`).
+        """
+        if not any(counts.get(operation) for operation in USAGE_OPERATIONS):
+            return
+        key = (date.today().isoformat(), user_uid or "-", session_id, page or "-")
+        with self._lock:
+            pending = self._pending[key]
+            for index, operation in enumerate(USAGE_OPERATIONS):
+                pending[index] += counts.get(operation, 0)
+
+    def flush_if_due(self):
+        """Grava as contagens pendentes se o intervalo mínimo já passou."""
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Mescla as contagens pendentes aos arquivos de consolidação diária."""
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(lambda: [0, 0, 0])
+            self._last_flush = time.monotonic()
+
+        if not pending:
+            return
+
+        by_day = defaultdict(list)
+        for (day, user_uid, session_id, page), values in pending.items():
+            by_day[day].append((user_uid, session_id, page, values))
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for day, entries in by_day.items():
+                self._merge_day(day, entries)
+        except Exception as e:
+            print(f"Erro ao gravar a contabilização de uso do Firestore: {e}")
+
+    def _merge_day(self, day: str, entries: list[tuple]):
+        """Mescla as entradas de um dia ao arquivo JSON correspondente."""
+        path = os.path.join(self.directory, f"{day}.json")
+        rollup = {"date": day, "users": {}}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                rollup = json.load(file)
+
+        for user_uid, session_id, page, values in entries:
+            user = rollup["users"].setdefault(
+                user_uid, {"total": {}, "pages": {}, "sessions": {}}
+            )
+            for bucket in (
+                user["total"],
+                user["pages"].setdefault(page, {}),
+                user["sessions"].setdefault(session_id, {}),
+            ):
+                for operation, value in zip(USAGE_OPERATIONS, values):
+                    bucket[operation] = bucket.get(operation, 0) + value
+
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(rollup, file, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+
+
+def get_usage_ledger(directory: str) -> UsageLedger:
+    """Retorna o acumulador compartilhado do diretório, criando-o se necessário.
+
+    Args:
+        directory (str): O diretório local das consolidações diárias.
+    """
+    with _ledgers_lock:
+        ledger = _ledgers.get(directory)
+        if ledger is None:
+            ledger = _ledgers[directory] = UsageLedger(directory)
+            atexit.register(ledger.flush)
+        return ledger
@@ -0,0 +1,177 @@
+"""
+Módulo de métricas de progressão dos treinos.
+
+Este módulo converte o histórico de sessões (`WorkoutSession`) em tabelas do
+pandas e calcula, com operações vetorizadas, o volume de cada série
+(repetições × peso), a estimativa de uma repetição máxima (1RM, fórmula de
+Epley) e as tendências semanais. As séries de todas as sessões são montadas
+de uma só vez (numpy), e as agregações usam `groupby`, sem laços por série,
+de modo que o cálculo continua rápido com anos de histórico.
+"""
+
+from itertools import chain
+import numpy as np
+import pandas as pd
+from .models import WorkoutSession
+
+# Colunas da tabela de séries, uma linha por série realizada.
+SET_COLUMNS = [
+    "session_id",
+    "exercise_id",
+    "performed_at",
+    "set_number",
+    "reps",
+    "weight",
+    "volume",
+    "one_rm",
+]
+
+
+def sets_frame(sessions: list[WorkoutSession]) -> pd.DataFrame:
+    """Monta a tabela de séries (uma linha por série) do histórico.
+
+    Args:
+        sessions (list[WorkoutSession]): As sessões registradas.
+
+    Returns:
+        pd.DataFrame: As séries, com as colunas de `SET_COLUMNS`.
+    """
+    sessions = [session for session in sessions if session.performed_at is not None]
+    if not sessions:
+        return pd.DataFrame(columns=SET_COLUMNS)
+
+    lengths = np.fromiter(
+        (min(len(session.reps), len(session.weights)) for session in sessions),
+        dtype=np.int64,
+        count=len(sessions),
+    )
+    total_sets = int(lengths.sum())
+    reps = np.fromiter(
+        chain.from_iterable(
+            session.reps[:length] for session, length in zip(sessions, lengths)
+        ),
+        dtype=np.float64,
+        count=total_sets,
+    )
+    weights = np.fromiter(
+        chain.from_iterable(
+            session.weights[:length] for session, length in zip(sessions, lengths)
+        ),
+        dtype=np.float64,
+        count=total_sets,
+    )
+    moments = pd.to_datetime([session.performed_at for session in sessions], utc=True)
+
+    # Posição de cada série dentro da sua sessão (1, 2, 3, ...).
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    set_numbers = np.arange(total_sets) - starts + 1
+
+    frame = pd.DataFrame(
+        {
+            "session_id": np.repeat([session.id for session in sessions], lengths),
+            "exercise_id": np.repeat(
+                [session.exercise_id for session in sessions], lengths
+            ),
+            "performed_at": moments.repeat(lengths),
+            "set_number": set_numbers,
+            "reps": reps,
+            "weight": weights,
+        }
+    )
+    frame["volume"] = frame["reps"] * frame["weight"]
+    # Epley: 1RM = peso × (1 + repetições / 30); uma repetição já é o máximo.
+    frame["one_rm"] = np.where(
+        frame["reps"] <= 1,
+        np.where(frame["reps"] > 0, frame["weight"], 0.0),
+        frame["weight"] * (1 + frame["reps"] / 30),
+    )
+    return frame
+
+
+def session_metrics(sets: pd.DataFrame) -> pd.DataFrame:
+    """Agrega a tabela de séries por sessão.
+
+    Args:
+        sets (pd.DataFrame): A tabela devolvida por `sets_frame`.
+
+    Returns:
+        pd.DataFrame: Uma linha por sessão, em ordem cronológica, com
+            `performed_at`, `exercise_id`, `sets`, `reps`, `volume`,
+            `top_weight` e `one_rm` (a maior estimativa entre as séries).
+    """
+    if sets.empty:
+        return pd.DataFrame(
+            columns=[
+                "session_id",
+                "performed_at",
+                "exercise_id",
+                "sets",
+                "reps",
+                "volume",
+                "top_weight",
+                "one_rm",
+            ]
+        )
+    return (
+        sets.groupby("session_id", sort=False)
+        .agg(
+            performed_at=("performed_at", "first"),
+            exercise_id=("exercise_id", "first"),
+            sets=("set_number", "size"),
+            reps=("reps", "sum"),
+            volume=("volume", "sum"),
+            top_weight=("weight", "max"),
+            one_rm=("one_rm", "max"),
+        )
+        .reset_index()
+        .sort_values("performed_at", kind="stable", ignore_index=True)
+    )
+
+
+def weekly_trends(sessions: pd.DataFrame) -> pd.DataFrame:
+    """Calcula as tendências semanais a partir das métricas por sessão.
+
+    As semanas começam na segunda-feira (em UTC). Semanas sem treino não
+    aparecem na tabela.
+
+    Args:
+        sessions (pd.DataFrame): A tabela devolvida por `session_metrics`.
+
+    Returns:
+        pd.DataFrame: Uma linha por semana, com `week`, `sessions`, `volume`,
+            `one_rm` (a melhor estimativa da semana), `volume_change` (variação
+            percentual em relação à semana anterior com treino) e
+            `volume_avg_4w` (média móvel do volume nas últimas 4 semanas).
+    """
+    if sessions.empty:
+        return pd.DataFrame(
+            columns=[
+                "week",
+                "sessions",
+                "volume",
+                "one_rm",
+                "volume_change",
+                "volume_avg_4w",
+            ]
+        )
+    weeks = (
+        sessions["performed_at"]
+        .dt.tz_convert(None)
+        .dt.to_period("W-SUN")
+        .dt.start_time.rename("week")
+    )
+    trends = (
+        sessions.groupby(weeks)
+        .agg(
+            sessions=("session_id", "size"),
+            volume=("volume", "sum"),
+            one_rm=("one_rm", "max"),
+        )
+        .reset_index()
+    )
+    trends["volume_change"] = trends["volume"].pct_change() * 100
+    # A média móvel é por tempo (28 dias), e não pelas últimas 4 linhas.
+    trends["volume_avg_4w"] = (
+        trends.set_index("week")["volume"].rolling("28D").mean().to_numpy()
+    )
+    return trends
@@ -0,0 +1,301 @@
+"""
+Módulo de serviço para gerenciar os treinos dos usuários.
+
+Este módulo define a classe WorkoutService, que mantém os exercícios do
+usuário (coleção 'treinos') e o histórico de sessões realizadas de cada um
+(coleção 'treinos_sessoes'). O histórico é apenas acrescentado: cada sessão
+é um documento compacto, com as séries em listas paralelas de repetições e
+pesos, e editar o exercício não apaga o que já foi registrado.
+
+A quantidade de exercícios por grupo muscular é mantida de forma incremental
+em um documento de resumo, de modo que a página lista os grupos sem ler os
+exercícios; os de cada grupo são consultados apenas quando ele é aberto.
+O nome, o grupo e as observações dos exercícios entram no índice de busca.
+"""
+
+from collections import Counter
+from datetime import datetime
+from firebase_admin import firestore
+from .firebase_manager import FirebaseManager
+from .models import Workout, WorkoutSession, sort_key_moment
+from .search_index import SearchIndex
+
+# Documento, em `users/{uid}/meta`, com a quantidade de exercícios por grupo.
+WORKOUT_SUMMARY_DOCUMENT = "workouts"
+
+# Versão do resumo por grupo; resumos de versões anteriores são recalculados
+# (a versão 2 passou a contar os exercícios sem o campo de grupo).
+WORKOUT_SUMMARY_VERSION = 2
+
+# Grupo exibido para exercícios sem grupo muscular.
+UNKNOWN_GROUP = "Não Informado"
+
+# Tipo dos exercícios no índice de busca (o nome da coleção).
+WORKOUTS_KIND = "treinos"
+
+
+def workout_text(name: str, group: str, notes: str) -> str:
+    """Retorna o texto indexado de um exercício (nome, grupo e observações)."""
+    return f"{name}\n{group}\n{notes}"
+
+
+class WorkoutService:
+    """Gerencia os exercícios e o histórico de sessões de um usuário.
+
+    Attributes:
+        fb_manager (FirebaseManager): O gerenciador do Firebase.
+        user_uid (str): O UID do usuário dono dos treinos.
+        search_index (SearchIndex): O índice de busca do usuário.
+    """
+
+    def __init__(self, firebase_manager: FirebaseManager, user_uid: str):
+        """Inicializa o serviço de treinos de um usuário.
+
+        Args:
+            firebase_manager (FirebaseManager): Instância do gerenciador
+                do Firebase para interagir com o Firestore.
+            user_uid (str): O UID do usuário dono dos treinos.
+        """
+        self.fb_manager = firebase_manager
+        self.user_uid = user_uid
+        self.search_index = SearchIndex(firebase_manager, user_uid)
+
+    @property
+    def workouts_path(self) -> str:
+        """O caminho da coleção de exercícios do usuário."""
+        return f"users/{self.user_uid}/treinos"
+
+    @property
+    def sessions_path(self) -> str:
+        """O caminho da coleção de sessões realizadas do usuário."""
+        return f"users/{self.user_uid}/treinos_sessoes"
+
+    @property
+    def meta_path(self) -> str:
+        """O caminho da coleção de dados agregados do usuário."""
+        return f"users/{self.user_uid}/meta"
+
+    def group_counts(self) -> dict[str, int]:
+        """Retorna a quantidade de exercícios de cada grupo muscular.
+
+        O resumo é mantido de forma incremental. Na primeira consulta (ou se
+        ele é de uma versão anterior), é calculado a partir dos exercícios.
+
+        Returns:
+            dict[str, int]: A quantidade de exercícios por grupo, apenas dos
+                            grupos que têm algum exercício.
+        """
+        summary = self.fb_manager.get_document(self.meta_path, WORKOUT_SUMMARY_DOCUMENT)
+        if not summary or summary.get("version") != WORKOUT_SUMMARY_VERSION:
+            summary = self.recompute_group_counts()
+        return {
+            group: count
+            for group, count in summary.get("group_counts", {}).items()
+            if count > 0
+        }
+
+    def recompute_group_counts(self) -> dict:
+        """Recalcula o resumo por grupo muscular, lendo apenas esse campo.
+
+        A leitura ordenada pelo campo ignora os exercícios sem ele; esses são
+        contados em `UNKNOWN_GROUP` pela diferença para a contagem total da
+        coleção (uma consulta de agregação).
+
+        Returns:
+            dict: O resumo recalculado, com `group_counts`.
+        """
+        counts = Counter(
+            value or UNKNOWN_GROUP
+            for value in self.fb_manager.iter_field_values(
+                self.workouts_path, "muscle_group"
+            )
+        )
+        total = self.fb_manager.count_documents(self.workouts_path)
+        if total is not None and total > counts.total():
+            counts[UNKNOWN_GROUP] += total - counts.total()
+        summary = {
+            "group_counts": dict(counts),
+            "initialized": True,
+            "version": WORKOUT_SUMMARY_VERSION,
+        }
+        self.fb_manager.set_document(self.meta_path, WORKOUT_SUMMARY_DOCUMENT, summary)
+        return summary
+
+    def _count_group(self, group: str, amount: int):
+        """Soma `amount` à quantidade de exercícios de um grupo no resumo."""
+        self.fb_manager.increment_document(
+            self.meta_path,
+            WORKOUT_SUMMARY_DOCUMENT,
+            {"group_counts": {group or UNKNOWN_GROUP: amount}},
+        )
+
+    def list_group(self, group: str) -> list[Workout]:
+        """Retorna os exercícios de um grupo muscular, dos mais recentes aos antigos.
+
+        Exercícios sem grupo podem ter o campo vazio, nulo ou ausente, e as
+        consultas do Firestore não encontram documentos sem o campo; por isso,
+        os de `UNKNOWN_GROUP` são filtrados a partir de todos os exercícios,
+        lidos apenas quando esse grupo é aberto.
+
+        Args:
+            group (str): O grupo muscular.
+        """
+        if group == UNKNOWN_GROUP:
+            workouts = [
+                workout
+                for workout in self.fb_manager.get_all_records(
+                    self.workouts_path, Workout
+                )
+                if not workout.muscle_group
+            ]
+        else:
+            workouts = self.fb_manager.query_records(
+                self.workouts_path, Workout, filters=[("muscle_group", "==", group)]
+            )
+        return sorted(
+            workouts,
+            key=lambda workout: sort_key_moment(workout.created_at),
+            reverse=True,
+        )
+
+    def ensure_search_index(self):
+        """Indexa, uma única vez, os exercícios criados antes do índice de busca."""
+        if self.search_index.is_built(WORKOUTS_KIND):
+            return
+        workouts = self.fb_manager.get_all_records(self.workouts_path, Workout)
+        self.search_index.build(
+            WORKOUTS_KIND,
+            {
+                workout.id: workout_text(
+                    workout.exercise_name, workout.muscle_group, workout.notes
+                )
+                for workout in workouts
+            },
+            {workout.id: workout.exercise_name for workout in workouts},
+        )
+
+    def create(self, data: dict) -> str | None:
+        """Cria um exercício, o conta no resumo do seu grupo e o indexa.
+
+        Args:
+            data (dict): Os dados do exercício.
+
+        Returns:
+            str | None: O ID do exercício criado, ou None em caso de erro.
+        """
+        # O grupo é sempre gravado, mesmo vazio, para que o campo exista.
+        data = {**data, "muscle_group": data.get("muscle_group") or ""}
+        doc_id = self.fb_manager.add_document(self.workouts_path, data)
+        if doc_id:
+            self._count_group(data.get("muscle_group"), 1)
+            self.search_index.update(
+                WORKOUTS_KIND,
+                doc_id,
+                "",
+                workout_text(
+                    data.get("exercise_name", ""),
+                    data.get("muscle_group", ""),
+                    data.get("notes", ""),
+                ),
+                label=data.get("exercise_name"),
+            )
+        return doc_id
+
+    def update(self, workout: Workout, data: dict):
+        """Atualiza um exercício, movendo-o de grupo no resumo se preciso.
+
+        Os termos alterados são atualizados no índice de busca.
+
+        Args:
+            workout (Workout): O exercício antes da edição.
+            data (dict): Os campos alterados.
+        """
+        self.fb_manager.update_document(self.workouts_path, workout.id, data)
+        new_group = data.get("muscle_group", workout.muscle_group)
+        if (new_group or UNKNOWN_GROUP) != (workout.muscle_group or UNKNOWN_GROUP):
+            self._count_group(workout.muscle_group, -1)
+            self._count_group(new_group, 1)
+        name = data.get("exercise_name", workout.exercise_name)
+        self.search_index.update(
+            WORKOUTS_KIND,
+            workout.id,
+            workout_text(workout.exercise_name, workout.muscle_group, workout.notes),
+            workout_text(name, new_group, data.get("notes", workout.notes)),
+            label=name,
+        )
+
+    def log_session(
+        self,
+        exercise_id: str,
+        reps: list[int],
+        weights: list[float],
+        notes: str = "",
+        performed_at: datetime | None = None,
+    ) -> str | None:
+        """Registra uma sessão realizada de um exercício.
+
+        Args:
+            exercise_id (str): O ID do exercício em 'treinos'.
+            reps (list[int]): As repetições de cada série.
+            weights (list[float]): O peso (kg) de cada série.
+            notes (str): Observações da sessão.
+            performed_at (datetime | None): Quando a sessão foi realizada. Se
+                None, usa o horário do servidor.
+
+        Returns:
+            str | None: O ID da sessão criada, ou None em caso de erro.
+        """
+        if len(reps) != len(weights):
+            print("Erro ao registrar sessão: séries com repetições e pesos diferentes.")
+            return None
+        return self.fb_manager.add_document(
+            self.sessions_path,
+            {
+                "exercise_id": exercise_id,
+                "performed_at": performed_at or firestore.SERVER_TIMESTAMP,
+                "reps": [int(value) for value in reps],
+                "weights": [float(value) for value in weights],
+                "notes": notes,
+            },
+        )
+
+    def iter_sessions(self, exercise_id: str | None = None):
+        """Percorre o histórico de sessões, da mais antiga à mais recente.
+
+        Args:
+            exercise_id (str | None): Restringe às sessões de um exercício.
+
+        Yields:
+            WorkoutSession: As sessões, página a página.
+        """
+        filters = [("exercise_id", "==", exercise_id)] if exercise_id else []
+        return self.fb_manager.iter_records(
+            self.sessions_path,
+            WorkoutSession,
+            filters=filters,
+            order_by=[("performed_at", firestore.Query.ASCENDING)],
+        )
+
+    def delete_exercise(self, workout: Workout) -> bool:
+        """Exclui um exercício e todo o seu histórico de sessões.
+
+        Args:
+            workout (Workout): O exercício a excluir.
+
+        Returns:
+            bool: True se o exercício e as sessões foram excluídos.
+        """
+        deleted = self.fb_manager.delete_collection(
+            self.sessions_path, filters=[("exercise_id", "==", workout.id)]
+        )
+        if deleted is None:
+            return False
+        self.fb_manager.delete_document(self.workouts_path, workout.id)
+        self._count_group(workout.muscle_group, -1)
+        self.search_index.update(
+            WORKOUTS_KIND,
+            workout.id,
+            workout_text(workout.exercise_name, workout.muscle_group, workout.notes),
+            "",
+        )
+        return True
@@ -0,0 +1,46 @@
+"""Testes da dobra das linhas do arquivo .ics (RFC 5545, seção 3.1)."""
+
+from core.calendar_export import escape_text, fold_line
+
+
+def unfold(folded: str) -> str:
+    """Desfaz a dobra, como um leitor de iCalendar."""
+    return folded.removesuffix("\r\n").replace("\r\n ", "")
+
+
+def test_short_lines_are_only_terminated():
+    assert fold_line("SUMMARY:Consulta") == "SUMMARY:Consulta\r\n"
+
+
+def test_line_of_exactly_75_octets_is_not_folded():
+    line = "X" * 75
+
+    assert fold_line(line) == line + "\r\n"
+
+
+def test_long_lines_are_folded_within_75_octets():
+    line = "DESCRIPTION:" + "a" * 200
+    folded = fold_line(line)
+
+    parts = folded.removesuffix("\r\n").split("\r\n")
+    assert len(parts) > 1
+    assert all(len(part.encode("utf-8")) <= 75 for part in parts)
+    assert all(part.startswith(" ") for part in parts[1:])
+    assert unfold(folded) == line
+
+
+def test_multibyte_characters_are_not_split():
+    # "ç" e "ã" ocupam 2 bytes e "🩺", 4: nenhum pode ser cortado ao meio.
+    line = "SUMMARY:" + "exame de coração 🩺 " * 12
+    folded = fold_line(line)
+
+    parts = folded.removesuffix("\r\n").split("\r\n")
+    assert all(len(part.encode("utf-8")) <= 75 for part in parts)
+    assert unfold(folded) == line
+
+
+def test_escaped_text_keeps_its_escapes_after_folding():
+    text = escape_text("Jejum; levar exames, pedido\nmédico")
+    line = "DESCRIPTION:" + text * 4
+
+    assert unfold(fold_line(line)) == line
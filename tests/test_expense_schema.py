@@ -0,0 +1,134 @@
+"""Testes da conversão dos gastos do esquema 1 para o esquema atual."""
+
+from datetime import date, datetime
+from firebase_admin import firestore
+from core.expense_service import (
+    CARD_EXPENSE,
+    EXPENSES_SCHEMA_VERSION,
+    FIXED_EXPENSE,
+    expense_fields,
+    upgraded_expense,
+)
+from core.models import Expense, to_record
+
+LEGACY_CARD_EXPENSE = {
+    "descricao": "Notebook",
+    "valor": 1200.5,
+    "tipo": CARD_EXPENSE,
+    "categoria": "Outro",
+    "data": "2024-03-15",
+    "criado_em": "2024-03-15T10:30:00",
+    "parcelas": 10,
+    "valor_parcela": 120.05,
+    "fim_parcelamento": "12/2024",
+}
+
+
+def migrated(data: dict) -> dict:
+    """Mescla os campos de `upgraded_expense` ao documento, como o Firestore."""
+    fields = upgraded_expense(to_record(Expense, "gasto", data))
+    document = dict(data)
+    for name, value in fields.items():
+        if value is firestore.DELETE_FIELD:
+            document.pop(name, None)
+        else:
+            document[name] = value
+    return document
+
+
+def test_legacy_fields_are_read_as_cents():
+    expense = to_record(Expense, "gasto", LEGACY_CARD_EXPENSE)
+
+    assert expense.valor_centavos == 120050
+    assert expense.valor_parcela_centavos == 12005
+    assert expense.valor == 1200.5
+    assert expense.data == date(2024, 3, 15)
+    assert expense.fim_parcelamento == date(2024, 12, 1)
+    assert expense.schema_version == 1
+
+
+def test_current_fields_take_precedence_over_legacy_fields():
+    expense = to_record(
+        Expense, "gasto", {"valor": 10.0, "valor_centavos": 2500, "tipo": FIXED_EXPENSE}
+    )
+
+    assert expense.valor_centavos == 2500
+
+
+def test_legacy_amounts_are_rounded_to_the_nearest_cent():
+    # 19.99 * 100 é 1998.9999... em ponto flutuante.
+    expense = to_record(Expense, "gasto", {"valor": 19.99, "tipo": FIXED_EXPENSE})
+
+    assert expense.valor_centavos == 1999
+
+
+def test_upgraded_card_expense_uses_timestamps_and_cents():
+    fields = upgraded_expense(to_record(Expense, "gasto", LEGACY_CARD_EXPENSE))
+
+    assert fields["valor_centavos"] == 120050
+    assert fields["valor_parcela_centavos"] == 12005
+    assert fields["valor"] is firestore.DELETE_FIELD
+    assert fields["valor_parcela"] is firestore.DELETE_FIELD
+    assert fields["data"] == datetime(2024, 3, 15)
+    assert fields["criado_em"] == datetime(2024, 3, 15, 10, 30)
+    # A última de dez parcelas a partir de março de 2024.
+    assert fields["fim_parcelamento"] == datetime(2024, 12, 1)
+    assert fields["schema_version"] == EXPENSES_SCHEMA_VERSION
+
+
+def test_upgraded_fixed_expense_has_no_installment_fields():
+    fields = upgraded_expense(
+        to_record(
+            Expense,
+            "gasto",
+            {"valor": 99.9, "tipo": FIXED_EXPENSE, "data": "2024-01-31"},
+        )
+    )
+
+    assert fields["valor_centavos"] == 9990
+    assert fields["data"] == datetime(2024, 1, 31)
+    assert "valor_parcela_centavos" not in fields
+    assert "fim_parcelamento" not in fields
+
+
+def test_unreadable_date_is_kept_and_installment_end_is_preserved():
+    fields = upgraded_expense(
+        to_record(
+            Expense,
+            "gasto",
+            {**LEGACY_CARD_EXPENSE, "data": "sem data", "fim_parcelamento": "05/2025"},
+        )
+    )
+
+    assert "data" not in fields
+    assert fields["fim_parcelamento"] == datetime(2025, 5, 1)
+
+
+def test_migrated_document_reads_back_the_same_expense():
+    before = to_record(Expense, "gasto", LEGACY_CARD_EXPENSE)
+    after = to_record(Expense, "gasto", migrated(LEGACY_CARD_EXPENSE))
+
+    assert after.valor == before.valor
+    assert after.valor_parcela == before.valor_parcela
+    assert after.data == before.data
+    assert after.fim_parcelamento == before.fim_parcelamento
+    assert after.schema_version == EXPENSES_SCHEMA_VERSION
+    assert "valor" not in migrated(LEGACY_CARD_EXPENSE)
+
+
+def test_migration_is_idempotent():
+    once = migrated(LEGACY_CARD_EXPENSE)
+
+    assert migrated(once) == once
+
+
+def test_expense_fields_converts_form_values():
+    fields = expense_fields(
+        {"descricao": "Aluguel", "valor": 1500.0, "data": date(2024, 2, 5)}
+    )
+
+    assert fields == {
+        "descricao": "Aluguel",
+        "valor_centavos": 150000,
+        "data": datetime(2024, 2, 5),
+    }
@@ -0,0 +1,196 @@
+"""Testes do índice de busca: tolerância a erros, prefixos e ordenação."""
+
+import pytest
+from firebase_admin import firestore
+from core import search_index
+from core.search_index import SearchIndex, within_one_edit
+
+NOTES = "anotacoes"
+EXAMS = "exames"
+
+
+class FakeFirebaseManager:
+    """Um Firestore em memória com as operações usadas pelo índice.
+
+    As gravações mesclam os dados como `set(..., merge=True)`, aplicando
+    `Increment`, `ArrayUnion` e `DELETE_FIELD`. As leituras são contadas em
+    `reads`, um documento por vez.
+    """
+
+    def __init__(self):
+        self.collections: dict[str, dict[str, dict]] = {}
+        self.reads = 0
+
+    @classmethod
+    def _merge(cls, target: dict, data: dict):
+        for name, value in data.items():
+            if value is firestore.DELETE_FIELD:
+                target.pop(name, None)
+            elif isinstance(value, firestore.Increment):
+                target[name] = target.get(name, 0) + value.value
+            elif isinstance(value, firestore.ArrayUnion):
+                current = target.setdefault(name, [])
+                current.extend(item for item in value.values if item not in current)
+            elif isinstance(value, dict):
+                cls._merge(target.setdefault(name, {}), value)
+            else:
+                target[name] = value
+
+    def get_document(self, collection_name: str, document_id: str) -> dict | None:
+        self.reads += 1
+        return self.collections.get(collection_name, {}).get(document_id)
+
+    def get_documents(self, collection_name: str, document_ids: list[str]) -> dict:
+        self.reads += len(document_ids)
+        collection = self.collections.get(collection_name, {})
+        return {
+            doc_id: collection[doc_id]
+            for doc_id in document_ids
+            if doc_id in collection
+        }
+
+    def set_document(self, collection_name: str, document_id: str, data: dict):
+        self.collections.setdefault(collection_name, {})[document_id] = dict(data)
+
+    def delete_document(self, collection_name: str, document_id: str):
+        self.collections.get(collection_name, {}).pop(document_id, None)
+
+    def delete_collection(self, collection_name: str) -> int:
+        return len(self.collections.pop(collection_name, {}))
+
+    def batch_write(self, operations: list[tuple]) -> bool:
+        for collection_name, document_id, data in operations:
+            document = self.collections.setdefault(collection_name, {}).setdefault(
+                document_id, {}
+            )
+            self._merge(document, data)
+        return True
+
+
+@pytest.fixture(autouse=True)
+def empty_index_caches():
+    # O índice em memória é do processo: cada teste começa sem ele.
+    search_index._caches.clear()
+    yield
+    search_index._caches.clear()
+
+
+@pytest.fixture
+def index() -> SearchIndex:
+    return SearchIndex(FakeFirebaseManager(), "usuario")
+
+
+@pytest.mark.parametrize(
+    "first, second",
+    [
+        ("consulta", "consulta"),
+        ("consulta", "consuta"),  # remoção
+        ("consulta", "consullta"),  # inserção
+        ("consulta", "consalta"),  # substituição
+        ("consulta", "cosnulta"),  # troca de vizinhos
+        ("consulta", "consultq"),  # na última letra
+    ],
+)
+def test_within_one_edit_accepts_single_typos(first, second):
+    assert within_one_edit(first, second)
+    assert within_one_edit(second, first)
+
+
+@pytest.mark.parametrize(
+    "first, second",
+    [
+        ("consulta", "cnsuta"),  # duas remoções
+        ("consulta", "cosnutla"),  # duas trocas
+        ("consulta", "consultoria"),
+        ("exame", "emxea"),
+    ],
+)
+def test_within_one_edit_rejects_larger_differences(first, second):
+    assert not within_one_edit(first, second)
+
+
+def test_prefix_finds_words_being_typed(index):
+    index.update(NOTES, "n1", "", "Consulta com o cardiologista", label="Cardio")
+
+    assert [doc_id for _, doc_id, _ in index.search("cardio")] == ["n1"]
+    assert index.search("cardiologista")[0][1] == "n1"
+
+
+def test_accents_and_plurals_are_normalized(index):
+    index.update(NOTES, "n1", "", "Exame de coração")
+
+    assert index.search("exames coracao")[0][1] == "n1"
+
+
+def test_typos_are_tolerated_when_no_term_matches(index):
+    index.update(NOTES, "n1", "", "Consulta com o cardiologista")
+
+    assert index.search("cardiologsta")[0][1] == "n1"
+
+
+def test_exact_matches_rank_above_prefix_matches(index):
+    index.update(NOTES, "prefix", "", "cardiologia")
+    index.update(NOTES, "exact", "", "cardio")
+
+    ranking = [doc_id for _, doc_id, _ in index.search("cardio")]
+
+    assert ranking == ["exact", "prefix"]
+
+
+def test_typos_are_ignored_when_a_term_matches(index):
+    index.update(NOTES, "exact", "", "dentista")
+    index.update(NOTES, "typo", "", "dentsita")
+
+    assert [doc_id for _, doc_id, _ in index.search("dentista")] == ["exact"]
+
+
+def test_rare_terms_outweigh_common_ones(index):
+    for number in range(5):
+        index.update(NOTES, f"comum{number}", "", "lembrete mercado")
+    index.update(NOTES, "raro", "", "lembrete dentista")
+    index.update(NOTES, "frequente", "", "mercado mercado mercado")
+
+    ranking = [doc_id for _, doc_id, _ in index.search("dentista mercado")]
+
+    assert ranking[0] == "raro"
+
+
+def test_results_can_be_limited_to_kinds(index):
+    index.update(NOTES, "n1", "", "pressão arterial")
+    index.update(EXAMS, "e1", "", "pressão arterial")
+
+    results = index.search("pressao", kinds=[EXAMS])
+
+    assert [(kind, doc_id) for kind, doc_id, _ in results] == [(EXAMS, "e1")]
+
+
+def test_edited_and_deleted_records_leave_the_results(index):
+    index.update(NOTES, "n1", "", "dentista")
+    index.update(NOTES, "n1", "dentista", "oftalmologista")
+
+    assert index.search("dentista") == []
+    assert index.search("oftalmologista")[0][1] == "n1"
+
+    index.update(NOTES, "n1", "oftalmologista", "")
+    assert index.search("oftalmologista") == []
+
+
+def test_repeated_searches_are_served_from_memory(index):
+    index.update(NOTES, "n1", "", "Consulta com o cardiologista")
+    index.search("cardio")
+    reads = index.fb_manager.reads
+
+    index.search("cardio")
+
+    assert index.fb_manager.reads == reads
+
+
+def test_built_kinds_are_known_without_new_reads(index):
+    assert not index.is_built(NOTES)
+    assert index.build(NOTES, {"n1": "Consulta"}, {"n1": "Consulta"})
+
+    assert index.is_built(NOTES)
+    reads = index.fb_manager.reads
+    assert index.is_built(NOTES)
+    assert not index.is_built(EXAMS)
+    assert index.fb_manager.reads == reads
@@ -0,0 +1,117 @@
+"""Testes das métricas de progressão calculadas a partir das sessões."""
+
+from datetime import datetime, timezone
+import pandas as pd
+import pytest
+from core.models import WorkoutSession
+from core.workout_analytics import (
+    SET_COLUMNS,
+    session_metrics,
+    sets_frame,
+    weekly_trends,
+)
+
+
+def session(session_id: str, day: int, reps: tuple, weights: tuple, month: int = 1):
+    """Cria uma sessão do supino em 2024, ao meio-dia (UTC)."""
+    return WorkoutSession(
+        session_id,
+        "supino",
+        datetime(2024, month, day, 12, tzinfo=timezone.utc),
+        reps,
+        weights,
+        "",
+    )
+
+
+def test_sets_frame_has_one_row_per_set():
+    sets = sets_frame(
+        [session("s1", 1, (10, 8), (60.0, 70.0)), session("s2", 3, (5,), (80.0,))]
+    )
+
+    assert list(sets.columns) == SET_COLUMNS
+    assert sets["session_id"].tolist() == ["s1", "s1", "s2"]
+    assert sets["set_number"].tolist() == [1, 2, 1]
+    assert sets["volume"].tolist() == [600.0, 560.0, 400.0]
+
+
+def test_sets_frame_ignores_unmatched_sets_and_undated_sessions():
+    undated = WorkoutSession("s0", "supino", None, (10,), (50.0,), "")
+    sets = sets_frame([undated, session("s1", 1, (10, 8, 6), (60.0,))])
+
+    assert sets["session_id"].tolist() == ["s1"]
+    assert sets["reps"].tolist() == [10.0]
+
+
+def test_sets_frame_of_no_sessions_is_empty():
+    sets = sets_frame([])
+
+    assert sets.empty
+    assert list(sets.columns) == SET_COLUMNS
+
+
+def test_one_rm_uses_epley_and_keeps_single_reps():
+    sets = sets_frame([session("s1", 1, (10, 1, 0), (60.0, 100.0, 50.0))])
+
+    assert sets["one_rm"].tolist() == [pytest.approx(80.0), 100.0, 0.0]
+
+
+def test_session_metrics_are_aggregated_in_chronological_order():
+    sets = sets_frame(
+        [
+            session("late", 10, (5,), (90.0,)),
+            session("early", 2, (10, 10), (50.0, 60.0)),
+        ]
+    )
+    metrics = session_metrics(sets)
+
+    assert metrics["session_id"].tolist() == ["early", "late"]
+    early = metrics.iloc[0]
+    assert early["sets"] == 2
+    assert early["reps"] == 20
+    assert early["volume"] == 1100.0
+    assert early["top_weight"] == 60.0
+    assert early["one_rm"] == pytest.approx(80.0)
+
+
+def test_weekly_trends_group_by_monday_weeks():
+    # 01/01/2024 foi uma segunda-feira; 07/01 ainda é a mesma semana.
+    metrics = session_metrics(
+        sets_frame(
+            [
+                session("a", 1, (10,), (50.0,)),
+                session("b", 7, (10,), (50.0,)),
+                session("c", 8, (10,), (75.0,)),
+            ]
+        )
+    )
+    trends = weekly_trends(metrics)
+
+    assert trends["week"].tolist() == [
+        pd.Timestamp("2024-01-01"),
+        pd.Timestamp("2024-01-08"),
+    ]
+    assert trends["sessions"].tolist() == [2, 1]
+    assert trends["volume"].tolist() == [1000.0, 750.0]
+    assert pd.isna(trends["volume_change"].iloc[0])
+    assert trends["volume_change"].iloc[1] == pytest.approx(-25.0)
+
+
+def test_moving_average_spans_28_days_not_4_rows():
+    # Semanas com treino espaçadas: a de março não inclui as de janeiro.
+    metrics = session_metrics(
+        sets_frame(
+            [
+                session("a", 1, (10,), (10.0,)),
+                session("b", 8, (10,), (30.0,)),
+                session("c", 4, (10,), (50.0,), month=3),
+            ]
+        )
+    )
+    trends = weekly_trends(metrics)
+
+    assert trends["volume_avg_4w"].tolist() == [100.0, 200.0, 500.0]
+
+
+def test_weekly_trends_of_no_sessions_is_empty():
+    assert weekly_trends(session_metrics(sets_frame([]))).empty
@@ -5,17 +5,81 @@ Este módulo contém a função `render_sidebar`, que é responsável por
 construir a barra lateral completa da aplicação Streamlit. Ele gerencia
 o fluxo de navegação e as opções de sub-páginas com base nas seleções do usuário,
 utilizando o `st.session_state` para manter o estado da navegação.
+Também contém `render_performance_panel`, que exibe as métricas de
+desempenho da execução atual quando o painel de depuração está habilitado.
 """
 
 import streamlit as st
+from core.document_service import DOCUMENTS_KIND
+from core.exam_service import EXAMS_KIND
+from core.expense_service import EXPENSES_KIND
+from core.instrumentation import LATENCY_BUCKETS_MS, RunMetrics
+from core.note_service import NOTES_KIND
+from core.workout_service import WORKOUTS_KIND
 
+# Ícone, categoria e sub-página de cada tipo de resultado da busca unificada.
+SEARCH_DESTINATIONS = {
+    EXPENSES_KIND: ("💸", "Financeiro", "Gastos"),
+    NOTES_KIND: ("📝", "Pessoal", "Anotações"),
+    EXAMS_KIND: ("🩺", "Pessoal", "Exames médicos"),
+    WORKOUTS_KIND: ("🏋️", "Pessoal", "Treinos"),
+    DOCUMENTS_KIND: ("📄", "Pessoal", "Documentos"),
+}
 
-def render_sidebar(user_info: dict, on_logout: callable):
+# Chave do `st.session_state` com a sub-página selecionada de cada categoria.
+SUBPAGE_KEYS = {"Pessoal": "pessoal_subpages", "Financeiro": "financeiro_subpages"}
+
+
+def _open_search_result(category: str, sub_page: str):
+    """Navega para a página de um resultado da busca (callback do botão)."""
+    st.session_state.main_dashboard_category = category
+    st.session_state[SUBPAGE_KEYS[category]] = sub_page
+
+
+def _render_search(on_search: callable):
+    """Exibe a caixa de busca unificada e os resultados da consulta.
+
+    Args:
+        on_search (callable): Função que recebe a consulta e retorna tuplas
+                              `(tipo, id, rótulo)`.
+    """
+    query = st.text_input(
+        "🔎 Buscar",
+        key="global_search_query",
+        placeholder="Gastos, anotações, exames...",
+    )
+    if not query.strip():
+        return
+
+    results = on_search(query)
+    if not results:
+        st.caption("Nenhum resultado encontrado.")
+        return
+    for kind, doc_id, label in results:
+        icon, category, sub_page = SEARCH_DESTINATIONS.get(
+            kind, ("🔎", "Pessoal", "Anotações")
+        )
+        st.button(
+            f"{icon} {label}",
+            key=f"search_result_{kind}_{doc_id}",
+            help=sub_page,
+            on_click=_open_search_result,
+            args=(category, sub_page),
+        )
+
+
+def render_sidebar(
+    user_info: dict,
+    on_logout: callable,
+    show_performance_panel: bool = False,
+    on_delete_account: callable = None,
+    on_search: callable = None,
+):
     """Renderiza a barra lateral completa da aplicação Streamlit.
 
     Esta função exibe uma saudação personalizada, as opções de navegação
     principais (Visão Geral, Financeiro, Pessoal) e suas respectivas sub-páginas,
-    além de um botão de logout. As seleções de navegação são armazenadas
+    além de um botão de logout e, opcionalmente, a busca unificada. As seleções de navegação são armazenadas
     no `st.session_state` para controle do conteúdo principal da aplicação.
 
     Args:
@@ -23,6 +87,18 @@ def render_sidebar(user_info: dict, on_logout: callable):
                           como 'displayName' ou 'email'.
         on_logout (callable): Uma função de callback a ser executada quando o
                               usuário clica no botão 'Sair'.
+        show_performance_panel (bool): Se deve reservar o espaço do painel de
+                                       desempenho ao final da barra lateral.
+        on_delete_account (callable, optional): Função chamada com a senha
+                                                informada quando o usuário
+                                                confirma a exclusão da conta.
+        on_search (callable, optional): Função da busca unificada, que recebe a
+                                        consulta e retorna tuplas
+                                        `(tipo, id, rótulo)`.
+
+    Returns:
+        O contêiner reservado para o painel de desempenho, preenchido por
+        `render_performance_panel` após a renderização da página, ou None.
     """
     # Acesso aos dados do usuário para exibição
     user_display_name = user_info.get("displayName") or user_info.get("email")
@@ -30,13 +106,16 @@ def render_sidebar(user_info: dict, on_logout: callable):
     with st.sidebar:
         st.header(f"Bem-vindo, {user_display_name}! 🏠")
 
+        if on_search is not None:
+            _render_search(on_search)
+
         st.markdown("---")
 
         st.write("### Categorias")
         # Menu principal de categorias. A seleção é armazenada em st.session_state.main_dashboard_category
         st.radio(
             "Navegue pelas áreas:",
-            ("Pessoal", "Financeiro"),
+            ("Visão Geral", "Pessoal", "Financeiro"),
             key="main_dashboard_category",
         )
 
@@ -69,3 +148,66 @@ def render_sidebar(user_info: dict, on_logout: callable):
         # Botão de sair. Chama a função on_logout quando clicado.
         if st.button("Sair"):
             on_logout()
+
+        # Zona de perigo: a exclusão da conta exige confirmação explícita e a
+        # senha do usuário, conferida antes de qualquer exclusão.
+        if on_delete_account is not None:
+            with st.expander("⚠️ Conta"):
+                st.caption(
+                    "Excluir a conta remove definitivamente todos os seus dados "
+                    "e arquivos. Esta ação não pode ser desfeita."
+                )
+                confirmation = st.text_input(
+                    'Digite "EXCLUIR" para confirmar', key="delete_account_confirm"
+                )
+                password = st.text_input(
+                    "Senha atual", type="password", key="delete_account_password"
+                )
+                if st.button(
+                    "Excluir minha conta",
+                    type="primary",
+                    disabled=confirmation.strip().upper() != "EXCLUIR" or not password,
+                ):
+                    on_delete_account(password)
+
+        # O painel é preenchido somente depois da página, quando as métricas
+        # da execução já estão completas.
+        if show_performance_panel:
+            return st.container()
+    return None
+
+
+def render_performance_panel(container, metrics: RunMetrics | None):
+    """Exibe as métricas de desempenho da execução atual na barra lateral.
+
+    Args:
+        container: O contêiner retornado por `render_sidebar`.
+        metrics (RunMetrics | None): As métricas coletadas na execução atual.
+    """
+    if container is None or metrics is None:
+        return
+
+    rows = metrics.summary()
+    bucket_labels = [
+        "> 5000 ms" if bound == float("inf") else f"≤ {bound} ms"
+        for bound in LATENCY_BUCKETS_MS
+    ]
+
+    with container:
+        st.markdown("---")
+        st.write("### ⏱️ Desempenho")
+        st.caption(
+            f"Página: {metrics.page or '-'} · Execução: {metrics.elapsed_ms():.0f} ms"
+        )
+        if not rows:
+            st.caption("Nenhuma chamada registrada nesta execução.")
+            return
+
+        st.dataframe(rows, hide_index=True)
+
+        with st.expander("Histograma de latências"):
+            selected_call = st.selectbox(
+                "Operação", [row["call"] for row in rows], key="perf_panel_call"
+            )
+            buckets = metrics.calls[selected_call].buckets
+            st.bar_chart({"Chamadas": dict(zip(bucket_labels, buckets))})
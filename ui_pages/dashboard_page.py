@@ -9,14 +9,25 @@ integrando-se a outros módulos para renderizar as diferentes seções da aplica
 
 import streamlit as st
 from core.auth_service import AuthService
-from ui_pages.components.sidebar_component import render_sidebar
+from core.global_search import GlobalSearch
+from core.instrumentation import current_metrics
+from core.purge_service import PurgeService
+from config.settings import PERFORMANCE_PANEL_ENABLED
+from ui_pages.components.sidebar_component import (
+    render_performance_panel,
+    render_sidebar,
+)
 from ui_pages.personal.exams_page import render_exams_page
 from ui_pages.personal.notes_page import render_anotation_page
-from ui_pages.personal.document_page import render_document_page
+from ui_pages.personal.document_page import (
+    render_document_page,
+    shared_upload_queue,
+)
 from ui_pages.personal.workout_page import render_workout_page
 from ui_pages.financy.income_page import render_income_page
 from ui_pages.financy.expenses_page import render_expenses_page
 from ui_pages.financy.reports_page import render_reports_page
+from ui_pages.overview_page import render_overview_page
 
 
 def show_dashboard(auth_service: AuthService, on_logout: callable):
@@ -34,7 +45,49 @@ def show_dashboard(auth_service: AuthService, on_logout: callable):
 
     user_uid = user_info.get("localId")
 
-    render_sidebar(user_info, on_logout)
+    def delete_account(password: str):
+        # A exclusão é irreversível: a senha é conferida com um novo login.
+        if not auth_service.verify_password(user_uid, user_info.get("email"), password):
+            st.error("Senha incorreta. A conta não foi excluída.")
+            return
+        # Os uploads pendentes recriariam documentos e arquivos após a exclusão.
+        with st.spinner("Cancelando uploads pendentes..."):
+            cancelled = shared_upload_queue().cancel_user(user_uid)
+        if not cancelled:
+            st.error(
+                "Ainda há uploads em andamento. Aguarde alguns instantes e tente novamente."
+            )
+            return
+        progress_bar = st.progress(0.0, text="Excluindo dados da conta...")
+        result = PurgeService(auth_service.fb_manager).purge_user(
+            user_uid,
+            on_progress=lambda stage, done, total: progress_bar.progress(
+                done / total if total else 1.0, text=f"Excluindo: {stage}..."
+            ),
+        )
+        progress_bar.empty()
+        if result is None:
+            st.error("Não foi possível excluir todos os dados. Tente novamente.")
+        else:
+            st.success("Sua conta e todos os seus dados foram excluídos.")
+            on_logout()
+
+    global_search = GlobalSearch(auth_service.fb_manager, user_uid)
+
+    def search(query: str) -> list[tuple[str, str, str]]:
+        # Os registros anteriores ao índice são indexados na primeira busca.
+        if not st.session_state.get("global_search_ready"):
+            global_search.ensure_index()
+            st.session_state.global_search_ready = True
+        return global_search.search(query)
+
+    performance_panel = render_sidebar(
+        user_info,
+        on_logout,
+        show_performance_panel=PERFORMANCE_PANEL_ENABLED,
+        on_delete_account=delete_account,
+        on_search=search,
+    )
 
     main_category = st.session_state.get("main_dashboard_category", "Visão Geral")
 
@@ -45,7 +98,18 @@ def show_dashboard(auth_service: AuthService, on_logout: callable):
     else:
         sub_page = "Dashboard Principal"
 
-    if main_category == "Pessoal":
+    auth_service.fb_manager.set_run_labels(user_uid, sub_page)
+    metrics = current_metrics()
+
+    if auth_service.fb_manager.read_budget_exceeded():
+        st.caption(
+            "⚡ Modo econômico ativo: algumas listas podem exibir dados da última leitura."
+        )
+
+    if main_category == "Visão Geral":
+        render_overview_page(auth_service.fb_manager, user_uid)
+
+    elif main_category == "Pessoal":
         if sub_page == "Exames médicos":
             render_exams_page(auth_service.fb_manager, user_uid)
         elif sub_page == "Anotações":
@@ -62,3 +126,5 @@ def show_dashboard(auth_service: AuthService, on_logout: callable):
             render_expenses_page(auth_service.fb_manager, user_uid)
         elif sub_page == "Relatórios Financeiros":
             render_reports_page(auth_service.fb_manager, user_uid)
+
+    render_performance_panel(performance_panel, metrics)
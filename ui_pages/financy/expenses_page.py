@@ -7,12 +7,129 @@ de crédito). Os dados são persistidos no Firestore.
 """
 
 import streamlit as st
+from core.expense_service import (
+    CARD_EXPENSE,
+    EXPENSE_CATEGORIES,
+    EXPENSE_TYPES,
+    FIXED_EXPENSE,
+    ExpenseService,
+    installment_end,
+)
 from core.firebase_manager import FirebaseManager
+from core.instrumentation import instrumented
+from core.models import Expense
 from time import sleep
-from datetime import datetime
-from collections import defaultdict
 
+# Rótulo do grupo dos gastos com tipos fora de `EXPENSE_TYPES` (tipos
+# antigos, digitados à mão ou ausentes).
+OTHER_TYPES_LABEL = "Outros tipos"
 
+
+def _render_expense(
+    expense_service: ExpenseService, expense: Expense, expense_categories: list
+):
+    """Renderiza um gasto, com as ações de editar e excluir.
+
+    Args:
+        expense_service (ExpenseService): O serviço de gastos do usuário.
+        expense (Expense): O gasto a ser exibido.
+        expense_categories (list): As opções de categoria do formulário.
+    """
+    doc_id = expense.id
+
+    st.markdown("---")
+    st.write(f"**Descrição:** {expense.descricao}")
+    st.write(f"**Categoria:** {expense.categoria}")
+    st.write(f"**Valor:** R$ {expense.valor:.2f}")
+    st.write(
+        f"**Data:** {expense.data.strftime('%d/%m/%Y') if expense.data else 'N/A'}"
+    )
+
+    if expense.tipo == CARD_EXPENSE:
+        st.write(f"**Parcelas:** {expense.parcelas}")
+        st.write(f"**Valor da Parcela:** R$ {expense.valor_parcela:.2f}")
+        end = expense.fim_parcelamento
+        st.write(f"**Fim do Parcelamento:** {end.strftime('%m/%Y') if end else 'N/A'}")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Editar", key=f"edit_expense_{doc_id}"):
+            st.session_state.editing_expense_id = doc_id
+            st.rerun()
+
+    with col2:
+        if st.button("Excluir", key=f"delete_expense_{doc_id}"):
+            expense_service.delete(expense)
+            st.success("Gasto excluído com sucesso! 🗑️")
+            sleep(1.5)
+            st.rerun()
+
+    # Formulário de edição
+    if st.session_state.editing_expense_id == doc_id:
+        st.subheader("Editar Gasto")
+        with st.form(f"edit_form_{doc_id}"):
+            edited_description = st.text_input(
+                "Descrição",
+                value=expense.descricao,
+                key=f"edit_desc_{doc_id}",
+            )
+            edited_value = st.number_input(
+                "Valor (R$)",
+                min_value=0.0,
+                value=expense.valor,
+                step=0.01,
+                format="%.2f",
+                key=f"edit_value_{doc_id}",
+            )
+            edited_category = st.selectbox(
+                "Categoria",
+                options=expense_categories,
+                index=expense_categories.index(expense.categoria),
+                key=f"edit_cat_{doc_id}",
+            )
+
+            # Campos de edição condicionais para cartão de crédito
+            if expense.tipo == CARD_EXPENSE:
+                edited_installments = st.number_input(
+                    "Número de Parcelas",
+                    min_value=1,
+                    value=expense.parcelas,
+                    step=1,
+                    key=f"edit_installments_{doc_id}",
+                )
+                edited_installment_value = st.number_input(
+                    "Valor da Parcela (R$)",
+                    min_value=0.0,
+                    value=expense.valor_parcela,
+                    step=0.01,
+                    format="%.2f",
+                    key=f"edit_installment_value_{doc_id}",
+                )
+
+            col_save, col_cancel = st.columns(2)
+            with col_save:
+                if st.form_submit_button("Salvar Edição"):
+                    update_data = {
+                        "descricao": edited_description,
+                        "valor": edited_value,
+                        "categoria": edited_category,
+                    }
+                    if expense.tipo == CARD_EXPENSE:
+                        update_data["parcelas"] = edited_installments
+                        update_data["valor_parcela"] = edited_installment_value
+
+                    expense_service.update(expense, update_data)
+                    st.success("Gasto atualizado com sucesso! ✅")
+                    st.session_state.editing_expense_id = None
+                    sleep(1.5)
+                    st.rerun()
+            with col_cancel:
+                if st.form_submit_button("Cancelar"):
+                    st.session_state.editing_expense_id = None
+                    st.rerun()
+
+
+@instrumented("page")
 def render_expenses_page(firebase_manager: FirebaseManager, user_uid: str):
     """Renderiza a página para gerenciamento de gastos.
 
@@ -28,20 +145,17 @@ def render_expenses_page(firebase_manager: FirebaseManager, user_uid: str):
         "Registre aqui seus gastos fixos e de cartão de crédito para manter suas finanças em dia."
     )
 
-    expense_categories = [
-        "Selecione uma categoria",
-        "Necessário",
-        "Lazer",
-        "Imprevisto",
-        "Alimentação",
-        "Transporte",
-        "Educação",
-        "Moradia",
-        "Saúde",
-        "Outro",
-    ]
-
-    collection_path = f"users/{user_uid}/gastos"
+    expense_categories = ["Selecione uma categoria", *EXPENSE_CATEGORIES]
+
+    expense_service = ExpenseService(firebase_manager, user_uid)
+    # Os totais vêm de agregações sobre o esquema atual: sem a migração, os
+    # gastos antigos ficariam de fora sem aviso.
+    if not expense_service.ensure_schema():
+        st.warning(
+            "Não foi possível converter os gastos antigos para o formato atual. "
+            "Os totais podem não incluí-los; recarregue a página para tentar "
+            "novamente."
+        )
 
     # Inicializa o estado de edição
     if "editing_expense_id" not in st.session_state:
@@ -76,15 +190,12 @@ def render_expenses_page(firebase_manager: FirebaseManager, user_uid: str):
                     new_expense_data = {
                         "descricao": expense_description,
                         "valor": expense_value,
-                        "tipo": "Fixo",
+                        "tipo": FIXED_EXPENSE,
                         "categoria": expense_category,
-                        "data": expense_date.strftime("%Y-%m-%d"),
-                        "criado_em": datetime.now().isoformat(),
+                        "data": expense_date,
                         "user_uid": user_uid,
                     }
-                    doc_id = firebase_manager.add_document(
-                        collection_path, new_expense_data
-                    )
+                    doc_id = expense_service.create(new_expense_data)
                     if doc_id:
                         st.success("Gasto fixo salvo com sucesso! ✅")
                         sleep(1.5)
@@ -142,28 +253,24 @@ def render_expenses_page(firebase_manager: FirebaseManager, user_uid: str):
                     )
 
                     # Cálculo do mês e ano de término do parcelamento
-                    final_month = expense_date.month + installments - 1
-                    final_year = expense_date.year + (final_month - 1) // 12
-                    final_month = (final_month - 1) % 12 + 1
-                    end_month_year = f"{final_month:02d}/{final_year}"
+                    end_month = installment_end(expense_date, installments)
 
-                    st.info(f"O parcelamento se encerrará em **{end_month_year}**.")
+                    st.info(
+                        "O parcelamento se encerrará em "
+                        f"**{end_month.strftime('%m/%Y')}**."
+                    )
 
                     new_expense_data = {
                         "descricao": expense_description,
                         "valor": expense_value,
-                        "tipo": "Cartão de Crédito",
+                        "tipo": CARD_EXPENSE,
                         "categoria": expense_category,
-                        "data": expense_date.strftime("%Y-%m-%d"),
-                        "criado_em": datetime.now().isoformat(),
+                        "data": expense_date,
                         "user_uid": user_uid,
                         "parcelas": installments,
                         "valor_parcela": installment_value,
-                        "fim_parcelamento": end_month_year,
                     }
-                    doc_id = firebase_manager.add_document(
-                        collection_path, new_expense_data
-                    )
+                    doc_id = expense_service.create(new_expense_data)
                     if doc_id:
                         st.success("Gasto de cartão de crédito salvo com sucesso! ✅")
                         sleep(1.5)
@@ -179,129 +286,49 @@ def render_expenses_page(firebase_manager: FirebaseManager, user_uid: str):
 
     st.subheader("Histórico de Gastos")
 
-    all_expenses = firebase_manager.get_all_documents(collection_path)
-
-    if all_expenses:
-        expenses_list = []
-        for item in all_expenses:
-            doc_id, data = list(item.items())[0]
-            data["id"] = doc_id
-            expenses_list.append(data)
-
-        grouped_expenses = defaultdict(list)
-        for expense in expenses_list:
-            grouped_expenses[expense.get("tipo", "Não Informado")].append(expense)
-
-        for expense_type, expenses_in_group in grouped_expenses.items():
-            with st.expander(f"**🧾 Tipo: {expense_type}**"):
-                sorted_expenses = sorted(
-                    expenses_in_group,
-                    key=lambda x: x.get("data", "9999-12-31"),
-                    reverse=True,
-                )
-
-                for expense in sorted_expenses:
-                    doc_id = expense["id"]
-
-                    st.markdown("---")
-                    st.write(f"**Descrição:** {expense.get('descricao')}")
-                    st.write(f"**Categoria:** {expense.get('categoria')}")
-                    st.write(f"**Valor:** R$ {expense.get('valor', 0):.2f}")
-                    st.write(
-                        f"**Data:** {datetime.strptime(expense.get('data'), '%Y-%m-%d').strftime('%d/%m/%Y')}"
-                    )
+    # Os totais vêm de consultas de agregação; os gastos de um tipo só são
+    # lidos quando o grupo é aberto.
+    month_spending = expense_service.month_spending()
+    if month_spending is not None:
+        st.metric(
+            "Gastos do Mês",
+            f"R$ {month_spending['total']:.2f}",
+            help=(
+                f"Fixos: R$ {month_spending['fixed']:.2f} · "
+                f"Parcelas do cartão: R$ {month_spending['installments']:.2f}"
+            ),
+        )
 
-                    if expense.get("tipo") == "Cartão de Crédito":
-                        st.write(f"**Parcelas:** {expense.get('parcelas', 'N/A')}")
-                        st.write(
-                            f"**Valor da Parcela:** R$ {expense.get('valor_parcela', 0):.2f}"
-                        )
-                        st.write(
-                            f"**Fim do Parcelamento:** {expense.get('fim_parcelamento', 'N/A')}"
-                        )
-
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if st.button("Editar", key=f"edit_expense_{doc_id}"):
-                            st.session_state.editing_expense_id = doc_id
-                            st.rerun()
-
-                    with col2:
-                        if st.button("Excluir", key=f"delete_expense_{doc_id}"):
-                            firebase_manager.delete_document(collection_path, doc_id)
-                            st.success("Gasto excluído com sucesso! 🗑️")
-                            sleep(1.5)
-                            st.rerun()
-
-                    # Formulário de edição
-                    if st.session_state.editing_expense_id == doc_id:
-                        st.subheader("Editar Gasto")
-                        with st.form(f"edit_form_{doc_id}"):
-                            edited_description = st.text_input(
-                                "Descrição",
-                                value=expense.get("descricao"),
-                                key=f"edit_desc_{doc_id}",
-                            )
-                            edited_value = st.number_input(
-                                "Valor (R$)",
-                                min_value=0.0,
-                                value=expense.get("valor"),
-                                step=0.01,
-                                format="%.2f",
-                                key=f"edit_value_{doc_id}",
-                            )
-                            edited_category = st.selectbox(
-                                "Categoria",
-                                options=expense_categories,
-                                index=expense_categories.index(
-                                    expense.get("categoria")
-                                ),
-                                key=f"edit_cat_{doc_id}",
-                            )
-
-                            # Campos de edição condicionais para cartão de crédito
-                            if expense.get("tipo") == "Cartão de Crédito":
-                                edited_installments = st.number_input(
-                                    "Número de Parcelas",
-                                    min_value=1,
-                                    value=expense.get("parcelas"),
-                                    step=1,
-                                    key=f"edit_installments_{doc_id}",
-                                )
-                                edited_installment_value = st.number_input(
-                                    "Valor da Parcela (R$)",
-                                    min_value=0.0,
-                                    value=expense.get("valor_parcela"),
-                                    step=0.01,
-                                    format="%.2f",
-                                    key=f"edit_installment_value_{doc_id}",
-                                )
-
-                            col_save, col_cancel = st.columns(2)
-                            with col_save:
-                                if st.form_submit_button("Salvar Edição"):
-                                    update_data = {
-                                        "descricao": edited_description,
-                                        "valor": edited_value,
-                                        "categoria": edited_category,
-                                    }
-                                    if expense.get("tipo") == "Cartão de Crédito":
-                                        update_data["parcelas"] = edited_installments
-                                        update_data["valor_parcela"] = (
-                                            edited_installment_value
-                                        )
-
-                                    firebase_manager.update_document(
-                                        collection_path, doc_id, update_data
-                                    )
-                                    st.success("Gasto atualizado com sucesso! ✅")
-                                    st.session_state.editing_expense_id = None
-                                    sleep(1.5)
-                                    st.rerun()
-                            with col_cancel:
-                                if st.form_submit_button("Cancelar"):
-                                    st.session_state.editing_expense_id = None
-                                    st.rerun()
+    summaries = {
+        expense_type: expense_service.type_summary(expense_type)
+        for expense_type in EXPENSE_TYPES
+    }
+    other_summary = expense_service.other_types_summary(summaries)
+    if other_summary is not None and other_summary["count"]:
+        summaries[OTHER_TYPES_LABEL] = other_summary
+
+    if any(summary is None or summary["count"] for summary in summaries.values()):
+        for expense_type, summary in summaries.items():
+            if summary is None:
+                label = f"**🧾 Tipo: {expense_type}**"
+            elif summary["count"]:
+                label = (
+                    f"**🧾 Tipo: {expense_type}** · {summary['count']} gasto(s) · "
+                    f"R$ {summary['total']:.2f}"
+                )
+            else:
+                continue
+
+            if st.toggle(label, key=f"expense_group_{expense_type}"):
+                with st.container(border=True):
+                    if summary is not None and summary["average"] is not None:
+                        st.caption(f"Valor médio: R$ {summary['average']:.2f}")
+                    if expense_type == OTHER_TYPES_LABEL:
+                        expenses = expense_service.list_other_types(EXPENSE_TYPES)
+                    else:
+                        expenses = expense_service.list_by_type(expense_type)
+                    for expense in expenses:
+                        _render_expense(expense_service, expense, expense_categories)
 
     else:
         st.info(
@@ -8,9 +8,11 @@ persistente no Firestore.
 
 import streamlit as st
 from core.firebase_manager import FirebaseManager
+from core.instrumentation import instrumented
 from time import sleep
 
 
+@instrumented("page")
 def render_income_page(firebase_manager: FirebaseManager, user_uid: str):
     """Renderiza a página para gerenciamento de renda mensal.
 
@@ -4,23 +4,31 @@ Módulo para renderizar a página de relatórios financeiros.
 Este script gera visualizações de dados para ajudar o usuário a
 entender seus padrões de gastos. Ele calcula despesas mensais,
 incluindo a projeção de gastos futuros com base em parcelas de cartão
-de crédito, e exibe os dados em um gráfico.
+de crédito, e exibe os dados em um gráfico. Os totais são calculados por
+consultas de agregação no Firestore, sem baixar todos os gastos.
 """
 
 import streamlit as st
 import pandas as pd
+from core.expense_service import ExpenseService, shift_month
 from core.firebase_manager import FirebaseManager
-from datetime import datetime
-from collections import defaultdict
+from core.instrumentation import instrumented
+from datetime import date
 import plotly.express as px
 
+# Meses exibidos no gráfico mensal, antes e depois do mês atual (os meses
+# seguintes mostram a projeção das parcelas do cartão de crédito).
+REPORT_PAST_MONTHS = 5
+REPORT_FUTURE_MONTHS = 6
 
+
+@instrumented("page")
 def render_reports_page(firebase_manager: FirebaseManager, user_uid: str):
     """Renderiza a página para visualização de relatórios financeiros.
 
-    A função busca dados de renda e gastos no Firestore, processa-os
-    para calcular totais mensais e projeta gastos futuros com parcelas,
-    apresentando tudo em um gráfico.
+    A função busca a renda e os totais de gastos de cada mês (incluindo a
+    projeção das parcelas futuras) e de cada categoria no Firestore,
+    apresentando tudo em gráficos.
 
     Args:
         firebase_manager (FirebaseManager): Instância do gerenciador do Firebase.
@@ -41,78 +49,45 @@ def render_reports_page(firebase_manager: FirebaseManager, user_uid: str):
         )
         return
 
-    # Busca todos os gastos do usuário
-    expense_data = firebase_manager.get_all_documents(f"users/{user_uid}/gastos")
-
-    if not expense_data:
+    expense_service = ExpenseService(firebase_manager, user_uid)
+    # Os totais vêm de agregações sobre o esquema atual: sem a migração, os
+    # gastos antigos ficariam de fora sem aviso.
+    if not expense_service.ensure_schema():
+        st.warning(
+            "Não foi possível converter os gastos antigos para o formato atual. "
+            "Os totais podem não incluí-los; recarregue a página para tentar "
+            "novamente."
+        )
+    if not firebase_manager.count_documents(expense_service.expenses_path):
         st.info(
             "Nenhum gasto registrado ainda. Adicione gastos para ver seus relatórios."
         )
         return
 
-    # Processa os dados de gastos por mês e categoria
-    monthly_totals = defaultdict(float)
-    monthly_card_expenses = defaultdict(float)
-    category_totals = defaultdict(float)
-
-    today = datetime.now()
-
-    for item in expense_data:
-        doc_id, data = list(item.items())[0]
-
-        expense_date_str = data.get("data")
-        if not expense_date_str:
-            continue
-
-        expense_date = datetime.strptime(expense_date_str, "%Y-%m-%d")
-
-        # Apenas considera gastos a partir do mês atual para o gráfico de barras
-        if expense_date.year == today.year and expense_date.month == today.month:
-            month_year = today.strftime("%Y-%m")
-        elif expense_date.year > today.year or (
-            expense_date.year == today.year and expense_date.month > today.month
-        ):
-            month_year = expense_date.strftime("%Y-%m")
-        else:
-            month_year = expense_date.strftime("%Y-%m")
-
-        category = data.get("categoria", "Outro")
-
-        if data.get("tipo") == "Fixo":
-            monthly_totals[month_year] += data.get("valor", 0)
-            category_totals[category] += data.get("valor", 0)
-
-        elif data.get("tipo") == "Cartão de Crédito":
-            installments = data.get("parcelas", 1)
-            installment_value = data.get("valor_parcela", 0)
-
-            category_totals[category] += data.get(
-                "valor", 0
-            )  # Total gasto, não a parcela
-
-            for i in range(installments):
-                installment_month = expense_date.month + i
-                installment_year = expense_date.year + (installment_month - 1) // 12
-                installment_month = (installment_month - 1) % 12 + 1
-
-                installment_month_year = f"{installment_year}-{installment_month:02d}"
-                monthly_totals[installment_month_year] += installment_value
-                monthly_card_expenses[installment_month_year] += installment_value
+    # Os totais de cada mês e de cada categoria são calculados no Firestore
+    # por consultas de agregação, sem baixar os gastos.
+    today = date.today()
+    months = [
+        date(*shift_month(today.year, today.month, offset), 1)
+        for offset in range(-REPORT_PAST_MONTHS, REPORT_FUTURE_MONTHS + 1)
+    ]
+    monthly_spending = expense_service.monthly_spending(months)
+    category_totals = expense_service.category_totals()
+    if monthly_spending is None or category_totals is None:
+        st.error("Não foi possível calcular os totais de gastos. Tente novamente.")
+        return
 
     # Cria um DataFrame para visualização dos gráficos de barras e linhas
     df_data = []
 
-    all_months = sorted(
-        list(set(list(monthly_totals.keys()) + [today.strftime("%Y-%m")]))
-    )
-
-    for month_year in all_months:
+    for month in months:
+        spending = monthly_spending[month]
         df_data.append(
             {
-                "Mês": month_year,
+                "Mês": month.strftime("%Y-%m"),
                 "Renda Mensal": monthly_income,
-                "Gastos Totais": monthly_totals[month_year],
-                "Gastos de Cartão": monthly_card_expenses[month_year],
+                "Gastos Totais": spending["total"],
+                "Gastos de Cartão": spending["installments"],
             }
         )
 
@@ -0,0 +1,113 @@
+"""
+Módulo para renderizar a página de visão geral.
+
+Este script define a interface inicial do painel, que resume em uma única
+tela os próximos exames, os gastos do mês em relação à renda, a quantidade
+de registros de cada área e as atividades mais recentes. Os dados vêm do
+`OverviewService`, que os consulta em paralelo com agregações e consultas
+limitadas.
+"""
+
+import streamlit as st
+from core.firebase_manager import FirebaseManager
+from core.instrumentation import instrumented
+from core.overview_service import OverviewService
+from ui_pages.components.sidebar_component import SEARCH_DESTINATIONS
+
+
+def _format_count(value: int | None) -> str:
+    """Formata uma contagem, exibindo '-' quando ela não pôde ser feita."""
+    return "-" if value is None else str(value)
+
+
+@instrumented("page")
+def render_overview_page(firebase_manager: FirebaseManager, user_uid: str):
+    """Renderiza a página de visão geral do usuário.
+
+    Args:
+        firebase_manager (FirebaseManager): Instância do gerenciador do Firebase.
+        user_uid (str): O UID do usuário atualmente autenticado.
+    """
+    st.title("🏠 Visão Geral")
+    st.write("Um resumo rápido das suas finanças, exames e registros.")
+
+    overview = OverviewService(firebase_manager, user_uid).load()
+
+    # --- Finanças do mês ---
+
+    st.subheader("💰 Finanças do Mês")
+    income = overview["income"]
+    spending = overview["spending"]
+    if spending is None:
+        st.warning("Não foi possível calcular os gastos do mês.")
+    else:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Renda Mensal", f"R$ {income:.2f}")
+        with col2:
+            st.metric(
+                "Gastos do Mês",
+                f"R$ {spending['total']:.2f}",
+                help=(
+                    f"Fixos: R$ {spending['fixed']:.2f} · "
+                    f"Parcelas do cartão: R$ {spending['installments']:.2f}"
+                ),
+            )
+        with col3:
+            balance = income - spending["total"]
+            st.metric("Saldo", f"R$ {balance:.2f}")
+        if income > 0:
+            st.progress(
+                min(spending["total"] / income, 1.0),
+                text=f"{spending['total'] / income:.0%} da renda comprometida",
+            )
+        else:
+            st.caption("Registre sua renda na página 'Renda Mensal' para comparar.")
+
+    st.markdown("---")
+
+    # --- Registros ---
+
+    counts = overview["counts"]
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("📝 Anotações", _format_count(counts["notes"]))
+    with col2:
+        st.metric("📄 Documentos", _format_count(counts["documents"]))
+    with col3:
+        st.metric("🏋️ Exercícios", _format_count(counts["workouts"]))
+
+    st.markdown("---")
+
+    col_exams, col_recent = st.columns(2)
+
+    # --- Próximos exames ---
+
+    with col_exams:
+        st.subheader("🩺 Próximos Exames")
+        if overview["upcoming_exams"]:
+            for exam in overview["upcoming_exams"]:
+                with st.container(border=True):
+                    st.write(f"**{exam.title}**")
+                    st.caption(
+                        f"{exam.when.strftime('%d/%m/%Y')} às {exam.time}"
+                        + (f" · {exam.local}" if exam.local else "")
+                    )
+        else:
+            st.info("Nenhum exame agendado.")
+
+    # --- Atividade recente ---
+
+    with col_recent:
+        st.subheader("🕒 Atividade Recente")
+        if overview["recent"]:
+            for kind, label, moment in overview["recent"]:
+                icon, _, sub_page = SEARCH_DESTINATIONS.get(kind, ("•", "", ""))
+                st.write(f"{icon} **{label or 'Sem título'}**")
+                st.caption(
+                    f"{sub_page} · {moment.strftime('%d/%m/%Y %H:%M')}"
+                    if moment
+                    else sub_page
+                )
+        else:
+            st.info("Nenhuma atividade registrada ainda.")
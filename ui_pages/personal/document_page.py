@@ -8,14 +8,156 @@ para a persistência dos metadados dos documentos.
 """
 
 import streamlit as st
+from config.settings import (
+    FIREBASE_STORAGE_BUCKET,
+    FIREBASE_WEB_API_KEY,
+    STORAGE_QUOTA_BYTES,
+    STORAGE_QUOTA_FILES,
+    UPLOAD_QUEUE_DIR,
+    UPLOAD_STATUS_POLL_SECONDS,
+    UPLOAD_WORKERS,
+    USAGE_ROLLUP_DIR,
+)
+from core.document_service import DocumentService
 from core.firebase_manager import FirebaseManager
-from firebase_admin import firestore
+from core.instrumentation import instrumented
+from core.models import DocumentMeta, sort_key_moment
+from core.upload_queue import (
+    STATUS_DONE,
+    STATUS_FAILED,
+    STATUS_RUNNING,
+    UploadQueue,
+    get_upload_queue,
+)
 from time import sleep
-from datetime import datetime
-import os
-import uuid
 
+# Rótulos exibidos para cada situação de uma tarefa de upload.
+UPLOAD_STATUS_LABELS = {
+    STATUS_RUNNING: "📤 Enviando...",
+    STATUS_DONE: "✅ Concluído",
+    STATUS_FAILED: "❌ Falhou",
+}
 
+
+def _queue_firebase_manager() -> FirebaseManager:
+    """Cria o gerenciador do Firebase dos uploads retomados sem sessão.
+
+    Usado pela fila apenas para as tarefas interrompidas por um reinício do
+    servidor; os demais uploads usam o gerenciador da sessão que os enviou.
+    """
+    return FirebaseManager(
+        key_path=dict(st.secrets["firebase"]),
+        storage_bucket=FIREBASE_STORAGE_BUCKET,
+        web_api_key=FIREBASE_WEB_API_KEY,
+        usage_dir=USAGE_ROLLUP_DIR,
+    )
+
+
+def shared_upload_queue() -> UploadQueue:
+    """Retorna a fila de uploads em segundo plano compartilhada pelas sessões."""
+    return get_upload_queue(
+        UPLOAD_QUEUE_DIR, _queue_firebase_manager, upload_workers=UPLOAD_WORKERS
+    )
+
+
+def render_storage_usage(usage: dict):
+    """Exibe o espaço usado pelo usuário e a sua distribuição por tipo.
+
+    Args:
+        usage (dict): O uso de armazenamento retornado por `get_storage_usage`.
+    """
+    used_mb = usage.get("bytes", 0) / (1024 * 1024)
+    file_count = usage.get("file_count", 0)
+    if STORAGE_QUOTA_BYTES:
+        quota_mb = STORAGE_QUOTA_BYTES / (1024 * 1024)
+        st.progress(
+            min(used_mb / quota_mb, 1.0),
+            text=f"Armazenamento: {used_mb:.1f} MB de {quota_mb:.0f} MB "
+            f"· {file_count} arquivo(s)",
+        )
+    else:
+        st.caption(f"Armazenamento: {used_mb:.1f} MB · {file_count} arquivo(s)")
+
+    by_mime = {
+        mime_type: values
+        for mime_type, values in usage.get("by_mime", {}).items()
+        if values.get("count", 0) > 0
+    }
+    if by_mime:
+        with st.expander("Uso por tipo de arquivo"):
+            st.dataframe(
+                [
+                    {
+                        "Tipo": mime_type,
+                        "Arquivos": values.get("count", 0),
+                        "Tamanho (MB)": round(
+                            values.get("bytes", 0) / (1024 * 1024), 2
+                        ),
+                    }
+                    for mime_type, values in sorted(
+                        by_mime.items(), key=lambda item: -item[1].get("bytes", 0)
+                    )
+                ],
+                hide_index=True,
+            )
+
+
+@st.fragment(run_every=UPLOAD_STATUS_POLL_SECONDS)
+def render_upload_jobs(
+    upload_queue: UploadQueue, document_service: DocumentService, user_uid: str
+):
+    """Exibe a situação dos uploads em segundo plano, atualizando-a periodicamente.
+
+    Apenas este trecho da página é reexecutado a cada consulta, lendo a
+    tabela local de tarefas (sem acessar o Firestore). Quando um upload é
+    concluído, a página inteira é recarregada para exibir o novo documento.
+
+    Args:
+        upload_queue (UploadQueue): A fila de uploads em segundo plano.
+        document_service (DocumentService): O serviço de documentos da
+            sessão, usado ao repetir um upload (cota e gerenciador do Firebase).
+        user_uid (str): O UID do usuário atualmente autenticado.
+    """
+    jobs = upload_queue.list_jobs(user_uid)
+    if not jobs:
+        return
+
+    finished = [job for job in jobs if job["status"] == STATUS_DONE]
+    if finished:
+        for job in finished:
+            upload_queue.dismiss(job["id"])
+            st.toast(f"Documento enviado: {job['file_name']}")
+        st.rerun()
+
+    st.subheader("Envios em andamento")
+    for job in jobs:
+        col1, col2, col3 = st.columns([3, 2, 2])
+        col1.write(job["file_name"])
+        status = UPLOAD_STATUS_LABELS.get(job["status"], "⏳ Na fila")
+        if job["error"] and job["status"] != STATUS_FAILED:
+            status += f" (tentativa {job['attempts'] + 1})"
+        col2.write(status)
+        if job["status"] == STATUS_FAILED:
+            with col3:
+                if st.button("Tentar novamente", key=f"retry_upload_{job['id']}"):
+                    # A reserva da tarefa foi liberada na falha; a cota é
+                    # verificada de novo antes de recolocá-la na fila.
+                    with upload_queue.reservation(user_uid) as queued:
+                        quota_error = document_service.check_quota(
+                            user_uid, [job["size"] or 0], reserved=queued
+                        )
+                        if not quota_error:
+                            upload_queue.retry(job["id"], document_service.fb_manager)
+                    if quota_error:
+                        st.warning(quota_error)
+                    else:
+                        st.rerun(scope="fragment")
+                if st.button("Descartar", key=f"dismiss_upload_{job['id']}"):
+                    upload_queue.dismiss(job["id"])
+                    st.rerun(scope="fragment")
+
+
+@instrumented("page")
 def render_document_page(firebase_manager: FirebaseManager, user_uid: str):
     """Renderiza a página de gerenciamento de documentos para o usuário.
 
@@ -29,75 +171,83 @@ def render_document_page(firebase_manager: FirebaseManager, user_uid: str):
     """
     st.title("🗂️ Seus Documentos")
 
+    document_service = DocumentService(
+        firebase_manager,
+        quota_bytes=STORAGE_QUOTA_BYTES,
+        quota_files=STORAGE_QUOTA_FILES,
+    )
+    upload_queue = shared_upload_queue()
+
+    render_storage_usage(document_service.get_storage_usage(user_uid))
+
     # --- Formulário para Upload de Documentos ---
 
     st.header("Fazer Upload de Novo Documento")
 
     with st.form("upload_document_form", clear_on_submit=True):
-        st.markdown("**Selecione um arquivo para upload:**")
-
-        uploaded_file = st.file_uploader(
-            "Escolha um arquivo",
+        st.markdown("**Selecione um ou mais arquivos para upload:**")
+        uploaded_files = st.file_uploader(
+            "Escolha os arquivos",
             type=["pdf", "doc", "docx", "txt", "jpg", "jpeg", "png", "xlsx", "csv"],
+            accept_multiple_files=True,
         )
         document_description = st.text_input(
             "Descrição do Documento (Opcional)", max_chars=200
         )
 
-        submitted = st.form_submit_button("Enviar Documento")
+        submitted = st.form_submit_button("Enviar Documentos")
 
-        if submitted and uploaded_file is not None:
-            if uploaded_file.size > 100 * 1024 * 1024:  # Limite de 100MB
+        if submitted and uploaded_files:
+            oversized = [
+                uploaded_file.name
+                for uploaded_file in uploaded_files
+                if uploaded_file.size > 100 * 1024 * 1024  # Limite de 100MB
+            ]
+            if oversized:
                 st.warning(
-                    "O arquivo é muito grande. O tamanho máximo permitido é 100MB."
+                    "Arquivo(s) muito grande(s): "
+                    f"{', '.join(oversized)}. O tamanho máximo permitido é 100MB."
                 )
             else:
-                try:
-                    file_extension = os.path.splitext(uploaded_file.name)[1]
-                    unique_filename = str(uuid.uuid4()) + file_extension
-
-                    storage_path = f"users/{user_uid}/documents/{unique_filename}"
-
-                    # Upload para o Firebase Storage
-                    file_url = firebase_manager.upload_file(
-                        uploaded_file.getvalue(),
-                        storage_path,
-                        content_type=uploaded_file.type,
+                # A cota considera também os arquivos ainda na fila, e fica
+                # reservada até que estes entrem nela.
+                with upload_queue.reservation(user_uid) as queued:
+                    quota_error = document_service.check_quota(
+                        user_uid,
+                        [uploaded_file.size for uploaded_file in uploaded_files],
+                        reserved=queued,
                     )
-
-                    if file_url:
-                        # Salva os metadados do documento no Firestore
-                        new_document_data = {
-                            "name": uploaded_file.name,
-                            "description": document_description,
-                            "file_url": file_url,
-                            "uploaded_at": firestore.SERVER_TIMESTAMP,
-                            "user_uid": user_uid,
-                            "mime_type": uploaded_file.type,
-                            "storage_path": storage_path,
-                        }
-
-                        collection_path = f"users/{user_uid}/documents"
-                        doc_id = firebase_manager.add_document(
-                            collection_path, new_document_data
+                    if not quota_error:
+                        # Os arquivos são copiados para a fila local e enviados
+                        # em segundo plano, em um único lote, pela sessão
+                        # atual; a página não espera o Storage nem o Firestore.
+                        job_ids = upload_queue.submit(
+                            firebase_manager,
+                            user_uid,
+                            uploaded_files,
+                            description=document_description,
+                        )
+                if quota_error:
+                    st.warning(quota_error)
+                else:
+                    failed = [
+                        uploaded_file.name
+                        for uploaded_file, job_id in zip(uploaded_files, job_ids)
+                        if not job_id
+                    ]
+                    if not failed:
+                        st.success(
+                            "Documentos recebidos! O envio continua em segundo plano."
                         )
-
-                        if doc_id:
-                            st.success("Documento enviado e salvo com sucesso!")
-                            sleep(1.5)
-                            st.rerun()
-                        else:
-                            st.error(
-                                "Erro ao salvar os metadados do documento. Tente novamente."
-                            )
                     else:
                         st.error(
-                            "Erro ao fazer upload do arquivo para o Storage. Tente novamente."
+                            "Não foi possível receber os arquivos: "
+                            f"{', '.join(failed)}."
                         )
-                except Exception as e:
-                    st.error(f"Ocorreu um erro no upload: {e}")
-        elif submitted and uploaded_file is None:
-            st.warning("Por favor, selecione um arquivo para enviar.")
+        elif submitted and not uploaded_files:
+            st.warning("Por favor, selecione ao menos um arquivo para enviar.")
+
+    render_upload_jobs(upload_queue, document_service, user_uid)
 
     st.markdown("---")
 
@@ -105,63 +255,76 @@ def render_document_page(firebase_manager: FirebaseManager, user_uid: str):
 
     st.header("Documentos Enviados")
 
-    collection_path = f"users/{user_uid}/documents"
-    documents_with_id = firebase_manager.get_all_documents(collection_path)
-
-    if documents_with_id:
-        document_list = []
-        for item in documents_with_id:
-            doc_id, data = list(item.items())[0]
-            data["id"] = doc_id
-            document_list.append(data)
+    document_list = firebase_manager.get_all_records(
+        DocumentService.documents_path(user_uid), DocumentMeta
+    )
 
+    if document_list:
         sorted_documents = sorted(
             document_list,
-            key=lambda x: x.get("uploaded_at", datetime.min),
+            key=lambda x: sort_key_moment(x.uploaded_at),
             reverse=True,
         )
 
         for doc in sorted_documents:
-            doc_id = doc["id"]
-
-            with st.expander(f"**📄 {doc.get('name', 'Arquivo sem nome')}**"):
-                if doc.get("description"):
-                    st.write(f"**Descrição:** {doc.get('description')}")
-                st.write(f"**Tipo:** {doc.get('mime_type', 'Desconhecido')}")
-
-                uploaded_at_ts = doc.get("uploaded_at")
-                if uploaded_at_ts:
-                    uploaded_dt = (
-                        uploaded_at_ts.isoformat()
-                        if isinstance(uploaded_at_ts, datetime)
-                        else uploaded_at_ts.isoformat()
-                    )
+            doc_id = doc.id
+
+            with st.expander(f"**📄 {doc.name or 'Arquivo sem nome'}**"):
+                if doc.description:
+                    st.write(f"**Descrição:** {doc.description}")
+                st.write(f"**Tipo:** {doc.mime_type or 'Desconhecido'}")
+
+                if doc.uploaded_at:
                     st.write(
-                        f"**Data do envio:** {datetime.fromisoformat(uploaded_dt).strftime('%d/%m/%Y %H:%M')}"
+                        f"**Data do envio:** {doc.uploaded_at.strftime('%d/%m/%Y %H:%M')}"
                     )
 
-                st.markdown(
-                    f"**Visualizar:** [Clique aqui para abrir o documento]({doc.get('file_url')})"
-                )
+                # A miniatura só é carregada quando o usuário pede a prévia.
+                if (doc.thumbnail_path or doc.thumbnail_url) and st.toggle(
+                    "Mostrar pré-visualização", key=f"preview_doc_{doc_id}"
+                ):
+                    thumbnail_url = document_service.thumbnail_url(doc)
+                    if thumbnail_url:
+                        st.image(thumbnail_url)
+
+                # Link assinado e temporário: os arquivos não são públicos.
+                file_url = document_service.file_url(doc)
+                if file_url:
+                    st.markdown(
+                        f"**Visualizar:** [Clique aqui para abrir o documento]({file_url})"
+                    )
+                else:
+                    st.warning("Não foi possível gerar o link do documento.")
+
+                # O conteúdo só é baixado quando o usuário pede o download; os
+                # arquivos abertos com frequência vêm do cache em memória.
+                if doc.storage_path and st.toggle(
+                    "Baixar pelo aplicativo", key=f"download_toggle_{doc_id}"
+                ):
+                    file_content = firebase_manager.download_bytes(doc.storage_path)
+                    if file_content is not None:
+                        st.download_button(
+                            "Baixar arquivo",
+                            data=file_content,
+                            file_name=doc.name or "documento",
+                            mime=doc.mime_type or None,
+                            key=f"download_doc_{doc_id}",
+                        )
+                    else:
+                        st.error("Não foi possível baixar o documento.")
 
                 col1, col2 = st.columns(2)
 
                 with col2:
                     if st.button("Excluir", key=f"delete_doc_{doc_id}"):
-                        storage_path_to_delete = doc.get("storage_path")
-
-                        if storage_path_to_delete:
-                            if firebase_manager.delete_file(storage_path_to_delete):
-                                st.success("Documento excluído com sucesso")
-                            else:
-                                st.error(
-                                    "Erro ao excluir arquivo do Storage. Tente novamente."
-                                )
-                                continue
-
-                        firebase_manager.delete_document(collection_path, doc_id)
-                        sleep(1.5)
-                        st.rerun()
+                        if document_service.delete_document(user_uid, doc):
+                            st.success("Documento excluído com sucesso")
+                            sleep(1.5)
+                            st.rerun()
+                        else:
+                            st.error(
+                                "Erro ao excluir arquivo do Storage. Tente novamente."
+                            )
     else:
         st.info(
             "Nenhum documento enviado ainda. Use o formulário acima para adicionar um."
@@ -10,10 +10,66 @@ os dados de exames de forma segura no Firestore.
 import streamlit as st
 from datetime import date, datetime
 from core.firebase_manager import FirebaseManager
-from firebase_admin import firestore
+from core.calendar_export import CalendarExport
+from core.exam_service import ExamService
+from core.instrumentation import instrumented
+from core.models import Exam
 from time import sleep
 
 
+def _finish_export(exam_service: ExamService, sync_token: str):
+    """Guarda o token da exportação baixada e descarta o arquivo gerado.
+
+    Args:
+        exam_service (ExamService): O serviço de exames do usuário.
+        sync_token (str): O token de sincronização da exportação.
+    """
+    exam_service.save_export_token(sync_token)
+    st.session_state.pop("exam_export", None)
+
+
+def _render_exam(exam_service: ExamService, exam: Exam):
+    """Renderiza um exame, com as ações de concluir e excluir.
+
+    Args:
+        exam_service (ExamService): O serviço de exames do usuário.
+        exam (Exam): O exame a ser exibido.
+    """
+    doc_id = exam.id
+    is_completed = exam.completed
+    status_emoji = "✅" if is_completed else "⏳"
+
+    display_date = exam.date.strftime("%d/%m/%Y") if exam.date else "Data Inválida"
+
+    with st.expander(
+        f"{status_emoji} **{exam.title}** - {display_date} às {exam.time}"
+    ):
+        st.write(f"**Local:** {exam.local}")
+        st.write(f"**Médico:** {exam.doctor}")
+        st.write(f"**Observações:** {exam.notes}")
+
+        col1, col2 = st.columns(2)
+
+        if not is_completed:
+            with col1:
+                if st.button("Marcar exame como concluído", key=f"complete_{doc_id}"):
+                    exam_service.complete(exam)
+                    st.success("Exame marcado como concluído!")
+                    sleep(1.5)
+                    st.rerun()
+        else:
+            with col1:
+                st.write("Exame concluído! 🎉")
+
+        with col2:
+            if st.button("Excluir", key=f"delete_{doc_id}"):
+                exam_service.delete(exam)
+                st.success("Exame excluído com sucesso.")
+                sleep(1.5)
+                st.rerun()
+
+
+@instrumented("page")
 def render_exams_page(firebase_manager: FirebaseManager, user_uid: str):
     """Renderiza a página da agenda de exames para o usuário.
 
@@ -27,6 +83,11 @@ def render_exams_page(firebase_manager: FirebaseManager, user_uid: str):
     """
     st.title("📅 Agenda de Exames")
 
+    exam_service = ExamService(firebase_manager, user_uid)
+
+    # Exames gravados antes do campo `when` são atualizados uma única vez.
+    exam_service.ensure_when_field()
+
     options = [
         "Acupuntura",
         "Alergia e Imunologia",
@@ -97,20 +158,13 @@ def render_exams_page(firebase_manager: FirebaseManager, user_uid: str):
                 st.warning("Formato de horário inválido. Use HH:MM (Ex: 14:30).")
             else:
                 try:
-                    new_exam_data = {
-                        "title": exam_title,
-                        "date": exam_date.strftime("%Y-%m-%d"),
-                        "time": exam_time,
-                        "local": exam_local,
-                        "doctor": exam_doctor,
-                        "notes": exam_notes,
-                        "created_at": firestore.SERVER_TIMESTAMP,
-                        "completed": False,
-                    }
-
-                    collection_path = f"users/{user_uid}/exames"
-                    doc_id = firebase_manager.add_document(
-                        collection_path, new_exam_data
+                    doc_id = exam_service.create(
+                        exam_title,
+                        exam_date,
+                        exam_time,
+                        exam_local,
+                        exam_doctor,
+                        exam_notes,
                     )
 
                     if doc_id:
@@ -127,72 +181,94 @@ def render_exams_page(firebase_manager: FirebaseManager, user_uid: str):
     # --- Seção para Exibir e Gerenciar Exames Existentes ---
     st.header("Exames Agendados")
 
-    collection_path = f"users/{user_uid}/exames"
-    exams_with_id = firebase_manager.get_all_documents(collection_path)
+    # Apenas os próximos exames são lidos, já ordenados pelo Firestore.
+    upcoming_exams = exam_service.upcoming()
+    overdue_exams = exam_service.overdue()
 
-    if exams_with_id:
-        exam_list = []
-        for item in exams_with_id:
-            doc_id, data = list(item.items())[0]
-            data["id"] = doc_id
+    if upcoming_exams or overdue_exams:
+        for exam in upcoming_exams:
+            _render_exam(exam_service, exam)
 
-            if "completed" not in data:
-                data["completed"] = False
-            if "time" not in data:
-                data["time"] = "Não informado"
+        if overdue_exams:
+            st.subheader("Exames com data passada")
+            st.caption("Marque-os como concluídos para movê-los ao arquivo.")
+            for exam in overdue_exams:
+                _render_exam(exam_service, exam)
+    else:
+        st.info(
+            "Nenhum exame agendado ainda. Use o formulário acima para adicionar um."
+        )
+
+    st.markdown("---")
 
-            exam_list.append(data)
+    # --- Exportação para o Calendário (.ics) ---
+    st.header("Exportar para o Calendário")
 
-        # Ordena a lista de exames pela data e hora combinadas para exibição
-        sorted_exams = sorted(
-            exam_list,
-            key=lambda x: (x.get("date", "9999-12-31"), x.get("time", "99:99")),
+    # Os exames só são lidos quando o usuário pede a exportação.
+    if st.toggle("Gerar arquivo .ics", key="show_exam_export"):
+        last_token = exam_service.last_export_token()
+        only_changes = st.checkbox(
+            "Somente alterações desde a última exportação",
+            value=last_token is not None,
+            disabled=last_token is None,
+            help="Inclui os exames criados, alterados ou excluídos desde então.",
         )
+        # O arquivo é gerado apenas quando pedido, e não a cada execução da
+        # página, e fica guardado na sessão até ser baixado.
+        options = (exam_service.user_uid, only_changes)
+        prepared = st.session_state.get("exam_export")
+        if prepared is not None and prepared["options"] != options:
+            prepared = None
+        if st.button("Gerar arquivo", key="prepare_exam_export"):
+            export = CalendarExport(exam_service, last_token if only_changes else None)
+            prepared = st.session_state.exam_export = {
+                "options": options,
+                "data": "".join(export.iter_lines()),
+                "sync_token": export.sync_token,
+                "incremental": export.incremental,
+            }
+        if prepared is not None:
+            if only_changes and not prepared["incremental"]:
+                st.caption(
+                    "A última exportação é antiga demais; todos os exames foram exportados."
+                )
+            st.download_button(
+                "📥 Baixar agenda (.ics)",
+                data=prepared["data"],
+                file_name="agenda_exames.ics",
+                mime="text/calendar",
+                on_click=_finish_export,
+                args=(exam_service, prepared["sync_token"]),
+            )
 
-        for exam in sorted_exams:
-            doc_id = exam["id"]
-            is_completed = exam.get("completed", False)
-            status_emoji = "✅" if is_completed else "⏳"
+    st.markdown("---")
 
-            try:
-                display_date = datetime.strptime(exam.get("date"), "%Y-%m-%d").strftime(
-                    "%d/%m/%Y"
-                )
-            except (ValueError, TypeError):
-                display_date = exam.get("date", "Data Inválida")
-
-            with st.expander(
-                f"{status_emoji} **{exam.get('title')}** - {display_date} às {exam.get('time')}"
-            ):
-                st.write(f"**Local:** {exam.get('local')}")
-                st.write(f"**Médico:** {exam.get('doctor')}")
-                st.write(f"**Observações:** {exam.get('notes')}")
-
-                col1, col2 = st.columns(2)
-
-                if not is_completed:
-                    with col1:
-                        if st.button(
-                            "Marcar exame como concluído", key=f"complete_{doc_id}"
-                        ):
-                            update_data = {"completed": True}
-                            firebase_manager.update_document(
-                                collection_path, doc_id, update_data
-                            )
-                            st.success("Exame marcado como concluído!")
-                            sleep(1.5)
-                            st.rerun()
-                else:
-                    with col1:
-                        st.write("Exame concluído! 🎉")
-
-                with col2:
-                    if st.button("Excluir", key=f"delete_{doc_id}"):
-                        firebase_manager.delete_document(collection_path, doc_id)
-                        st.success("Exame excluído com sucesso.")
-                        sleep(1.5)
-                        st.rerun()
-    else:
-        st.info(
-            "Nenhum exame agendado ainda. Use o formulário acima para adicionar um."
-        )
+    # --- Arquivo de Exames Concluídos (paginado) ---
+    st.header("Exames Concluídos")
+
+    # O arquivo só é consultado quando o usuário o abre.
+    if not st.toggle("Mostrar exames concluídos", key="show_exam_archive"):
+        return
+
+    # Pilha de cursores: o último é o início da página atual.
+    cursors = st.session_state.setdefault("exam_archive_cursors", [None])
+    archived_exams, next_cursor = exam_service.archive_page(cursors[-1])
+
+    if not archived_exams:
+        st.info("Nenhum exame concluído.")
+        return
+
+    for exam in archived_exams:
+        _render_exam(exam_service, exam)
+
+    col_previous, col_page, col_next = st.columns([1, 1, 1])
+    with col_previous:
+        if st.button("◀ Anteriores", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+    with col_page:
+        st.caption(f"Página {len(cursors)}")
+    with col_next:
+        if st.button("Próximos ▶", disabled=next_cursor is None):
+            cursors.append(next_cursor)
+            st.rerun()
@@ -8,11 +8,13 @@ para persistir os dados do usuário.
 
 import streamlit as st
 from core.firebase_manager import FirebaseManager
-from firebase_admin import firestore
+from core.instrumentation import instrumented
+from core.models import sort_key_moment
+from core.note_service import NOTES_KIND, NoteService
 from time import sleep
-from datetime import datetime
 
 
+@instrumented("page")
 def render_anotation_page(firebase_manager: FirebaseManager, user_uid: str):
     """Renderiza a página de gerenciamento de anotações para o usuário.
 
@@ -26,6 +28,11 @@ def render_anotation_page(firebase_manager: FirebaseManager, user_uid: str):
     """
     st.title("📝 Suas Anotações")
 
+    note_service = NoteService(firebase_manager, user_uid)
+
+    # Anotações criadas antes do índice são indexadas uma única vez.
+    note_service.ensure_search_index()
+
     # --- Formulário para Adicionar Nova Anotação ---
 
     st.header("Adicionar Nova Anotação")
@@ -47,18 +54,8 @@ def render_anotation_page(firebase_manager: FirebaseManager, user_uid: str):
                 st.warning("Título e conteúdo da anotação são obrigatórios.")
             else:
                 try:
-                    new_anotation_data = {
-                        "title": anotation_title,
-                        "content": anotation_content,
-                        "created_at": firestore.SERVER_TIMESTAMP,
-                        "updated_at": firestore.SERVER_TIMESTAMP,
-                        "user_uid": user_uid,
-                    }
-
-                    collection_path = f"users/{user_uid}/anotacoes"
-                    doc_id = firebase_manager.add_document(
-                        collection_path, new_anotation_data
-                    )
+                    # Conteúdos grandes são gravados comprimidos, à parte.
+                    doc_id = note_service.create(anotation_title, anotation_content)
 
                     if doc_id:
                         st.success("Anotação salva com sucesso!")
@@ -75,27 +72,55 @@ def render_anotation_page(firebase_manager: FirebaseManager, user_uid: str):
 
     st.header("Minhas Anotações")
 
-    collection_path = f"users/{user_uid}/anotacoes"
-    anotations_with_id = firebase_manager.get_all_documents(collection_path)
-
-    if anotations_with_id:
-        anotation_list = []
-        for item in anotations_with_id:
-            doc_id, data = list(item.items())[0]
-            data["id"] = doc_id
-            anotation_list.append(data)
-
+    anotation_list = note_service.list_notes()
+
+    search_query = st.text_input(
+        "🔎 Buscar nas anotações",
+        key="notes_search_query",
+        placeholder="Digite palavras do título ou do conteúdo",
+    )
+
+    if search_query.strip():
+        # Resultados ordenados por relevância, a partir do índice invertido.
+        notes_by_id = {note.id: note for note in anotation_list}
+        sorted_anotations = [
+            notes_by_id[doc_id]
+            for _, doc_id, _ in note_service.search_index.search(
+                search_query, kinds=[NOTES_KIND]
+            )
+            if doc_id in notes_by_id
+        ]
+        st.caption(f"{len(sorted_anotations)} anotação(ões) encontrada(s).")
+    else:
         sorted_anotations = sorted(
             anotation_list,
-            key=lambda x: x.get("created_at", datetime.min),
+            key=lambda x: sort_key_moment(x.created_at),
             reverse=True,
         )
 
-        for anotation in sorted_anotations:
-            doc_id = anotation["id"]
+    if sorted_anotations:
 
-            with st.expander(f"**{anotation.get('title', 'Sem Título')}**"):
-                st.write(anotation.get("content", ""))
+        for anotation in sorted_anotations:
+            doc_id = anotation.id
+
+            with st.expander(f"**{anotation.title or 'Sem Título'}**"):
+                if anotation.has_body:
+                    # A lista traz só a prévia; o conteúdo completo é baixado
+                    # e descomprimido apenas quando o usuário pede.
+                    size_kb = anotation.content_size / 1024
+                    if st.toggle(
+                        f"Mostrar conteúdo completo ({size_kb:.1f} KB)",
+                        key=f"show_note_{doc_id}",
+                    ):
+                        content = note_service.load_content(anotation)
+                        if content is None:
+                            st.error("Não foi possível carregar o conteúdo completo.")
+                        else:
+                            st.write(content)
+                    else:
+                        st.write(f"{anotation.preview}…")
+                else:
+                    st.write(anotation.content)
 
                 col1, col2 = st.columns(2)
 
@@ -106,19 +131,27 @@ def render_anotation_page(firebase_manager: FirebaseManager, user_uid: str):
 
                 with col2:
                     if st.button("Excluir", key=f"delete_{doc_id}"):
-                        firebase_manager.delete_document(collection_path, doc_id)
+                        note_service.delete(anotation)
                         st.success("Anotação excluída com sucesso.")
                         sleep(1.5)
                         st.rerun()
 
             if st.session_state.get(f"edit_anotation_{doc_id}", False):
-                st.subheader(f"Editar Anotação: {anotation.get('title', '')}")
-                with st.form(f"edit_anotation_form_{doc_id}"):
-                    edited_title = st.text_input(
-                        "Título", value=anotation.get("title", "")
+                st.subheader(f"Editar Anotação: {anotation.title}")
+                current_content = note_service.load_content(anotation)
+                if current_content is None:
+                    # Editar a partir da prévia sobrescreveria o conteúdo completo.
+                    st.error(
+                        "Não foi possível carregar o conteúdo completo da anotação. "
+                        "Tente editá-la novamente mais tarde."
                     )
+                    st.session_state[f"edit_anotation_{doc_id}"] = False
+                    st.markdown("---")
+                    continue
+                with st.form(f"edit_anotation_form_{doc_id}"):
+                    edited_title = st.text_input("Título", value=anotation.title)
                     edited_content = st.text_area(
-                        "Conteúdo", value=anotation.get("content", ""), height=200
+                        "Conteúdo", value=current_content, height=200
                     )
 
                     col_save, col_cancel = st.columns(2)
@@ -129,24 +162,28 @@ def render_anotation_page(firebase_manager: FirebaseManager, user_uid: str):
                                     "Título e conteúdo da anotação são obrigatórios."
                                 )
                             else:
-                                update_data = {
-                                    "title": edited_title,
-                                    "content": edited_content,
-                                    "updated_at": firestore.SERVER_TIMESTAMP,
-                                }
-                                firebase_manager.update_document(
-                                    collection_path, doc_id, update_data
-                                )
-                                st.success("Anotação atualizada com sucesso!")
-                                st.session_state[f"edit_anotation_{doc_id}"] = False
-                                sleep(1.5)
-                                st.rerun()
+                                if note_service.update(
+                                    anotation,
+                                    current_content,
+                                    edited_title,
+                                    edited_content,
+                                ):
+                                    st.success("Anotação atualizada com sucesso!")
+                                    st.session_state[f"edit_anotation_{doc_id}"] = False
+                                    sleep(1.5)
+                                    st.rerun()
+                                else:
+                                    st.error(
+                                        "Erro ao atualizar a anotação. Tente novamente."
+                                    )
                     with col_cancel:
                         if st.form_submit_button("Cancelar"):
                             st.session_state[f"edit_anotation_{doc_id}"] = False
                             st.rerun()
                 st.markdown("---")
 
+    elif search_query.strip():
+        st.info("Nenhuma anotação corresponde à busca.")
     else:
         st.info(
             "Nenhuma anotação criada ainda. Use o formulário acima para adicionar uma."
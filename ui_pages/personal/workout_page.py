@@ -8,13 +8,219 @@ Firestore para persistir os dados.
 """
 
 import streamlit as st
+import plotly.express as px
 from core.firebase_manager import FirebaseManager
+from core.instrumentation import instrumented
+from core.models import Workout
+from core.workout_analytics import session_metrics, sets_frame, weekly_trends
+from core.workout_service import UNKNOWN_GROUP, WorkoutService
+from datetime import date, datetime, time
 from firebase_admin import firestore
 from time import sleep
-from datetime import datetime
-from collections import defaultdict 
 
 
+def _group_workouts(
+    workout_service: WorkoutService, group: str, expected_count: int | None = None
+) -> list[Workout]:
+    """Retorna os exercícios de um grupo, guardados na sessão do usuário.
+
+    Cada grupo é consultado apenas na primeira vez em que é aberto; as
+    alterações feitas pela página descartam os grupos afetados, e uma
+    quantidade diferente da do resumo (alterações feitas em outra sessão)
+    faz o grupo ser consultado de novo.
+    """
+    cache = st.session_state.setdefault("workout_group_cache", {})
+    cached = cache.get(group)
+    if cached is None or (expected_count is not None and len(cached) != expected_count):
+        cached = cache[group] = workout_service.list_group(group)
+    return cached
+
+
+def _forget_groups(*groups: str):
+    """Descarta os exercícios guardados dos grupos alterados."""
+    cache = st.session_state.get("workout_group_cache", {})
+    for group in groups:
+        cache.pop(group or UNKNOWN_GROUP, None)
+
+
+def _session_history(workout_service: WorkoutService, exercise_id: str):
+    """Retorna as métricas por sessão de um exercício, guardadas na sessão do usuário.
+
+    O histórico é lido uma única vez e descartado quando uma sessão do
+    exercício é registrada ou o exercício é excluído.
+    """
+    cache = st.session_state.setdefault("workout_history_cache", {})
+    if exercise_id not in cache:
+        sessions = list(workout_service.iter_sessions(exercise_id))
+        cache[exercise_id] = session_metrics(sets_frame(sessions))
+    return cache[exercise_id]
+
+
+def _render_session_form(workout_service: WorkoutService, workout: Workout):
+    """Renderiza o formulário de registro de uma sessão realizada de um exercício."""
+    doc_id = workout.id
+    st.subheader(f"Registrar Sessão: {workout.exercise_name}")
+    with st.form(f"log_session_form_{doc_id}"):
+        performed_on = st.date_input(
+            "Data da Sessão",
+            value=date.today(),
+            max_value=date.today(),
+            format="DD/MM/YYYY",
+            key=f"session_date_{doc_id}",
+        )
+        # Uma linha por série, já preenchida com o planejado no exercício.
+        planned_sets = [
+            {"Repetições": workout.reps or 10, "Peso (kg)": workout.weight}
+            for _ in range(workout.sets or 3)
+        ]
+        performed_sets = st.data_editor(
+            planned_sets,
+            num_rows="dynamic",
+            column_config={
+                "Repetições": st.column_config.NumberColumn(
+                    min_value=0, max_value=100, step=1, required=True
+                ),
+                "Peso (kg)": st.column_config.NumberColumn(
+                    min_value=0.0, max_value=500.0, step=0.5, required=True
+                ),
+            },
+            key=f"session_sets_{doc_id}",
+        )
+        session_notes = st.text_input(
+            "Observações da Sessão", key=f"session_notes_{doc_id}"
+        )
+
+        col_save, col_cancel = st.columns(2)
+        with col_save:
+            if st.form_submit_button("Salvar Sessão"):
+                rows = [
+                    row
+                    for row in performed_sets
+                    if row.get("Repetições") is not None
+                    and row.get("Peso (kg)") is not None
+                ]
+                if not rows:
+                    st.warning("Informe ao menos uma série.")
+                else:
+                    # Sessões de hoje usam o horário do servidor.
+                    performed_at = (
+                        None
+                        if performed_on == date.today()
+                        else datetime.combine(performed_on, time(12))
+                    )
+                    session_id = workout_service.log_session(
+                        doc_id,
+                        [row["Repetições"] for row in rows],
+                        [row["Peso (kg)"] for row in rows],
+                        notes=session_notes,
+                        performed_at=performed_at,
+                    )
+                    if session_id:
+                        st.session_state.get("workout_history_cache", {}).pop(
+                            doc_id, None
+                        )
+                        st.session_state.logging_workout_id = None
+                        st.success("Sessão registrada com sucesso!")
+                        sleep(1.5)
+                        st.rerun()
+                    else:
+                        st.error("Erro ao registrar a sessão. Tente novamente.")
+        with col_cancel:
+            if st.form_submit_button("Cancelar"):
+                st.session_state.logging_workout_id = None
+                st.rerun()
+
+
+def _render_progression(workout_service: WorkoutService, group_counts: dict):
+    """Renderiza a evolução de um exercício: volume, 1RM estimado e tendências semanais."""
+    st.header("📈 Progressão")
+
+    # O histórico só é lido quando o usuário abre a progressão.
+    if not st.toggle("Mostrar progressão dos exercícios", key="show_progression"):
+        return
+
+    group = st.selectbox(
+        "Grupo Muscular", options=sorted(group_counts), key="progression_group"
+    )
+    workouts_by_id = {
+        workout.id: workout
+        for workout in _group_workouts(workout_service, group, group_counts[group])
+    }
+    if not workouts_by_id:
+        st.info("Nenhum exercício neste grupo.")
+        return
+    exercise_id = st.selectbox(
+        "Exercício",
+        options=list(workouts_by_id),
+        format_func=lambda key: workouts_by_id[key].exercise_name,
+        key="progression_exercise",
+    )
+    sessions = _session_history(workout_service, exercise_id)
+
+    if sessions.empty:
+        st.info(
+            'Nenhuma sessão registrada para este exercício. Use "Registrar Sessão" para começar o histórico.'
+        )
+        return
+
+    weeks = weekly_trends(sessions)
+    last_session = sessions.iloc[-1]
+    col_sessions, col_volume, col_one_rm = st.columns(3)
+    col_sessions.metric("Sessões Registradas", len(sessions))
+    col_volume.metric(
+        "Volume da Última Sessão",
+        f"{last_session['volume']:.0f} kg",
+        delta=(
+            f"{last_session['volume'] - sessions.iloc[-2]['volume']:+.0f} kg"
+            if len(sessions) > 1
+            else None
+        ),
+    )
+    col_one_rm.metric("Melhor 1RM Estimado", f"{sessions['one_rm'].max():.1f} kg")
+
+    fig_one_rm = px.line(
+        sessions,
+        x="performed_at",
+        y=["one_rm", "top_weight"],
+        markers=True,
+        labels={"performed_at": "Data", "value": "Peso (kg)", "variable": "Legenda"},
+    )
+    fig_one_rm.for_each_trace(
+        lambda trace: trace.update(
+            name={"one_rm": "1RM Estimado", "top_weight": "Maior Peso"}[trace.name]
+        )
+    )
+    st.subheader("1RM Estimado por Sessão")
+    st.plotly_chart(fig_one_rm)
+
+    fig_weekly = px.bar(
+        weeks,
+        x="week",
+        y="volume",
+        labels={"week": "Semana", "volume": "Volume (kg)"},
+    )
+    fig_weekly.add_scatter(
+        x=weeks["week"], y=weeks["volume_avg_4w"], name="Média de 4 Semanas"
+    )
+    st.subheader("Volume Semanal (séries × repetições × peso)")
+    st.plotly_chart(fig_weekly)
+
+    st.dataframe(
+        weeks.sort_values("week", ascending=False).rename(
+            columns={
+                "week": "Semana",
+                "sessions": "Sessões",
+                "volume": "Volume (kg)",
+                "one_rm": "Melhor 1RM (kg)",
+                "volume_change": "Variação do Volume (%)",
+                "volume_avg_4w": "Média de 4 Semanas (kg)",
+            }
+        ),
+        hide_index=True,
+    )
+
+
+@instrumented("page")
 def render_workout_page(firebase_manager: FirebaseManager, user_uid: str):
     """Renderiza a página de gerenciamento de treinos para o usuário.
 
@@ -28,9 +234,13 @@ def render_workout_page(firebase_manager: FirebaseManager, user_uid: str):
     """
     st.title("💪 Meus Treinos")
 
+    workout_service = WorkoutService(firebase_manager, user_uid)
+
     # Inicializa o estado para controlar qual treino está sendo editado
     if "editing_workout_id" not in st.session_state:
         st.session_state.editing_workout_id = None
+    if "logging_workout_id" not in st.session_state:
+        st.session_state.logging_workout_id = None
 
     # --- Lista de Grupos Musculares para o seletor ---
     
@@ -129,12 +339,10 @@ def render_workout_page(firebase_manager: FirebaseManager, user_uid: str):
                         "user_uid": user_uid,
                     }
 
-                    collection_path = f"users/{user_uid}/treinos"
-                    doc_id = firebase_manager.add_document(
-                        collection_path, new_workout_data
-                    )
+                    doc_id = workout_service.create(new_workout_data)
 
                     if doc_id:
+                        _forget_groups(muscle_group)
                         st.success("Exercício salvo com sucesso!")
                         sleep(1.5)
                         st.rerun()
@@ -149,73 +357,52 @@ def render_workout_page(firebase_manager: FirebaseManager, user_uid: str):
 
     st.header("Treinos Registrados")
 
-    collection_path = f"users/{user_uid}/treinos"
-    workouts_with_id = firebase_manager.get_all_documents(collection_path)
-
-    if workouts_with_id:
-        workout_list = []
-        for item in workouts_with_id:
-            doc_id, data = list(item.items())[0]
-            data["id"] = doc_id
-            workout_list.append(data)
-
-
-        grouped_workouts = defaultdict(list)
-        for workout in workout_list:
-            grouped_workouts[workout.get("muscle_group", "Não Informado")].append(
-                workout
-            )
-
+    # Apenas os grupos e as suas quantidades são lidos (um documento de resumo).
+    group_counts = workout_service.group_counts()
 
-        sorted_muscle_groups = sorted(grouped_workouts.keys())
+    if group_counts:
+        for group in sorted(group_counts):
+            # Os exercícios do grupo só são consultados quando ele é aberto.
+            if not st.toggle(
+                f"**🏋️ Grupo Muscular: {group}** ({group_counts[group]})",
+                key=f"open_workout_group_{group}",
+            ):
+                continue
 
-        for group in sorted_muscle_groups:
-            with st.expander(f"**🏋️ Grupo Muscular: {group}**"):
+            with st.container(border=True):
 
-                sorted_exercises_in_group = sorted(
-                    grouped_workouts[group],
-                    key=lambda x: x.get("created_at", datetime.min),
-                    reverse=True,
+                sorted_exercises_in_group = _group_workouts(
+                    workout_service, group, group_counts[group]
                 )
 
                 for workout in sorted_exercises_in_group:
-                    doc_id = workout["id"]
+                    doc_id = workout.id
 
                     st.markdown(
                         f"---"
                     )  
                     st.subheader(
-                        f"Exercício: {workout.get('exercise_name', 'Nome Inválido')}"
+                        f"Exercício: {workout.exercise_name or 'Nome Inválido'}"
                     )
 
-                    warmup_sets_display = workout.get("warmup_sets", 0)
-                    warmup_reps_display = workout.get("warmup_reps", 0)
-                    if warmup_sets_display > 0 or warmup_reps_display > 0:
+                    if workout.warmup_sets > 0 or workout.warmup_reps > 0:
                         st.write(
-                            f"**Aquecimento:** {warmup_sets_display} séries de {warmup_reps_display} repetições com peso de {workout.get('weight_add', 'N/A')} kg"
+                            f"**Aquecimento:** {workout.warmup_sets} séries de {workout.warmup_reps} repetições com peso de {workout.weight_add} kg"
                         )
 
-                    st.write(f"**Séries de Trabalho:** {workout.get('sets', 'N/A')}")
-                    st.write(
-                        f"**Repetições de Trabalho:** {workout.get('reps', 'N/A')}"
-                    )
-                    st.write(f"**Peso:** {workout.get('weight', 'N/A')} kg")
+                    st.write(f"**Séries de Trabalho:** {workout.sets}")
+                    st.write(f"**Repetições de Trabalho:** {workout.reps}")
+                    st.write(f"**Peso:** {workout.weight} kg")
 
-                    if workout.get("notes"):
-                        st.write(f"**Observações:** {workout.get('notes')}")
+                    if workout.notes:
+                        st.write(f"**Observações:** {workout.notes}")
 
-                    created_at_ts = workout.get("created_at")
-                    if created_at_ts:
-                        created_dt = (
-                            created_at_ts.isoformat()
-                            if isinstance(created_at_ts, datetime)
-                            else created_at_ts.isoformat()
-                        )
+                    if workout.created_at:
                         st.caption(
-                            f"Registrado em: {datetime.fromisoformat(created_dt).strftime('%d/%m/%Y %H:%M')}"
+                            f"Registrado em: {workout.created_at.strftime('%d/%m/%Y %H:%M')}"
                         )
 
-                    col1, col2 = st.columns(2)
+                    col1, col2, col3 = st.columns(3)
 
                     with col1:
                         if st.button("Editar", key=f"edit_workout_btn_{doc_id}"):
@@ -223,26 +410,45 @@ def render_workout_page(firebase_manager: FirebaseManager, user_uid: str):
                             st.rerun()
 
                     with col2:
-                        if st.button("Excluir", key=f"delete_workout_{doc_id}"):
-                            firebase_manager.delete_document(collection_path, doc_id)
-                            st.success("Exercício excluído com sucesso.")
-                            sleep(1.5)
+                        if st.button(
+                            "Registrar Sessão", key=f"log_session_btn_{doc_id}"
+                        ):
+                            st.session_state.logging_workout_id = doc_id
                             st.rerun()
 
+                    with col3:
+                        if st.button("Excluir", key=f"delete_workout_{doc_id}"):
+                            # O histórico de sessões é excluído junto.
+                            if workout_service.delete_exercise(workout):
+                                st.session_state.get("workout_history_cache", {}).pop(
+                                    doc_id, None
+                                )
+                                _forget_groups(workout.muscle_group)
+                                st.success("Exercício excluído com sucesso.")
+                                sleep(1.5)
+                                st.rerun()
+                            else:
+                                st.error(
+                                    "Erro ao excluir o exercício. Tente novamente."
+                                )
+
+                    if st.session_state.logging_workout_id == doc_id:
+                        _render_session_form(workout_service, workout)
+
                     if st.session_state.editing_workout_id == doc_id:
                         st.subheader(
-                            f"Editar Exercício: {workout.get('exercise_name', '')}"
+                            f"Editar Exercício: {workout.exercise_name}"
                         )
                         with st.form(f"edit_workout_form_{doc_id}"):
                             edited_exercise_name = st.text_input(
                                 "Nome do Exercício",
-                                value=workout.get("exercise_name", ""),
+                                value=workout.exercise_name,
                             )
                             edited_muscle_group = st.selectbox(
                                 "Grupo Muscular",
                                 options=muscle_groups,
                                 index=muscle_groups.index(
-                                    workout.get("muscle_group", muscle_groups[0])
+                                    workout.muscle_group or muscle_groups[0]
                                 ),
                             )
 
@@ -252,14 +458,14 @@ def render_workout_page(firebase_manager: FirebaseManager, user_uid: str):
                                 "Séries de Aquecimento",
                                 min_value=0,
                                 max_value=10,
-                                value=workout.get("warmup_sets", 0),
+                                value=workout.warmup_sets,
                                 key=f"edit_warmup_sets_{doc_id}",
                             )
                             edited_warmup_reps = st.number_input(
                                 "Repetições de Aquecimento",
                                 min_value=0,
                                 max_value=50,
-                                value=workout.get("warmup_reps", 0),
+                                value=workout.warmup_reps,
                                 key=f"edit_warmup_reps_{doc_id}",
                             )
                             st.markdown("---")
@@ -269,26 +475,26 @@ def render_workout_page(firebase_manager: FirebaseManager, user_uid: str):
                                 "Séries de Trabalho",
                                 min_value=1,
                                 max_value=20,
-                                value=workout.get("sets", 3),
+                                value=workout.sets or 3,
                                 key=f"edit_sets_{doc_id}",
                             )
                             edited_reps = st.number_input(
                                 "Repetições de Trabalho",
                                 min_value=1,
                                 max_value=100,
-                                value=workout.get("reps", 10),
+                                value=workout.reps or 10,
                                 key=f"edit_reps_{doc_id}",
                             )
                             edited_weight = st.number_input(
                                 "Peso (kg)",
                                 min_value=0.0,
                                 max_value=500.0,
-                                value=workout.get("weight", 10.0),
+                                value=workout.weight,
                                 step=0.5,
                                 key=f"edit_weight_{doc_id}",
                             )
                             edited_notes = st.text_area(
-                                "Observações", value=workout.get("notes", "")
+                                "Observações", value=workout.notes
                             )
 
                             col_save, col_cancel = st.columns(2)
@@ -316,8 +522,9 @@ def render_workout_page(firebase_manager: FirebaseManager, user_uid: str):
                                             "notes": edited_notes,
                                             "updated_at": firestore.SERVER_TIMESTAMP,
                                         }
-                                        firebase_manager.update_document(
-                                            collection_path, doc_id, update_data
+                                        workout_service.update(workout, update_data)
+                                        _forget_groups(
+                                            workout.muscle_group, edited_muscle_group
                                         )
                                         st.success("Exercício atualizado com sucesso!")
                                         st.session_state.editing_workout_id = (
@@ -335,6 +542,11 @@ def render_workout_page(firebase_manager: FirebaseManager, user_uid: str):
                                     st.rerun()
                 st.markdown("---")
 
+
+        st.markdown("---")
+
+        _render_progression(workout_service, group_counts)
+
     else:
         st.info(
             "Nenhum treino registrado ainda. Use o formulário acima para adicionar um novo exercício."